@@ -0,0 +1,73 @@
+"""Benchmark /validate request latency under log-heavy load for each file-logging mode.
+
+Each request logs --records records and then posts a CSV to /validate. The modes are the
+previous synchronous Loguru file sink with inline zip compression, and the background writer in
+its blocking and dropping variants. The file rotates every --rotation-mb so that rotations and
+compressions happen during the run.
+
+Usage:
+    uv run python -m benchmarks.bench_logging --requests 2000 --records 100
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from src.api.main import app
+from src.core.logger import BackgroundFileSink
+
+CSV = b"id,email,age\n" + b"".join(b"%d,user%d@example.com,%d\n" % (i, i, 30) for i in range(1, 51))
+
+
+def add_sink(mode: str, path: Path, rotation: int, serialize: bool) -> int:
+    """Add the file sink of a mode to the Loguru logger and return its handler id."""
+    if mode == "sync":
+        return logger.add(path, rotation=rotation, compression="zip", serialize=serialize)
+    overflow = mode.removeprefix("async-")
+    sink = BackgroundFileSink(path, overflow=overflow, rotation=rotation, serialize=serialize)
+    return logger.add(sink, serialize=serialize)
+
+
+def run(mode: str, requests: int, records: int, rotation: int, serialize: bool) -> list[float]:
+    """Send requests that each log `records` records, and return their latencies in ms."""
+    client = TestClient(app)
+    latencies = []
+    with tempfile.TemporaryDirectory() as tmp:
+        logger.remove()
+        handler = add_sink(mode, Path(tmp) / "app.log", rotation, serialize)
+        for n in range(requests):
+            start = time.perf_counter()
+            for i in range(records):
+                logger.info("request {} record {} with some payload {}", n, i, "x" * 100)
+            response = client.post("/validate/", files={"file": ("t.csv", CSV, "text/csv")})
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+        logger.remove(handler)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--records", type=int, default=100, help="Records logged per request")
+    parser.add_argument("--rotation-mb", type=float, default=1)
+    parser.add_argument("--json", action="store_true", help="Serialize records as JSON lines")
+    args = parser.parse_args()
+
+    rotation = int(args.rotation_mb * 2**20)
+    for mode in ("sync", "async-block", "async-drop"):
+        latencies = sorted(run(mode, args.requests, args.records, rotation, args.json))
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{mode:<12} p50 {statistics.median(latencies):7.2f} ms  p99 {p99:7.2f} ms  "
+            f"max {latencies[-1]:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
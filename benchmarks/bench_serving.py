@@ -0,0 +1,113 @@
+"""Benchmark concurrent /validate throughput of the API under gunicorn, by number of workers.
+
+For each worker count, the server is started with ``gunicorn.conf.py`` and --concurrency clients
+post --requests uploads of a generated CSV, while /health is polled to show whether the server
+stays responsive. Requests refused with 429 are counted separately from completed ones.
+
+Usage:
+    uv run python -m benchmarks.bench_serving --workers 1 4 --rows 100k --requests 64
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from benchmarks.data import make_records, parse_rows
+
+BIND = "127.0.0.1:8765"
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    """Start gunicorn with `workers` workers and wait until it answers /health."""
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "BIND": BIND}
+    argv = [sys.executable, "-m", "gunicorn", "src.api.main:app", "-c", "gunicorn.conf.py"]
+    server = subprocess.Popen(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://{BIND}/health").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("The server did not start within 60s")
+
+
+def run(workers: int, body: bytes, requests: int, concurrency: int) -> dict[str, float]:
+    """Send the uploads and return the throughput, latencies and /health latency."""
+    server = start_server(workers)
+    latencies: list[float] = []
+    health: list[float] = []
+    refused = 0
+    done = threading.Event()
+
+    def upload(client: httpx.Client) -> None:
+        nonlocal refused
+        start = time.perf_counter()
+        response = client.post(
+            f"http://{BIND}/validate/", files={"file": ("input.csv", body, "text/csv")}
+        )
+        if response.status_code == 429:
+            refused += 1
+            return
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    def poll_health() -> None:
+        with httpx.Client() as client:
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get(f"http://{BIND}/health").raise_for_status()
+                health.append(time.perf_counter() - start)
+                time.sleep(0.05)
+
+    try:
+        poller = threading.Thread(target=poll_health)
+        poller.start()
+        with httpx.Client(timeout=300) as client, ThreadPoolExecutor(concurrency) as pool:
+            start = time.perf_counter()
+            list(pool.map(lambda _: upload(client), range(requests)))
+            elapsed = time.perf_counter() - start
+        done.set()
+        poller.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        "refused": refused,
+        "health_max": max(health, default=0.0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--rows", type=parse_rows, default="100k", help="Rows per upload")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    body = make_records(args.rows).write_csv().encode()
+    for workers in args.workers:
+        r = run(workers, body, args.requests, args.concurrency)
+        print(
+            f"workers={workers:<3} {r['throughput']:7.1f} req/s  p50 {r['p50'] * 1000:8.1f} ms  "
+            f"p99 {r['p99'] * 1000:8.1f} ms  refused {r['refused']:3d}  "
+            f"/health max {r['health_max'] * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark CLI startup: wall time and `-X importtime` cost of light commands.
+
+Each command is run in a fresh interpreter with ``-X importtime``. The budget applies to the wall
+time of the fastest run, interpreter startup included, since that is what a user waits for. The
+import cost, the sum of the cumulative times of the command's top-level imports, is reported
+alongside to show where the time goes. The run fails if any command exceeds the budget or loads
+one of the heavy subsystems it should not need.
+
+Usage:
+    uv run python -m benchmarks.bench_startup --budget-ms 200
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+# Light commands and the heavy modules they must not import.
+COMMANDS: dict[str, tuple[str, ...]] = {
+    "--help": ("polars", "duckdb", "boto3", "snowflake.connector", "pydantic_settings", "rich"),
+    "etl --help": ("polars", "duckdb", "boto3", "snowflake.connector", "rich"),
+    "analytics --help": ("polars", "duckdb", "boto3", "snowflake.connector", "rich"),
+}
+
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def top_level_imports(stderr: str) -> dict[str, float]:
+    """Parse `-X importtime` output into the cumulative cost (ms) of each top-level import.
+
+    Nested imports are left out, since they are included in the cumulative time of their parent.
+    """
+    modules: dict[str, float] = {}
+    for match in _LINE.finditer(stderr):
+        cumulative, indent, name = match.groups()
+        if len(indent) == 1:
+            modules[name] = modules.get(name, 0) + int(cumulative) / 1000
+    return modules
+
+
+def measure(command: str, startup: set[str]) -> tuple[float, float, dict[str, float], set[str]]:
+    """Run a CLI command once.
+
+    Returns:
+        The wall time and import time (ms), the cost of each top-level import and the names of
+        all imported modules. Modules in `startup`, which the bare interpreter imports anyway,
+        are not counted.
+    """
+    argv = [sys.executable, "-X", "importtime", "-m", "src.cli.app", *command.split()]
+    start = time.perf_counter()
+    result = subprocess.run(argv, capture_output=True, text=True, check=True)
+    wall = (time.perf_counter() - start) * 1000
+    modules = {
+        name: ms for name, ms in top_level_imports(result.stderr).items() if name not in startup
+    }
+    names = {match.group(3) for match in _LINE.finditer(result.stderr)}
+    return wall, sum(modules.values()), modules, names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=200.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Most expensive imports to list")
+    args = parser.parse_args()
+
+    bare = [sys.executable, "-X", "importtime", "-m", "runpy"]
+    startup = set(top_level_imports(subprocess.run(bare, capture_output=True, text=True).stderr))
+
+    failed = False
+    for command, forbidden in COMMANDS.items():
+        runs = [measure(command, startup) for _ in range(args.repeat)]
+        wall, imports, modules, names = min(runs, key=lambda run: run[0])
+        heavy = [m for m in forbidden if any(n == m or n.startswith(f"{m}.") for n in names)]
+        over = wall > args.budget_ms
+        failed |= over or bool(heavy)
+        status = "FAIL" if over or heavy else "ok"
+        print(f"{command:<18} wall {wall:7.1f} ms  imports {imports:7.1f} ms  {status}")
+        for name, ms in sorted(modules.items(), key=lambda item: -item[1])[: args.top]:
+            print(f"    {ms:7.1f} ms  {name}")
+        if heavy:
+            print(f"    loads heavy modules: {', '.join(heavy)}")
+
+    if failed:
+        sys.exit(f"startup budget of {args.budget_ms:.0f} ms exceeded")
+
+
+if __name__ == "__main__":
+    main()
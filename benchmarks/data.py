@@ -0,0 +1,128 @@
+"""Seeded generator of synthetic `Record`-shaped datasets for the benchmarks.
+
+Rows have an ``id``, ``email`` and ``age`` column. About `error_rate` of them break one rule of
+the Record model (a malformed email, an age out of range or a negative id), and about
+`null_rate` of them have one of their values missing. The values are derived from hashes of the
+row number, so a given seed always produces the same data, and even 10M rows are generated in
+a few seconds without a Python loop.
+
+Usage:
+    uv run python -m benchmarks.data --rows 1m --format parquet
+"""
+
+import argparse
+from pathlib import Path
+
+import polars as pl
+
+from src.core.config import settings
+
+# Dataset sizes accepted wherever a row count is expected.
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+FORMATS = ("csv", "parquet")
+
+
+def parse_rows(value: str) -> int:
+    """Parse a row count given as a number or as one of `SIZES`."""
+    return SIZES.get(value.lower()) or int(value)
+
+
+def _uniform(seed: int) -> pl.Expr:
+    """Expression drawing a number in [0, 1) for every row, reproducibly for a given seed."""
+    return (pl.col("n").hash(seed) % 1_000_000) / 1_000_000
+
+
+def make_records(
+    rows: int, error_rate: float = 0.01, null_rate: float = 0.0, seed: int = 42
+) -> pl.DataFrame:
+    """Generate a Record-shaped frame.
+
+    Args:
+        rows: Number of rows.
+        error_rate: Approximate fraction of rows that fail validation.
+        null_rate: Approximate fraction of rows with one missing value.
+        seed: Seed of the generator.
+
+    Returns:
+        A frame with Int64 ``id`` and ``age`` columns and a String ``email`` column.
+    """
+    n = pl.col("n")
+    bad, kind = _uniform(seed) < error_rate, (_uniform(seed + 1) * 3).cast(pl.Int8)
+    missing, column = _uniform(seed + 2) < null_rate, (_uniform(seed + 3) * 3).cast(pl.Int8)
+    age = (_uniform(seed + 4) * 119).cast(pl.Int64) + 1
+    bad_age = pl.when(_uniform(seed + 5) < 0.5).then(0).otherwise(120 + (age % 50))
+
+    def field(index: int, value: pl.Expr, invalid: pl.Expr) -> pl.Expr:
+        value = pl.when(bad & (kind == index)).then(invalid).otherwise(value)
+        return pl.when(missing & (column == index)).then(None).otherwise(value)
+
+    return pl.DataFrame({"n": pl.int_range(1, rows + 1, dtype=pl.Int64, eager=True)}).select(
+        field(0, n, -n).alias("id"),
+        field(
+            1,
+            pl.format("user{}@example.com", n),
+            pl.format("user{}-at-example.com", n),
+        ).alias("email"),
+        field(2, age, bad_age).alias("age"),
+    )
+
+
+def write_records(
+    rows: int,
+    fmt: str = "csv",
+    error_rate: float = 0.01,
+    null_rate: float = 0.0,
+    seed: int = 42,
+    directory: str | Path | None = None,
+) -> Path:
+    """Write a generated dataset to a file, reusing it if it already exists.
+
+    The file name encodes every parameter, so a dataset is generated once and then shared by
+    all benchmark runs that ask for the same one.
+
+    Args:
+        rows: Number of rows.
+        fmt: ``"csv"`` or ``"parquet"``.
+        error_rate: Approximate fraction of rows that fail validation.
+        null_rate: Approximate fraction of rows with one missing value.
+        seed: Seed of the generator.
+        directory: Where to write the file; defaults to ``<data_dir>/bench``.
+
+    Returns:
+        The path of the file.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}, not {fmt!r}")
+    directory = Path(directory or f"{settings.data_dir}/bench")
+    path = directory / f"records-{rows}-e{error_rate:g}-n{null_rate:g}-s{seed}.{fmt}"
+    if path.exists():
+        return path
+    directory.mkdir(parents=True, exist_ok=True)
+    df = make_records(rows, error_rate, null_rate, seed)
+    tmp = path.with_name(f".{path.name}.tmp")
+    if fmt == "csv":
+        df.write_csv(tmp)
+    else:
+        df.write_parquet(tmp)
+    tmp.replace(path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default="1m", help="Count or 10k/100k/1m/10m")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--null-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", help="Defaults to <data_dir>/bench")
+    args = parser.parse_args()
+
+    path = write_records(
+        args.rows, args.format, args.error_rate, args.null_rate, args.seed, args.output_dir
+    )
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Local stand-ins for external services, so the S3 and Snowflake paths can be benchmarked.
+
+S3 is served by moto's in-memory implementation. Snowflake is replaced by the
+`tests.fakes.FakeConnection` the Snowflake tests use, so the client-side work of a load is
+measured and the warehouse is not.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from src.core.config import settings
+from tests.fakes import FakeConnection
+
+BUCKET = "bench-bucket"
+
+
+@contextmanager
+def fake_s3() -> Iterator:
+    """Point the S3 settings at a moto bucket named `BUCKET` and yield the shared client."""
+    from moto import mock_aws
+
+    from src.etl.s3 import get_s3_client
+
+    settings.aws_access_key_id = settings.aws_secret_access_key = "bench"
+    settings.aws_region = "us-east-1"
+    settings.s3_bucket = BUCKET
+    settings.s3_endpoint_url = None
+    get_s3_client.cache_clear()
+    with mock_aws():
+        client = get_s3_client()
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+    get_s3_client.cache_clear()
+
+
+@contextmanager
+def fake_snowflake() -> Iterator[None]:
+    """Route Snowflake connections to a `FakeConnection` for the duration of the block."""
+    import snowflake.connector
+
+    from src.etl.snowflake import close_session
+
+    for name in ("account", "user", "password", "warehouse", "database", "schema"):
+        setattr(settings, f"snowflake_{name}", "bench")
+    connect = snowflake.connector.connect
+    snowflake.connector.connect = lambda **kwargs: FakeConnection(keep_rows=False)
+    close_session()
+    try:
+        yield
+    finally:
+        close_session()
+        snowflake.connector.connect = connect
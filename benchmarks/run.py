@@ -0,0 +1,289 @@
+"""Run the pipeline benchmark suite, write the results as JSON and compare them with a baseline.
+
+Every case runs in a fresh process on the same generated dataset (see `benchmarks.data`):
+
+- ``validate``: POST the CSV to ``/validate``.
+- ``etl``: `extract_local`, `filter_adults` and `load_parquet`.
+- ``dq``: `run_dq` on the CSV.
+- ``query``: `run_query` aggregating the Parquet copy, exported as Arrow IPC.
+- ``s3``: `download_from_s3` of the CSV from a moto bucket.
+- ``snowflake``: `bulk_load_parquet` of the Parquet copy into a fake connection.
+
+Each case is run ``--warmup`` times and then timed ``--repeat`` times. The fastest run is
+compared with the baseline stored for the same host and row count in ``benchmarks/baselines``;
+a case regresses when it is more than ``--threshold`` slower, and then the exit status is 1.
+A missing baseline is an error too, unless ``--update-baseline`` records it.
+Timings depend on the machine, so baselines are named after the host that recorded them
+(``<hostname>-<rows>.json``): record one with ``--update-baseline`` on the machine that runs the
+comparison.
+
+Usage:
+    uv run python -m benchmarks.run --rows 1m
+    uv run python -m benchmarks.run --rows 1m --update-baseline
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, redirect_stdout
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+
+from benchmarks.data import parse_rows, write_records
+
+BASELINES = Path(__file__).parent / "baselines"
+RESULTS = Path(__file__).parent / "results"
+
+
+@dataclass
+class Workspace:
+    """Inputs of a case and a scratch directory that the settings point into."""
+
+    rows: int
+    csv: Path
+    parquet: Path
+    root: Path
+    stack: ExitStack
+
+
+# Each case prepares its inputs and returns the function to time.
+CASES: dict[str, Callable[[Workspace], Callable[[], object]]] = {}
+
+
+def case(name: str) -> Callable:
+    def register(setup: Callable[[Workspace], Callable[[], object]]) -> Callable:
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+@case("validate")
+def validate(ws: Workspace) -> Callable[[], object]:
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+
+    client = TestClient(app)
+    body = ws.csv.read_bytes()
+    return lambda: client.post(
+        "/validate/", files={"file": ("input.csv", body, "text/csv")}
+    ).raise_for_status()
+
+
+@case("etl")
+def etl(ws: Workspace) -> Callable[[], object]:
+    from src.etl.extract import extract_local
+    from src.etl.load import load_parquet
+    from src.etl.transform import filter_adults
+
+    output = str(ws.root / "processed" / "adults.parquet")
+    return lambda: load_parquet(filter_adults(extract_local("input.csv")), output)
+
+
+@case("dq")
+def dq(ws: Workspace) -> Callable[[], object]:
+    from src.dq.checks import run_dq
+
+    def run() -> None:
+        with redirect_stdout(io.StringIO()):
+            run_dq("input.csv")
+
+    return run
+
+
+@case("query")
+def query(ws: Workspace) -> Callable[[], object]:
+    from src.analytics.formats import OutputFormat
+    from src.analytics.query import run_query
+
+    sql = (
+        "SELECT age, count(*) AS users, count(DISTINCT email) AS emails, max(id) AS last_id "
+        f"FROM read_parquet('{ws.parquet}') GROUP BY age ORDER BY age"
+    )
+    output = str(ws.root / "query.arrow")
+    return lambda: run_query(sql, OutputFormat.ARROW, output)
+
+
+@case("s3")
+def s3(ws: Workspace) -> Callable[[], object]:
+    from benchmarks.fakes import BUCKET, fake_s3
+    from src.core.config import settings
+    from src.etl.s3 import download_from_s3
+
+    client = ws.stack.enter_context(fake_s3())
+    client.upload_file(str(ws.csv), BUCKET, "bench/input.csv")
+    settings.s3_cache_mb = 0  # measure the transfer, not the local cache
+    destination = str(ws.root / "s3")
+    return lambda: download_from_s3("bench/input.csv", destination)
+
+
+@case("snowflake")
+def snowflake(ws: Workspace) -> Callable[[], object]:
+    from benchmarks.fakes import fake_snowflake
+    from src.etl.snowflake import bulk_load_parquet
+
+    ws.stack.enter_context(fake_snowflake())
+    return lambda: bulk_load_parquet(ws.parquet, "BENCH.RECORDS")
+
+
+def run_case(
+    name: str, rows: int, csv: Path, parquet: Path, warmup: int, repeat: int
+) -> dict[str, float]:
+    """Time one case; meant to run in a fresh process, since it redirects the settings."""
+    from src.core.config import settings
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp, ExitStack() as stack:
+        root = Path(tmp)
+        (root / "raw").mkdir()
+        (root / "raw" / "input.csv").symlink_to(csv.resolve())
+        settings.log_level = "WARNING"
+        settings.log_file = str(root / "app.log")
+        settings.raw_dir = str(root / "raw")
+        settings.processed_dir = str(root / "processed")
+        settings.cache_dir = str(root / "cache")
+        settings.analytics_database = ":memory:"
+
+        from src.core.metrics import peak_rss_bytes, stage
+
+        run = CASES[name](Workspace(rows, csv, parquet, root, stack))
+        wall, cpu = [], []
+        for i in range(warmup + repeat):
+            with stage(f"bench.{name}") as stats:
+                run()
+            if i >= warmup:
+                wall.append(stats.wall_seconds)
+                cpu.append(stats.cpu_seconds)
+        return {
+            "seconds": min(wall),
+            "median_seconds": statistics.median(wall),
+            "cpu_seconds": statistics.median(cpu),
+            "rows_per_second": rows / min(wall),
+            "peak_rss_mb": peak_rss_bytes() / 2**20,
+        }
+
+
+@dataclass
+class Comparison:
+    case: str
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float, min_delta: float = 0.005
+) -> list[Comparison]:
+    """Compare the fastest run of each case present in both results.
+
+    A case regresses when it is more than `threshold` (a fraction) and `min_delta` seconds
+    slower than its baseline; the absolute floor keeps millisecond-scale noise from failing a
+    run.
+    """
+    comparisons = []
+    for name, result in current["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        before, after = baseline["cases"][name]["seconds"], result["seconds"]
+        regressed = after > before * (1 + threshold) and after - before > min_delta
+        comparisons.append(Comparison(name, before, after, regressed))
+    return comparisons
+
+
+def default_baseline(rows: int) -> Path:
+    """Return where the baseline of this host for `rows` rows is stored."""
+    return BASELINES / f"{platform.node() or 'unknown'}-{rows}.json"
+
+
+def environment() -> dict[str, str | int | None]:
+    import duckdb
+    import polars as pl
+
+    return {
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "polars": pl.__version__,
+        "duckdb": duckdb.__version__,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default="1m", help="Count or 10k/100k/1m/10m")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--null-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown")
+    parser.add_argument("--output", help="Results file; defaults to benchmarks/results/")
+    parser.add_argument(
+        "--baseline", help="Defaults to benchmarks/baselines/<hostname>-<rows>.json"
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    params = (args.error_rate, args.null_rate, args.seed)
+    csv = write_records(args.rows, "csv", *params)
+    parquet = write_records(args.rows, "parquet", *params)
+    results = {
+        "rows": args.rows,
+        "error_rate": args.error_rate,
+        "null_rate": args.null_rate,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "cases": {},
+    }
+    for name in args.cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(
+                run_case, name, args.rows, csv, parquet, args.warmup, args.repeat
+            ).result()
+        results["cases"][name] = result
+        print(
+            f"{name:<10} {result['seconds']:8.3f}s  median {result['median_seconds']:8.3f}s  "
+            f"{result['rows_per_second']:12,.0f} rows/s  peak RSS {result['peak_rss_mb']:6.0f} MB"
+        )
+
+    output = Path(args.output or RESULTS / f"{args.rows}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+    baseline_path = Path(args.baseline) if args.baseline else default_baseline(args.rows)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {baseline_path}")
+        return
+    if not baseline_path.exists():
+        sys.exit(f"No baseline at {baseline_path}; record one with --update-baseline")
+
+    comparisons = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+    for c in comparisons:
+        verdict = "REGRESSION" if c.regressed else "ok"
+        print(f"{c.case:<10} {c.baseline:8.3f}s -> {c.current:8.3f}s  {c.change:+7.1%}  {verdict}")
+    if any(c.regressed for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Gunicorn settings for serving the API from several Uvicorn worker processes.
+
+Each worker is a separate process with its own event loop, validation pool and metrics, so
+CPU-bound requests scale with the number of cores. ``WEB_CONCURRENCY`` sets the number of
+workers (default: one per core) and ``BIND`` the listening address.
+
+Usage:
+    uv run gunicorn src.api.main:app -c gunicorn.conf.py
+"""
+
+import os
+
+cores = os.cpu_count() or 1
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", cores))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Share the cores between the workers' Polars thread pools instead of giving each all of them.
+# Each worker rotates its log file on its own, so give each its own file (app.<pid>.log).
+raw_env = [
+    f"POLARS_MAX_THREADS={os.getenv('POLARS_MAX_THREADS', max(cores // workers, 1))}",
+    f"LOG_FILE_PER_PROCESS={os.getenv('LOG_FILE_PER_PROCESS', 'true')}",
+]
+
+# Large uploads can take a while; restart workers stuck for longer than this.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically so memory fragmentation from large frames cannot build up.
+max_requests = 1000
+max_requests_jitter = 100
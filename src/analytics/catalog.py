@@ -0,0 +1,242 @@
+"""Catalog of the Parquet datasets in the processed directory, registered as DuckDB views.
+
+Every top-level Parquet file and every directory of Parquet files (hive-partitioned or not)
+becomes a view named after it. Schemas and row counts are read from the Parquet footers once and
+cached under `settings.cache_dir`; later refreshes only re-read files whose size or modification
+time changed. Views list their files explicitly, so queries never pay for directory globbing,
+and DuckDB still prunes row groups (from the footer statistics) and hive partitions from
+filters.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pyarrow.parquet as pq
+
+from ..core.config import settings
+from ..core.logger import get_logger
+from ..core.utils import ensure_dir
+
+if TYPE_CHECKING:
+    from .engine import AnalyticsEngine
+
+logger = get_logger()
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+@dataclass
+class FileInfo:
+    """Footer metadata of one Parquet file."""
+
+    size: int
+    mtime_ns: int
+    num_rows: int
+    schema: dict[str, str]
+    num_row_groups: int = 0
+
+
+@dataclass
+class Dataset:
+    """A named Parquet dataset and the files it is made of."""
+
+    name: str
+    path: str
+    hive: bool
+    files: dict[str, FileInfo]
+
+    @property
+    def num_rows(self) -> int:
+        return sum(f.num_rows for f in self.files.values())
+
+    @property
+    def schema(self) -> dict[str, str]:
+        merged: dict[str, str] = {}
+        for info in self.files.values():
+            merged.update(info.schema)
+        return merged
+
+
+def dataset_name(path: Path) -> str:
+    """Turn a file or directory name into a lower-case SQL identifier."""
+    name = re.sub(r"\W+", "_", path.name.removesuffix(".parquet")).strip("_").lower()
+    return name if name and not name[0].isdigit() else f"t_{name}"
+
+
+def read_file_info(path: str | Path) -> FileInfo:
+    """Read the schema, row count and number of row groups from a Parquet footer."""
+    stat = os.stat(path)
+    metadata = pq.read_metadata(path)
+    schema = metadata.schema.to_arrow_schema()
+    return FileInfo(
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        num_rows=metadata.num_rows,
+        schema={f.name: str(f.type) for f in schema},
+        num_row_groups=metadata.num_row_groups,
+    )
+
+
+def discover(root: str | Path) -> dict[str, tuple[Path, list[Path], bool]]:
+    """Find the datasets under `root`.
+
+    A file and a directory (or two names differing only in punctuation or case) can map to the
+    same view name; the first in sorted order keeps the name and the others are skipped with a
+    warning.
+
+    Returns:
+        Mapping of view name to the dataset path, its Parquet files and whether its directory
+        layout is hive-partitioned.
+    """
+    found: dict[str, tuple[Path, list[Path], bool]] = {}
+    root = Path(root)
+    if not root.is_dir():
+        return found
+    for entry in sorted(root.iterdir()):
+        if entry.is_file() and entry.suffix == ".parquet":
+            dataset = (entry, [entry], False)
+        elif entry.is_dir() and not entry.name.endswith(".staging"):
+            files = sorted(entry.rglob("*.parquet"))
+            if not files:
+                continue
+            hive = any("=" in part for part in files[0].relative_to(entry).parts[:-1])
+            dataset = (entry, files, hive)
+        else:
+            continue
+        name = dataset_name(entry)
+        if name in found:
+            logger.warning(
+                f"{entry} and {found[name][0]} both map to the view {name!r}; skipping {entry}"
+            )
+            continue
+        found[name] = dataset
+    return found
+
+
+class Catalog:
+    """Parquet datasets of the processed directory, kept in sync with views in an engine.
+
+    Args:
+        engine: Analytics engine whose database holds the views.
+        root: Directory to scan; defaults to `settings.processed_dir`.
+        state_path: Location of the cached metadata; defaults to ``catalog.json`` in
+            `settings.cache_dir`.
+        refresh_seconds: Minimum interval between automatic refreshes in `maybe_refresh`.
+    """
+
+    VERSION = 2
+
+    def __init__(
+        self,
+        engine: "AnalyticsEngine",
+        root: str | None = None,
+        state_path: str | None = None,
+        refresh_seconds: float = 30.0,
+    ):
+        self.engine = engine
+        self.root = Path(root or settings.processed_dir).resolve()
+        self.state_path = Path(state_path or f"{settings.cache_dir}/catalog.json")
+        self.refresh_seconds = refresh_seconds
+        self.datasets: dict[str, Dataset] = self._load_state()
+        self._last_refresh = float("-inf")
+        self._lock = threading.RLock()
+
+    def refresh(self) -> list[str]:
+        """Rescan the root directory and update views whose files changed.
+
+        Returns:
+            Names of the views that were created, replaced or dropped.
+        """
+        with self._lock:
+            existing = self._existing_views()
+            changed = []
+            found = discover(self.root)
+            for name, (path, files, hive) in list(found.items()):
+                previous = self.datasets.get(name)
+                infos = {}
+                for f in files:
+                    old = previous.files.get(str(f)) if previous else None
+                    try:
+                        stat = os.stat(f)
+                        if old and old.size == stat.st_size and old.mtime_ns == stat.st_mtime_ns:
+                            infos[str(f)] = old
+                        else:
+                            infos[str(f)] = read_file_info(f)
+                    except FileNotFoundError:
+                        continue  # deleted since the directory was listed
+                if not infos:
+                    del found[name]
+                    continue
+                dataset = Dataset(name=name, path=str(path), hive=hive, files=infos)
+                if previous != dataset or name not in existing:
+                    self._create_view(dataset)
+                    changed.append(name)
+                self.datasets[name] = dataset
+
+            for name in set(self.datasets) - set(found):
+                with self.engine.cursor() as cur:
+                    cur.execute(f'DROP VIEW IF EXISTS "{name}"')
+                del self.datasets[name]
+                changed.append(name)
+
+            if changed:
+                self.engine.cache.clear()
+                self._save_state()
+                logger.info(f"Catalog refreshed views: {', '.join(sorted(changed))}")
+            self._last_refresh = time.monotonic()
+            return changed
+
+    def maybe_refresh(self) -> None:
+        """Refresh if the last refresh is older than `refresh_seconds`."""
+        if time.monotonic() - self._last_refresh >= self.refresh_seconds:
+            self.refresh()
+
+    def files_for_sql(self, sql: str) -> list[str]:
+        """Return the files behind every catalog view mentioned in `sql`."""
+        words = {w.lower() for w in _IDENTIFIER.findall(_STRING_LITERAL.sub("", sql))}
+        return [f for name in sorted(words & set(self.datasets)) for f in self.datasets[name].files]
+
+    def _create_view(self, dataset: Dataset) -> None:
+        files = ", ".join("'" + f.replace("'", "''") + "'" for f in dataset.files)
+        hive = "true" if dataset.hive else "false"
+        with self.engine.cursor() as cur:
+            cur.execute(
+                f'CREATE OR REPLACE VIEW "{dataset.name}" AS SELECT * FROM read_parquet('
+                f"[{files}], hive_partitioning = {hive}, union_by_name = true)"
+            )
+
+    def _existing_views(self) -> set[str]:
+        with self.engine.cursor() as cur:
+            rows = cur.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()
+        return {row[0] for row in rows}
+
+    def _load_state(self) -> dict[str, Dataset]:
+        try:
+            data = json.loads(self.state_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if data.get("version") != self.VERSION or data.get("root") != str(self.root):
+            return {}
+        datasets = {}
+        for name, d in data["datasets"].items():
+            files = {path: FileInfo(**info) for path, info in d["files"].items()}
+            datasets[name] = Dataset(name=name, path=d["path"], hive=d["hive"], files=files)
+        return datasets
+
+    def _save_state(self) -> None:
+        ensure_dir(self.state_path.parent)
+        data = {
+            "version": self.VERSION,
+            "root": str(self.root),
+            "datasets": {name: asdict(d) for name, d in self.datasets.items()},
+        }
+        tmp = self.state_path.with_name(f"{self.state_path.name}.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.state_path)
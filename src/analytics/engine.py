@@ -0,0 +1,313 @@
+"""Long-lived DuckDB analytics engine with a cursor pool and a query-result cache."""
+
+import glob
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import duckdb
+import polars as pl
+import pyarrow as pa
+
+from ..core.config import settings
+from ..core.logger import get_logger
+from ..core.utils import ensure_dir
+from .catalog import Catalog
+
+logger = get_logger()
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_READ_ONLY = re.compile(
+    r"^\s*\(?\s*(select|with|from|values|show|describe|summarize|pivot)\b", re.I
+)
+
+# Functions (and clauses) whose result can differ between executions of the same statement.
+_VOLATILE = re.compile(
+    r"\b(random|setseed|uuid|uuidv4|uuidv7|gen_random_uuid|nextval|currval|now|today"
+    r"|current_(date|time|timestamp|localtime|localtimestamp|query|query_id|transaction_id"
+    r"|connection_id)|localtime|localtimestamp|get_current_time|get_current_timestamp"
+    r"|transaction_timestamp|txid_current)\b|\busing\s+sample\b|\btablesample\b",
+    re.I,
+)
+
+CacheKey = tuple[str, tuple[tuple[str, int, int], ...]]
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside string literals and drop a trailing semicolon."""
+    parts = _STRING_LITERAL.split(sql.strip().rstrip(";").strip())
+    return "".join(p if i % 2 else re.sub(r"\s+", " ", p) for i, p in enumerate(parts)).strip()
+
+
+def referenced_files(sql: str) -> list[str]:
+    """Return the local files named (directly or by glob) in the string literals of `sql`."""
+    files: set[str] = set()
+    for literal in _STRING_LITERAL.findall(sql):
+        value = literal[1:-1].replace("''", "'")
+        if any(c in value for c in "*?["):
+            files.update(p for p in glob.glob(value, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(value):
+            files.add(value)
+    return sorted(files)
+
+
+def cache_key(sql: str, extra_files: list[str] | None = None) -> CacheKey:
+    """Build a result-cache key from the normalised SQL and the state of referenced files.
+
+    Any change to the size or modification time of a file the query reads yields a new key, so
+    stale results are never served.
+
+    Args:
+        sql: The SQL statement.
+        extra_files: Files read through views rather than named in the SQL itself.
+    """
+    state = []
+    for path in sorted(set(referenced_files(sql)) | set(extra_files or [])):
+        stat = os.stat(path)
+        state.append((path, stat.st_mtime_ns, stat.st_size))
+    return normalize_sql(sql), tuple(state)
+
+
+def is_read_only(sql: str) -> bool:
+    """Return True if the statement only reads data and its result may be cached."""
+    return bool(_READ_ONLY.match(sql)) and ";" not in normalize_sql(_STRING_LITERAL.sub("''", sql))
+
+
+def is_deterministic(sql: str) -> bool:
+    """Return False if the statement calls a volatile function such as ``random()`` or ``now()``.
+
+    Such statements return a different result on every execution, so they are never cached.
+    """
+    return not _VOLATILE.search(_STRING_LITERAL.sub("''", sql))
+
+
+class ResultCache:
+    """Thread-safe LRU cache of query results bounded by their total in-memory size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, tuple[pa.Table, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> pa.Table | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: CacheKey, table: pa.Table) -> None:
+        nbytes = table.nbytes
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (table, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AnalyticsEngine:
+    """A persistent DuckDB database shared by a fixed pool of cursors.
+
+    All cursors belong to one database instance, so the catalog, Parquet metadata and buffer
+    pool stay warm across queries. Results of deterministic read-only queries are cached by
+    `ResultCache`, which lives in memory and so only pays off in a long-running process.
+
+    Args:
+        database: Path of the DuckDB database file, or ``":memory:"``.
+        pool_size: Number of cursors available for concurrent queries.
+        cache_bytes: Maximum total size of cached results; 0 disables the cache.
+        allowed_directories: If given, the database may only read files under these directories.
+            Access to any other file or URL, ATTACH, COPY and extensions are refused, and the
+            configuration is locked so that SQL cannot undo this. These settings apply to the
+            whole database instance, so it must not be shared with another engine; use
+            ``":memory:"``.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        pool_size: int = 4,
+        cache_bytes: int = 256 * 2**20,
+        allowed_directories: list[str] | None = None,
+    ):
+        if database != ":memory:":
+            ensure_dir(Path(database).parent)
+        try:
+            self._connection = duckdb.connect(database)
+        except duckdb.IOException as e:
+            # Another process holds the write lock on the database file.
+            logger.warning(f"Cannot open {database} ({e}); using an in-memory database")
+            database = ":memory:"
+            self._connection = duckdb.connect(database)
+        self.database = database
+        self.pool_size = pool_size
+        self._connection.execute("SET enable_object_cache = true")
+        if allowed_directories is not None:
+            # A trailing separator keeps "/data/processed" from also allowing "/data/processed2".
+            dirs = ", ".join(
+                "'" + os.path.join(Path(d).resolve(), "").replace("'", "''") + "'"
+                for d in allowed_directories
+            )
+            self._connection.execute(f"SET allowed_directories = [{dirs}]")
+            self._connection.execute("SET enable_external_access = false")
+            self._connection.execute("SET lock_configuration = true")
+        self._pool: queue.LifoQueue[duckdb.DuckDBPyConnection] = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(self._connection.cursor())
+        self.cache = ResultCache(cache_bytes)
+        self.catalog: Catalog | None = None
+
+    @contextmanager
+    def cursor(self, timeout: float | None = None) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Borrow a cursor from the pool, waiting up to `timeout` seconds for one to be free."""
+        try:
+            cur = self._pool.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No analytics cursor became available in time") from None
+        try:
+            yield cur
+        finally:
+            self._pool.put(cur)
+
+    def query_arrow(self, sql: str, use_cache: bool = True) -> pa.Table:
+        """Execute a SQL statement and return its result as an Arrow table.
+
+        Results come straight from DuckDB's Arrow interface without passing through Python
+        objects. Read-only statements are answered from the result cache when possible, unless they
+        call a volatile function (see `is_deterministic`); any other statement may change data,
+        so it clears the cache.
+
+        Args:
+            sql: The SQL statement to execute.
+            use_cache: Whether to consult and populate the result cache.
+        """
+        view_files = None
+        if self.catalog is not None:
+            self.catalog.maybe_refresh()
+            view_files = self.catalog.files_for_sql(sql)
+
+        key = None
+        if use_cache and self.cache.max_bytes and is_read_only(sql) and is_deterministic(sql):
+            try:
+                key = cache_key(sql, view_files)
+            except FileNotFoundError:
+                # A file was deleted since the last catalog refresh: update the views so they no
+                # longer read it, and run the query uncached.
+                if self.catalog is not None:
+                    self.catalog.refresh()
+        if key is not None and (table := self.cache.get(key)) is not None:
+            return table
+
+        with self.cursor() as cur:
+            table = cur.execute(sql).fetch_arrow_table()
+
+        if key is not None:
+            self.cache.put(key, table)
+        elif not is_read_only(sql):
+            self.cache.clear()
+        return table
+
+    def query(self, sql: str, use_cache: bool = True) -> pl.DataFrame:
+        """Execute a SQL statement and return its result as a Polars DataFrame.
+
+        The DataFrame is built from the Arrow result of `query_arrow`, sharing its buffers where
+        the types allow.
+        """
+        return pl.from_arrow(self.query_arrow(sql, use_cache))
+
+    @contextmanager
+    def record_batches(
+        self, sql: str, batch_size: int = 1_000_000
+    ) -> Iterator[pa.RecordBatchReader]:
+        """Stream the result of a query as Arrow record batches.
+
+        The cursor stays checked out until the context exits, so at most one batch of the result
+        is materialised at a time. Streamed results bypass the result cache.
+
+        Args:
+            sql: The SQL query to execute.
+            batch_size: Approximate number of rows per record batch.
+        """
+        with self.cursor() as cur:
+            reader = cur.execute(sql).fetch_record_batch(batch_size)
+            try:
+                yield reader
+            finally:
+                reader.close()
+
+    def close(self) -> None:
+        """Close every pooled cursor and the underlying database connection."""
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+        self._connection.close()
+
+
+_engine: AnalyticsEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AnalyticsEngine:
+    """Return the process-wide analytics engine, creating it on first use.
+
+    This engine serves the one-shot CLI commands, whose process ends after a single query, so
+    it is created without a result cache.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AnalyticsEngine(
+                settings.analytics_database or f"{settings.data_dir}/analytics.duckdb",
+                pool_size=settings.analytics_pool_size,
+                cache_bytes=0,
+            )
+            _engine.catalog = Catalog(_engine, refresh_seconds=settings.catalog_refresh_seconds)
+        return _engine
+
+
+_api_engine: AnalyticsEngine | None = None
+
+
+def get_api_engine() -> AnalyticsEngine:
+    """Return the process-wide engine that runs SQL submitted through the API, creating it once.
+
+    API callers are not trusted with the file system, so their queries run in a separate
+    in-memory database that can only read the processed directory, chiefly through the catalog
+    views. Tables stored in the CLI's database file are not visible to it.
+    """
+    global _api_engine
+    with _engine_lock:
+        if _api_engine is None:
+            _api_engine = AnalyticsEngine(
+                ":memory:",
+                pool_size=settings.analytics_pool_size,
+                cache_bytes=settings.analytics_cache_mb * 2**20,
+                allowed_directories=[settings.processed_dir],
+            )
+            _api_engine.catalog = Catalog(
+                _api_engine, refresh_seconds=settings.catalog_refresh_seconds
+            )
+        return _api_engine
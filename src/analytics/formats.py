@@ -0,0 +1,15 @@
+"""Output formats of analytics queries.
+
+Kept free of third-party imports so the CLI can declare its options without loading DuckDB.
+"""
+
+from enum import Enum
+
+
+class OutputFormat(str, Enum):
+    """Destination format for query results."""
+
+    TABLE = "table"  # pretty-printed to stdout
+    ARROW = "arrow"  # Arrow IPC file
+    PARQUET = "parquet"
+    CSV = "csv"
@@ -1,22 +1,74 @@
 """Analytics functions leveraging DuckDB for ad‑hoc SQL queries."""
 
-import duckdb
+import sys
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
 from ..core.logger import get_logger
+from ..core.metrics import record, timed
+from .engine import get_engine
+from .formats import OutputFormat
 
 logger = get_logger()
 
 
-def run_query(sql: str) -> None:
-    """Execute a SQL query using DuckDB and print the results.
+def export_query(sql: str, fmt: OutputFormat, output: str | None = None) -> int:
+    """Stream the result of a query to a file in Arrow IPC, Parquet or CSV format.
+
+    Record batches flow from DuckDB straight into the Arrow writer, so results larger than
+    memory can be exported without being materialised in Python objects.
+
+    Args:
+        sql: The SQL query to execute.
+        fmt: Output format; `OutputFormat.TABLE` is not supported here.
+        output: Destination path. CSV is written to stdout when omitted.
+
+    Returns:
+        The number of rows written.
+    """
+    if output is None and fmt is not OutputFormat.CSV:
+        raise ValueError(f"An output path is required for the {fmt.value} format")
+
+    rows = 0
+    with get_engine().record_batches(sql) as reader:
+        if fmt is OutputFormat.PARQUET:
+            writer = pq.ParquetWriter(output, reader.schema)
+        elif fmt is OutputFormat.ARROW:
+            writer = pa.ipc.new_file(output, reader.schema)
+        elif fmt is OutputFormat.CSV:
+            writer = pa_csv.CSVWriter(output or sys.stdout.buffer, reader.schema)
+        else:
+            raise ValueError(f"Cannot export to the {fmt.value} format")
+        try:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            writer.close()
+    logger.info(f"Exported {rows} rows as {fmt.value} to {output or 'stdout'}")
+    return rows
+
+
+@timed("query")
+def run_query(sql: str, fmt: OutputFormat = OutputFormat.TABLE, output: str | None = None) -> None:
+    """Execute a SQL query using DuckDB and print or export the results.
+
+    Queries run on the shared analytics engine, whose database file keeps its state between
+    calls.
 
     Args:
         sql: The SQL query to execute.
+        fmt: How to emit the result; anything but `OutputFormat.TABLE` is streamed by
+            `export_query`.
+        output: Destination path for exported results.
     """
     logger.info(f"Running analytics query: {sql}")
-    con = duckdb.connect()
-    try:
-        df = con.execute(sql).df()
-        print(df)
-    finally:
-        con.close()
+    if fmt is not OutputFormat.TABLE:
+        record(rows=export_query(sql, fmt, output))
+        return
+    df: pl.DataFrame = get_engine().query(sql)
+    record(rows=len(df))
+    print(df)
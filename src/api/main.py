@@ -2,16 +2,20 @@
 
 from fastapi import FastAPI
 
+from .routers.metrics import router as metrics_router
+from .routers.query import router as query_router
 from .routers.validate import router as validate_router
 
 app = FastAPI(
     title="Enterprise Data Platform API",
-    description="API for data validation and operations",
+    description="API for data validation, analytics queries and operations",
     version="1.0.0",
 )
 
 # Include routers
 app.include_router(validate_router)
+app.include_router(query_router)
+app.include_router(metrics_router)
 
 
 @app.get("/health")
@@ -1,11 +1,27 @@
 """API models used by FastAPI endpoints."""
 
-from pydantic import BaseModel, EmailStr, Field
+from enum import Enum
 
+from pydantic import BaseModel, Field
 
-class Record(BaseModel):
-    """Schema representing a simple record with id, email and age."""
+from ..core.models import Record
 
-    id: int = Field(..., gt=0)
-    email: EmailStr
-    age: int = Field(..., gt=0, lt=120)
+__all__ = ["QueryFormat", "QueryRequest", "Record"]
+
+
+class QueryFormat(str, Enum):
+    """Encoding of streamed query results."""
+
+    ARROW = "arrow"  # Arrow IPC stream
+    NDJSON = "ndjson"
+
+
+class QueryRequest(BaseModel):
+    """A read-only SQL query to run on the analytics engine."""
+
+    sql: str = Field(..., min_length=1)
+    format: QueryFormat = QueryFormat.ARROW
+    timeout: float | None = Field(
+        default=None, gt=0, description="Seconds before the query is cancelled"
+    )
+    batch_size: int = Field(default=65_536, gt=0, le=1_000_000)
@@ -0,0 +1,20 @@
+"""API router exposing stage metrics to Prometheus."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ...core.metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Return the timings, rows and bytes of every measured stage in Prometheus text format.
+
+    Measurements are kept per process, so with several server workers each scrape sees the
+    worker that answered it.
+    """
+    return PlainTextResponse(registry.render_prometheus(), media_type=CONTENT_TYPE)
@@ -0,0 +1,230 @@
+"""API router running read-only analytics SQL and streaming the results."""
+
+import asyncio
+import io
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, closing
+from typing import TypeVar
+
+import duckdb
+import polars as pl
+import pyarrow as pa
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ...analytics.engine import get_api_engine, is_read_only
+from ...core.config import settings
+from ...core.logger import get_logger
+from ..models import QueryFormat, QueryRequest
+
+router = APIRouter(prefix="/query", tags=["query"])
+logger = get_logger()
+
+MEDIA_TYPES = {
+    QueryFormat.ARROW: "application/vnd.apache.arrow.stream",
+    QueryFormat.NDJSON: "application/x-ndjson",
+}
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_slots: asyncio.Semaphore | None = None
+_init_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool that executes queries and encodes their results."""
+    global _executor
+    with _init_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.query_workers, thread_name_prefix="query")
+        return _executor
+
+
+def get_slots() -> asyncio.Semaphore:
+    """Return the semaphore limiting in-flight queries to the number of pooled cursors."""
+    global _slots
+    with _init_lock:
+        if _slots is None:
+            _slots = asyncio.Semaphore(get_api_engine().pool_size)
+        return _slots
+
+
+class QueryStream:
+    """A query running on a pooled cursor whose result is read and encoded in worker threads.
+
+    Every blocking step runs on the executor and is bounded by the request deadline. When the
+    deadline passes or the client goes away, the DuckDB cursor is interrupted and returned to the
+    pool once the worker thread has let go of it.
+
+    Args:
+        sql: Read-only SQL statement.
+        fmt: Encoding of the streamed chunks.
+        batch_size: Approximate number of rows per chunk.
+        deadline: `time.monotonic()` value after which the query is cancelled.
+        on_close: Called once the stream is closed and the cursor is back in the pool, from the
+            worker thread if the cursor was still in use when `close` was called.
+    """
+
+    def __init__(
+        self,
+        sql: str,
+        fmt: QueryFormat,
+        batch_size: int,
+        deadline: float,
+        on_close: Callable[[], None] = lambda: None,
+    ):
+        self.sql = sql
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self.on_close = on_close
+        self.rows = 0
+        self._stack = ExitStack()
+        self._cursor: duckdb.DuckDBPyConnection | None = None
+        self._reader: pa.RecordBatchReader | None = None
+        self._sink = io.BytesIO()
+        self._writer: pa.ipc.RecordBatchStreamWriter | None = None
+        self._future: Future | None = None
+        self._finished = False
+        self._closed = False
+
+    async def start(self) -> bytes:
+        """Execute the query and return the first chunk of the response (the Arrow schema)."""
+        return await self._run(self._execute)
+
+    async def next_chunk(self) -> bytes | None:
+        """Return the next encoded chunk, or None once the result is exhausted."""
+        if self._finished:
+            return None
+        return await self._run(self._read)
+
+    def close(self) -> None:
+        """Release the cursor, interrupting the query if a worker is still running it."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._future is not None and not self._future.done():
+            if self._cursor is not None:
+                self._cursor.interrupt()
+            self._future.add_done_callback(lambda _: self._release())
+        else:
+            self._release()
+
+    def _release(self) -> None:
+        self._stack.close()
+        self.on_close()
+
+    async def _run(self, step: Callable[[], T]) -> T:
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError
+        self._future = get_executor().submit(step)
+        return await asyncio.wait_for(asyncio.wrap_future(self._future), remaining)
+
+    def _execute(self) -> bytes:
+        engine = get_api_engine()
+        if engine.catalog is not None:
+            engine.catalog.maybe_refresh()
+        cursor = self._stack.enter_context(engine.cursor())
+        self._cursor = cursor
+        if self._closed:
+            raise TimeoutError
+        reader = cursor.execute(self.sql).fetch_record_batch(self.batch_size)
+        self._reader = self._stack.enter_context(closing(reader))
+        if self.fmt is QueryFormat.ARROW:
+            self._writer = pa.ipc.new_stream(self._sink, reader.schema)
+        return self._drain()
+
+    def _read(self) -> bytes:
+        try:
+            batch = self._reader.read_next_batch()
+        except StopIteration:
+            self._finished = True
+            if self._writer is not None:
+                self._writer.close()
+            return self._drain()
+        self.rows += batch.num_rows
+        if self._writer is not None:
+            self._writer.write_batch(batch)
+            return self._drain()
+        return pl.from_arrow(batch).write_ndjson().encode()
+
+    def _drain(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+
+@router.post("/")
+async def query(request: QueryRequest) -> StreamingResponse:
+    """Run a read-only SQL query on the analytics engine and stream the result.
+
+    Queries execute off the event loop on a bounded thread pool, at most one per pooled DuckDB
+    cursor. The result is streamed in chunks of about `batch_size` rows, either as an Arrow IPC
+    stream or as NDJSON. The timeout covers queueing, execution and streaming; a query that
+    exceeds it is interrupted. Errors raised before the first chunk produce an HTTP error status;
+    later failures abort the response.
+
+    Queries run on the sandboxed engine from `get_api_engine`, which can only read files in the
+    processed directory; reading any other file or URL is answered with 400.
+    """
+    if not is_read_only(request.sql):
+        raise HTTPException(status_code=400, detail="Only single read-only statements are allowed")
+    timeout = min(
+        request.timeout or settings.query_timeout_seconds, settings.query_max_timeout_seconds
+    )
+    deadline = time.monotonic() + timeout
+
+    slots = get_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Too many concurrent queries") from None
+
+    # The slot is freed with the cursor, possibly from a worker thread once it has let go of it.
+    loop = asyncio.get_running_loop()
+    stream = QueryStream(
+        request.sql,
+        request.format,
+        request.batch_size,
+        deadline,
+        lambda: loop.call_soon_threadsafe(slots.release),
+    )
+    try:
+        header = await stream.start()
+    except TimeoutError:
+        stream.close()
+        raise HTTPException(status_code=504, detail=f"Query exceeded {timeout:g}s") from None
+    except duckdb.Error as e:
+        stream.close()
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    except BaseException:
+        stream.close()
+        raise
+
+    async def body() -> AsyncIterator[bytes]:
+        started = time.monotonic()
+        try:
+            if header:
+                yield header
+            while (chunk := await stream.next_chunk()) is not None:
+                if chunk:
+                    yield chunk
+            logger.info(
+                "Streamed {} rows as {} in {:.2f}s",
+                stream.rows,
+                request.format.value,
+                time.monotonic() - started,
+            )
+        except TimeoutError:
+            logger.warning("Query cancelled after {:g}s: {}", timeout, request.sql)
+            raise
+        finally:
+            stream.close()
+
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[request.format])
@@ -1,30 +1,164 @@
 """API router providing a CSV validation endpoint."""
 
+import asyncio
+import contextvars
+import json
+import threading
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any
+
 import polars as pl
-from fastapi import APIRouter, UploadFile
+from fastapi import APIRouter, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
+from ...core.batches import iter_csv_batches
+from ...core.config import settings
 from ...core.logger import get_logger
-from ..models import Record
+from ...core.metrics import record, stage, timed
+from ...core.schemas import csv_options, get_schema
+from ..validation import validate_batches, validate_frame
 
 router = APIRouter(prefix="/validate", tags=["validate"])
 logger = get_logger()
 
 
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool that parses and validates uploads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.validate_workers, thread_name_prefix="validate")
+        return _executor
+
+
+def _admit() -> None:
+    """Take a slot for one validation, or refuse the request with 429 if none is free."""
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.validate_max_pending:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many validations in progress",
+                headers={"Retry-After": "1"},
+            )
+        _pending += 1
+
+
+def _release(future: Future | None = None) -> None:
+    """Give back a slot; used as the done-callback of the last job submitted for a request.
+
+    A cancelled request does not stop a job that is already running, so its slot is only free
+    once the worker is.
+    """
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def validate_upload(data: IO[bytes]) -> dict[str, Any]:
+    """Parse an uploaded CSV and validate its rows against the Record schema.
+
+    The columns are parsed with the registered Record types rather than inferred. If a value does
+    not parse, the file is re-read as strings so the offending rows are reported as errors.
+    """
+    schema = get_schema("records")
+    try:
+        df = pl.read_csv(data, **csv_options(schema=schema))
+    except pl.exceptions.ComputeError:
+        data.seek(0)
+        df = schema.coerce(pl.read_csv(data, infer_schema=False))
+    schema.check_columns(df.columns)
+    return {"rows": len(df), "errors": validate_frame(df)}
+
+
 @router.post("/")
+@timed("validate")
 async def validate(file: UploadFile):
     """Validate uploaded CSV records against the Record schema.
 
-    Reads the uploaded file into a Polars DataFrame and validates each row according to the Record model.
-    Returns the number of rows and any errors encountered.
+    Reads the uploaded file into a Polars DataFrame and validates all rows at once with expressions
+    derived from the Record model. Returns the number of rows and any errors encountered.
+
+    Parsing and validation run on a bounded thread pool (Polars releases the GIL), so the event
+    loop stays free for other requests. Once `settings.validate_max_pending` uploads are running
+    or queued, further requests are refused with 429 rather than queued without limit.
     """
-    df = pl.read_csv(file.file)  # Directly read from the uploaded file-like object
-    errors: list[dict] = []
-    for row in df.to_dicts():
-        try:
-            Record(**row)
-        except Exception as e:
-            errors.append({"row": row, "error": str(e)})
+    _admit()
+    future = get_executor().submit(validate_upload, file.file)
+    future.add_done_callback(_release)
+    result = await asyncio.wrap_future(future)
+    record(rows=result["rows"])
 
-    result = {"rows": len(df), "errors": errors}
-    logger.info(f"Validated {result['rows']} rows with {len(errors)} errors")
+    # Loguru formats positional arguments only if a sink accepts the record.
+    logger.info("Validated {} rows with {} errors", result["rows"], len(result["errors"]))
     return result
+
+
+@router.post("/stream")
+async def validate_stream(
+    file: UploadFile,
+    batch_size: int = Query(settings.validate_batch_size, gt=0),
+    max_errors: int = Query(settings.validate_max_errors, ge=0),
+) -> StreamingResponse:
+    """Validate an uploaded CSV in fixed-size batches and stream the errors back as NDJSON.
+
+    Memory use is bounded by `batch_size` rather than the size of the upload. Each line of the
+    response is one error object; the last line summarises the row and error counts. Batches are
+    read as strings, without inference, and each column is cast to its Record type where all of
+    its values parse, so a stray value in a later batch cannot break parsing.
+
+    Each batch is parsed and validated on the same thread pool as `/validate`, and a stream holds
+    one of its `settings.validate_max_pending` slots until it ends.
+    """
+    schema = get_schema("records")
+    _admit()
+
+    def lines() -> Iterator[str]:
+        with stage("validate_stream") as stats:
+            raw = iter_csv_batches(file.file, batch_size, infer_schema=False)
+            batches = (schema.coerce(batch) for batch in raw)
+            for item in validate_batches(batches, max_errors):
+                yield json.dumps(item, default=str) + "\n"
+            stats.rows = item["rows"]
+        logger.info(
+            "Validated {} rows with {} errors (streaming)", item["rows"], item["error_count"]
+        )
+
+    async def stream() -> AsyncIterator[str]:
+        iterator = lines()
+        # One context for every step, so the stage opened by the first one can be closed.
+        context = contextvars.copy_context()
+        future = None
+        try:
+            while True:
+                future = get_executor().submit(context.run, next, iterator, None)
+                line = await asyncio.wrap_future(future)
+                if line is None:
+                    break
+                yield line
+        finally:
+            if future is None or future.done():
+                context.run(iterator.close)
+                _release()
+            else:
+                # The client went away while a batch is being validated.
+                future.add_done_callback(lambda _: (context.run(iterator.close), _release()))
+
+    # Start the stream here: once started, the generator is closed and its slot released even
+    # if the response is never sent.
+    body = stream()
+    first = await anext(body)
+
+    async def response() -> AsyncIterator[str]:
+        yield first
+        async for line in body:
+            yield line
+
+    return StreamingResponse(response(), media_type="application/x-ndjson")
@@ -1,66 +1,331 @@
-"""Command line interface for the data platform using Typer."""
+"""Command line interface for the data platform using Typer.
+
+Only Typer and the option types are imported at module level. Each command imports the
+subsystems it needs when it runs, so `--help` and light commands do not pay for loading Polars,
+DuckDB, boto3 or the Snowflake connector. Help is rendered by Click's plain formatter
+(``rich_markup_mode=None``): importing Typer's Rich renderer costs more than the rest of the
+startup together.
+"""
 
 import typer
 
-from ..analytics.query import run_query
-from ..core.logger import get_logger
-from ..dq.checks import run_dq
-from ..etl.extract import extract_local
-from ..etl.load import load_parquet
-from ..etl.s3 import download_from_s3
-from ..etl.snowflake import load_parquet_to_snowflake
-from ..etl.transform import filter_adults
+from ..analytics.formats import OutputFormat
+from ..etl.options import INGEST_DATE, Engine
+
+app = typer.Typer(help="Data platform command line interface.", rich_markup_mode=None)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(
+        False, help="Print the time, CPU, memory, rows and bytes of every stage afterwards"
+    ),
+    profile_output: str | None = typer.Option(
+        None, help="Write a cProfile (.prof) or pyinstrument (.html) profile of the command"
+    ),
+) -> None:
+    if profile:
+        from ..core.metrics import registry, render_profile
+
+        mark = registry.mark()
+
+        def summary() -> None:
+            from ..core.logger import console
 
-app = typer.Typer(help="Data platform command line interface.")
-logger = get_logger()
+            console.print(render_profile(registry.recent(mark)))
+
+        ctx.call_on_close(summary)
+    if profile_output:
+        from ..core.metrics import profile_run
+
+        ctx.with_resource(profile_run(profile_output))
 
 
 @app.command()
 def etl(
-    source: str = typer.Option("input.csv", help="Name of the input CSV file in raw directory"),
+    source: str = typer.Option(
+        "input.csv", help="Input CSV file, directory or glob, relative to the raw directory"
+    ),
     output: str = typer.Option(
-        "output.parquet", help="Name of the output Parquet file in processed directory"
+        "output.parquet",
+        help="Output Parquet file in processed directory (dataset directory for multi-file runs)",
+    ),
+    engine: Engine = typer.Option(Engine.EAGER, help="Execution engine for single-file runs"),
+    columns: str | None = typer.Option(
+        None, help="Comma-separated list of columns to keep in the output"
+    ),
+    workers: int | None = typer.Option(
+        None, help="Worker processes for multi-file runs (default: number of CPUs)"
+    ),
+    partition_by: str = typer.Option(
+        INGEST_DATE, help="Comma-separated partition columns for multi-file runs"
+    ),
+    incremental: bool = typer.Option(
+        False, help="Only process inputs that changed since the last run"
+    ),
+    snowflake_table: str | None = typer.Option(
+        None, help="Also load single-file results into this Snowflake table (schema.table)"
+    ),
+    pipeline: str | None = typer.Option(
+        None, help="YAML transform pipeline to apply instead of the default adults filter"
     ),
 ) -> None:
     """Run the ETL pipeline: extract, transform and load.
 
-    Reads from raw CSV, filters adults, and writes to Parquet. Does not load to Snowflake by default.
+    Reads from raw CSV, filters adults, and writes to Parquet. Does not load to Snowflake by
+    default.
+    --pipeline replaces the adults filter with a declarative transform, see `etl.pipeline`.
+    With --snowflake-table, the result is uploaded from memory while the Parquet file is written.
+    When the source is a directory or glob, files are processed in parallel into a hive-partitioned
+    Parquet dataset and a per-file throughput report is printed.
     """
+    from ..core.logger import console, get_logger
+    from ..etl.parallel import is_dataset_source, render_report, run_parallel_etl
+    from ..etl.pipeline import ADULTS, Pipeline
+    from ..etl.runner import run_etl
+
+    logger = get_logger()
     logger.info("Starting CLI ETL")
-    df = extract_local(source)
-    df_t = filter_adults(df)
-    load_parquet(df_t, output)
+    selected = columns.split(",") if columns else None
+    transform = Pipeline.from_yaml(pipeline) if pipeline else ADULTS
+    if is_dataset_source(source):
+        if snowflake_table:
+            raise typer.BadParameter("--snowflake-table only supports single-file sources")
+        results = run_parallel_etl(
+            source,
+            output.removesuffix(".parquet"),
+            partition_by.split(","),
+            workers,
+            selected,
+            incremental,
+            transform,
+        )
+        console.print(render_report(results))
+    else:
+        run_etl(source, output, engine, selected, incremental, snowflake_table, transform)
     logger.info("ETL finished")
 
 
 @app.command()
-def dq() -> None:
-    """Run data quality checks on the input CSV."""
-    run_dq()
+def transform(
+    pipeline: str = typer.Argument(..., help="YAML file describing the transform pipeline"),
+) -> None:
+    """Run a declarative transform pipeline and write each of its outputs to Parquet.
+
+    All outputs are computed by one streaming query, so independent branches run concurrently
+    and shared inputs are read once.
+    """
+    from ..core.logger import console
+    from ..etl.pipeline import Pipeline
+
+    paths = Pipeline.from_yaml(pipeline).run()
+    for name, path in paths.items():
+        console.print(f"{name}: {path}")
+
+
+@app.command()
+def ingest(
+    source: str = typer.Argument(
+        "input.csv", help="Raw CSV file, directory or glob, relative to the raw directory"
+    ),
+    force: bool = typer.Option(False, help="Convert files whose cached copy is up to date"),
+) -> None:
+    """Convert raw CSV files once into memory-mapped Arrow IPC copies in the cache directory.
+
+    Later ETL and DQ runs read an ingested file from its copy instead of parsing the CSV, until
+    the file changes.
+    """
+    from rich.table import Table
+
+    from ..core.logger import console
+    from ..etl.ingest import ingest_file
+    from ..etl.parallel import resolve_sources
+
+    paths = resolve_sources(source)
+    if not paths:
+        raise typer.BadParameter(f"No CSV files match {source}")
+    table = Table(title="Ingest")
+    for column in ("File", "Rows", "MB", "Seconds", "MB/s", "Status"):
+        table.add_column(column, justify="left" if column in ("File", "Status") else "right")
+    for path in paths:
+        result = ingest_file(path, force=force)
+        table.add_row(
+            path.name,
+            f"{result.rows:,}",
+            f"{result.bytes_in / 1e6:.1f}",
+            f"{result.seconds:.2f}",
+            f"{result.mb_per_second:.1f}" if result.converted else "",
+            "converted" if result.converted else "up to date",
+        )
+    console.print(table)
+
+
+@app.command()
+def dq(
+    source: str = typer.Option(
+        "input.csv",
+        help="Raw CSV, processed Parquet file or dataset directory, or a path",
+    ),
+    sample_size: int | None = typer.Option(
+        None, help="Failing rows to sample per rule, 0 to disable (default: dq_sample_size)"
+    ),
+    streaming: bool = typer.Option(
+        True, help="Evaluate on the streaming engine to bound memory use on large inputs"
+    ),
+) -> None:
+    """Run data quality checks on a dataset.
+
+    All rules are evaluated in a single pass. Failure counts are printed, followed by a sample of
+    the failing rows of every rule that failed.
+    """
+    from ..core.logger import console
+    from ..dq.checks import run_dq
+
+    result = run_dq(source, sample_size=sample_size, streaming=streaming)
+    if result is None:
+        raise typer.Exit(code=1)
+    for name, sample in result.samples.items():
+        if not sample.is_empty():
+            console.print(
+                f"[bold]{name}[/bold]: {result.failures[name]} of {result.rows} rows fail"
+            )
+            print(sample)
 
 
 @app.command()
-def analytics(sql: str = typer.Argument(..., help="SQL query to run using DuckDB")) -> None:
-    """Run an ad‑hoc analytics SQL query using DuckDB."""
-    run_query(sql)
+def analytics(
+    sql: str = typer.Argument(..., help="SQL query to run using DuckDB"),
+    format: OutputFormat = typer.Option(OutputFormat.TABLE, help="Output format"),
+    output: str | None = typer.Option(
+        None, help="Destination file for arrow/parquet/csv output (csv defaults to stdout)"
+    ),
+) -> None:
+    """Run an ad‑hoc analytics SQL query using DuckDB.
+
+    Non-table formats stream Arrow record batches straight to the output file.
+    """
+    if output is None and format in (OutputFormat.ARROW, OutputFormat.PARQUET):
+        raise typer.BadParameter(f"--output is required for --format {format.value}")
+    from ..analytics.query import run_query
+
+    run_query(sql, format, output)
 
 
 @app.command()
-def s3_download(key: str = typer.Argument(..., help="S3 object key to download")) -> None:
-    """Download a file from the configured S3 bucket into the raw directory."""
-    local_path = download_from_s3(key)
-    print(f"Downloaded to {local_path}")
+def catalog() -> None:
+    """Refresh and list the Parquet datasets registered as analytics views."""
+    from rich.table import Table
+
+    from ..analytics.engine import get_engine
+    from ..core.logger import console
+
+    cat = get_engine().catalog
+    cat.refresh()
+    table = Table(title=f"Catalog of {cat.root}")
+    for column in ("View", "Files", "Rows", "Row groups", "Columns"):
+        table.add_column(column, justify="left" if column in ("View", "Columns") else "right")
+    for name, dataset in sorted(cat.datasets.items()):
+        table.add_row(
+            name,
+            str(len(dataset.files)),
+            f"{dataset.num_rows:,}",
+            str(sum(f.num_row_groups for f in dataset.files.values())),
+            ", ".join(dataset.schema),
+        )
+    console.print(table)
+
+
+@app.command()
+def s3_download(
+    key: str | None = typer.Argument(None, help="S3 object key to download"),
+    prefix: str | None = typer.Option(None, help="Download every object under this key prefix"),
+    workers: int | None = typer.Option(
+        None, help="Concurrent requests for prefix downloads (default: s3_max_concurrency)"
+    ),
+) -> None:
+    """Download files from the configured S3 bucket into the raw directory.
+
+    With --prefix, all matching objects are fetched concurrently into the raw directory, keeping
+    their paths below the prefix, and the aggregate throughput is reported.
+    """
+    if (key is None) == (prefix is None):
+        raise typer.BadParameter("Pass either a KEY or --prefix")
+    from rich.progress import DownloadColumn, Progress, TransferSpeedColumn
+
+    from ..core.config import settings
+    from ..core.logger import console
+    from ..etl.s3 import download_from_s3, download_many, list_keys
+
+    if key is not None:
+        local_path = download_from_s3(key)
+        print(f"Downloaded to {local_path}")
+        return
+
+    objects = dict(list_keys(prefix))
+    columns = (
+        *Progress.get_default_columns(),
+        DownloadColumn(binary_units=True),
+        TransferSpeedColumn(),
+    )
+    with Progress(*columns, console=console) as progress:
+        task = progress.add_task(f"s3://{settings.s3_bucket}/{prefix}", total=sum(objects.values()))
+        report = download_many(
+            list(objects),
+            prefix=prefix,
+            workers=workers,
+            on_progress=lambda n: progress.advance(task, n),
+        )
+    console.print(
+        f"Downloaded {len(report.files)} files ({report.bytes / 2**20:.1f} MB) in "
+        f"{report.seconds:.2f}s: {report.mb_per_second:.1f} MB/s"
+    )
+    for failed_key, error in report.failed.items():
+        console.print(f"[red]Failed[/red] {failed_key}: {error}")
+    if report.failed:
+        raise typer.Exit(code=1)
 
 
 @app.command()
 def snowflake_load(
     parquet_file: str = typer.Argument(..., help="Name of the Parquet file in processed directory"),
     table: str = typer.Argument(..., help="Target Snowflake table (schema.table)"),
+    chunk_mb: int | None = typer.Option(
+        None, help="Target size (MB) of the staged files (default: snowflake_chunk_mb)"
+    ),
+    parallel: int | None = typer.Option(
+        None, help="Upload threads for the PUT (default: snowflake_put_parallel)"
+    ),
+    merge_on: str | None = typer.Option(
+        None, help="Comma-separated key columns to MERGE on instead of appending"
+    ),
+    watermark: str | None = typer.Option(
+        None, help="With --merge-on, only load rows past this column's high-water mark"
+    ),
 ) -> None:
-    """Load a local Parquet file into a Snowflake table."""
+    """Load a local Parquet file or dataset directory into a Snowflake table.
+
+    The data is split into files of about --chunk-mb, uploaded by one parallel PUT and loaded by
+    one COPY. With --merge-on, the rows are merged on the given keys instead, and --watermark
+    restricts them to those changed since the previous load.
+    """
+    from ..etl.extract import scan_dataset
+    from ..etl.snowflake import bulk_load_parquet, merge_frame_to_snowflake
+
     path = f"{parquet_file}" if parquet_file.startswith("/") else f"data/processed/{parquet_file}"
-    load_parquet_to_snowflake(path, table)
-    print("Snowflake load complete")
+    if merge_on:
+        report = merge_frame_to_snowflake(
+            scan_dataset(path), table, merge_on.split(","), watermark, None, chunk_mb, parallel
+        )
+    elif watermark:
+        raise typer.BadParameter("--watermark requires --merge-on")
+    else:
+        report = bulk_load_parquet(path, table, chunk_mb=chunk_mb, parallel=parallel)
+    print(
+        f"Snowflake load complete: {report.rows} rows in {len(report.files)} files "
+        f"({report.bytes / 2**20:.1f} MB) in {report.seconds:.2f}s, "
+        f"{report.mb_per_second:.1f} MB/s, {report.rows_per_second:.0f} rows/s"
+    )
 
 
 if __name__ == "__main__":
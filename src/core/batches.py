@@ -0,0 +1,69 @@
+"""Incremental readers that turn large CSV streams into bounded Polars batches."""
+
+import io
+from collections.abc import Iterator
+from typing import Any, BinaryIO
+
+import polars as pl
+
+
+def iter_csv_records(source: BinaryIO) -> Iterator[bytes]:
+    """Yield complete CSV records from a binary stream, one record at a time.
+
+    Lines are joined while a quoted field is still open, so embedded newlines stay inside their
+    record. Blank lines between records are skipped.
+
+    Args:
+        source: Binary file-like object positioned after the header line.
+    """
+    record = b""
+    quotes = 0
+    for line in source:
+        record += line
+        quotes += line.count(b'"')
+        if quotes % 2:
+            continue
+        if record.strip():
+            yield record if record.endswith(b"\n") else record + b"\n"
+        record = b""
+        quotes = 0
+    if record.strip():
+        yield record
+
+
+def iter_csv_batches(
+    source: BinaryIO, batch_size: int, **read_options: Any
+) -> Iterator[pl.DataFrame]:
+    """Read a CSV stream as a sequence of DataFrames of at most `batch_size` rows.
+
+    Only one batch of raw records is held in memory at a time. The column types of the first batch,
+    whether inferred or given through `read_options`, are pinned for all following batches so
+    every batch shares one schema.
+
+    Args:
+        source: Binary file-like object positioned at the header line.
+        batch_size: Maximum number of records per batch.
+        **read_options: Extra keyword arguments forwarded to `pl.read_csv`.
+
+    Yields:
+        Polars DataFrames with the columns of the CSV header.
+    """
+    header = source.readline()
+    if not header.strip():
+        return
+
+    options = dict(read_options)
+    records: list[bytes] = []
+
+    def read(chunk: list[bytes]) -> pl.DataFrame:
+        df = pl.read_csv(io.BytesIO(header + b"".join(chunk)), **options)
+        options["schema_overrides"] = df.schema
+        return df
+
+    for record in iter_csv_records(source):
+        records.append(record)
+        if len(records) >= batch_size:
+            yield read(records)
+            records = []
+    if records:
+        yield read(records)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -14,6 +16,20 @@ class Settings(BaseSettings):
 
     # Logging
     log_level: str = Field("INFO", description="Logging level")
+    log_file: str = Field("logs/app.log", description="Rotating log file")
+    log_json: bool = Field(False, description="Write the log file as JSON lines")
+    log_file_per_process: bool = Field(
+        False, description="Add the process id to the log file name, one file per server worker"
+    )
+    log_async: bool = Field(
+        True, description="Write the log file from a background thread instead of the caller"
+    )
+    log_queue_size: int = Field(
+        10_000, description="Records that may wait for the background log writer"
+    )
+    log_overflow: Literal["block", "drop"] = Field(
+        "block", description="When the log queue is full: wait for room, or drop the record"
+    )
 
     # Data directories
     data_dir: str = Field("data", description="Base directory for data")
@@ -21,6 +37,55 @@ class Settings(BaseSettings):
     processed_dir: str = Field("data/processed", description="Directory for processed files")
     cache_dir: str = Field("data/cache", description="Directory for cached files")
 
+    # CSV parsing
+    records_patterns: list[str] = Field(
+        ["input*.csv", "input*.csv.gz"],
+        description="File name patterns of CSVs read with the pinned Record schema",
+    )
+    csv_low_memory: bool = Field(False, description="Parse CSVs in low-memory mode")
+    csv_threads: int | None = Field(
+        default=None, description="Threads used to parse a CSV file (default: all cores)"
+    )
+
+    # Validation API
+    validate_batch_size: int = Field(
+        100_000, description="Rows per batch when streaming uploads through /validate/stream"
+    )
+    validate_max_errors: int = Field(
+        1000, description="Maximum number of error rows returned by /validate/stream"
+    )
+    validate_workers: int = Field(
+        4, description="Worker threads parsing and validating /validate uploads"
+    )
+    validate_max_pending: int = Field(
+        16, description="Uploads /validate runs or queues at once before answering 429"
+    )
+
+    # Data quality
+    dq_sample_size: int = Field(5, description="Failing rows sampled per rule by run_dq")
+
+    # Analytics engine
+    analytics_database: str | None = Field(
+        default=None,
+        description="DuckDB database file (or :memory:); defaults to analytics.duckdb in data_dir",
+    )
+    analytics_pool_size: int = Field(4, description="Number of pooled DuckDB cursors")
+    analytics_cache_mb: int = Field(
+        256, description="Size limit of the API's query-result cache in MB"
+    )
+    catalog_refresh_seconds: float = Field(
+        30.0, description="Minimum interval between automatic rescans of the processed directory"
+    )
+
+    # Query API
+    query_workers: int = Field(4, description="Worker threads executing /query requests")
+    query_timeout_seconds: float = Field(
+        30.0, description="Default time limit of a /query request, including streaming"
+    )
+    query_max_timeout_seconds: float = Field(
+        300.0, description="Upper bound on the timeout a /query request may ask for"
+    )
+
     # AWS S3 configuration
     aws_access_key_id: str | None = Field(default=None, description="AWS access key ID")
     aws_secret_access_key: str | None = Field(default=None, description="AWS secret access key")
@@ -29,6 +94,17 @@ class Settings(BaseSettings):
     )
     aws_region: str | None = Field(default=None, description="AWS region")
     s3_bucket: str | None = Field(default=None, description="Default S3 bucket name")
+    s3_endpoint_url: str | None = Field(
+        default=None, description="Custom S3 endpoint, e.g. a MinIO server or local S3 stand-in"
+    )
+    s3_max_pool_connections: int = Field(64, description="Size of the S3 client connection pool")
+    s3_max_concurrency: int = Field(32, description="Concurrent S3 requests for downloads")
+    s3_multipart_chunk_mb: int = Field(
+        8, description="Objects at least this large (MB) are downloaded in parallel parts of it"
+    )
+    s3_cache_mb: int = Field(
+        1024, description="Size cap (MB) of the local S3 object cache in cache_dir; 0 disables it"
+    )
 
     # Snowflake configuration
     snowflake_account: str | None = Field(default=None, description="Snowflake account identifier")
@@ -38,6 +114,10 @@ class Settings(BaseSettings):
     snowflake_warehouse: str | None = Field(default=None, description="Snowflake warehouse")
     snowflake_database: str | None = Field(default=None, description="Snowflake database")
     snowflake_schema: str | None = Field(default=None, description="Snowflake schema")
+    snowflake_chunk_mb: int = Field(
+        128, description="Target size (MB) of the Parquet files staged for a Snowflake COPY"
+    )
+    snowflake_put_parallel: int = Field(8, description="Upload threads per Snowflake PUT (1-99)")
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -1,23 +1,219 @@
-"""Centralised logging configuration using Loguru and Rich."""
+"""Centralised logging configuration using Loguru and Rich.
 
+Setup is deferred: modules hold the `DeferredLogger` returned by `get_logger`, which adds the
+sinks the first time it is used rather than at import. The log file is only opened when the
+first record is written, and Rich is only imported when the shared `console` is first used or an
+uncaught exception has to be rendered.
+
+With `settings.log_async`, records for the log file are handed to a `BackgroundFileSink`, whose
+writer thread does the disk I/O, so logging on a request path costs a queue put. Compressing
+rotated files always happens on a separate thread, in either mode.
+"""
+
+import json
+import os
+import queue
 import sys
+import threading
+import time
+import weakref
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from loguru import logger
-from rich.console import Console
-from rich.traceback import install
 
 from .config import settings
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    console: Console
+
+ROTATION_BYTES = 5 * 2**20
+RETENTION_SECONDS = 7 * 24 * 3600
+
+_configured = False
+_configure_lock = threading.Lock()
+_compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+_STOP = object()
+# Background sinks that have not been stopped, restarted in forked children.
+_sinks: "weakref.WeakSet[BackgroundFileSink]" = weakref.WeakSet()
+
+
+def _rich_excepthook(exc_type, exc, tb) -> None:
+    """Print uncaught exceptions as Rich tracebacks, importing the renderer only when needed."""
+    from rich.console import Console
+    from rich.traceback import Traceback
+
+    Console(stderr=True).print(Traceback.from_exception(exc_type, exc, tb, show_locals=True))
+
+
+def __getattr__(name: str):
+    """Create the shared Rich `console` on first access, so importing this module skips Rich."""
+    if name == "console":
+        from rich.console import Console
+
+        global console
+        console = Console()
+        return console
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _zip(path: str | Path) -> None:
+    """Compress a rotated log file into ``<name>.zip`` and remove the original."""
+    path = Path(path)
+    archive = path.with_name(f"{path.name}.zip")
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.write(path, arcname=path.name)
+    path.unlink()
+
+
+def compress_in_background(path: str) -> None:
+    """Loguru ``compression`` callable that zips a rotated file on the compressor thread.
+
+    Loguru calls it from the thread that triggered the rotation, so a synchronous compression
+    would stall whichever request happened to log the record that crossed the size limit.
+    """
+    _compressor.submit(_zip, path)
+
+
+class BackgroundFileSink:
+    """Loguru sink writing to a rotating log file from a background thread.
+
+    Loguru formats each record on the logging thread and passes the text to `write`, which only
+    puts it on a bounded queue. A writer thread drains the queue in batches, writes and flushes
+    each batch at once, rotates the file when it reaches `rotation` bytes, and hands the rotated
+    file to the compressor thread. Files older than `retention` seconds are deleted.
+
+    Args:
+        path: Location of the log file.
+        max_queue: Maximum number of records waiting to be written.
+        overflow: ``"block"`` to make loggers wait for room in the queue (backpressure), or
+            ``"drop"`` to discard records while it is full. Dropped records are counted in
+            `dropped`, and the count is written to the file once the writer catches up.
+        rotation: Size in bytes at which the file is rotated.
+        retention: Age in seconds after which rotated files are deleted.
+        serialize: Whether records are JSON lines, so drop notices are written as JSON too.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_queue: int = 10_000,
+        overflow: str = "block",
+        rotation: int = ROTATION_BYTES,
+        retention: float = RETENTION_SECONDS,
+        serialize: bool = False,
+    ):
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"overflow must be 'block' or 'drop', not {overflow!r}")
+        self.path = Path(path)
+        self.rotation = rotation
+        self.retention = retention
+        self.block = overflow == "block"
+        self.serialize = serialize
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._start()
+        _sinks.add(self)
+
+    def _start(self) -> None:
+        self._reported = self.dropped
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        try:
+            self._queue.put(message, block=self.block)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self) -> None:
+        """Write the queued records and close the file; called by Loguru on `logger.remove`."""
+        _sinks.discard(self)
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 1024:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            self._write([m for m in batch if m is not _STOP])
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _write(self, messages: list[str]) -> None:
+        if self.dropped != self._reported:
+            dropped, self._reported = self.dropped - self._reported, self.dropped
+            notice = f"{dropped} log records dropped while the log queue was full"
+            if self.serialize:
+                notice = json.dumps({"text": notice, "dropped_records": dropped})
+            messages.append(f"{notice}\n")
+        if not messages:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(messages))
+        self._file.flush()
+        if self._file.tell() >= self.rotation:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        stamp = f"{time.strftime('%Y-%m-%d_%H-%M-%S')}_{time.time_ns() % 10**9:09d}"
+        rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        os.replace(self.path, rotated)
+        compress_in_background(str(rotated))
+        cutoff = time.time() - self.retention
+        for old in self.path.parent.glob(f"{self.path.stem}.*"):
+            if old != self.path and old.stat().st_mtime < cutoff:
+                old.unlink(missing_ok=True)
+
+
+def _after_fork_in_child() -> None:
+    """Give the background sinks of a forked child their own writer thread (and file)."""
+    for sink in list(_sinks):
+        if settings.log_file_per_process:
+            sink.path = log_path()
+        sink._start()
+
+
+# A forked child inherits the queues but not the writer threads.
+os.register_at_fork(after_in_child=_after_fork_in_child)
 
-# Install Rich traceback handler for better error formatting
-install(show_locals=True)
+
+def log_path() -> Path:
+    """Return the log file of this process.
+
+    With `settings.log_file_per_process`, the process id is added to the name, so that server
+    workers sharing a log directory each write and rotate their own file.
+    """
+    path = Path(settings.log_file)
+    if settings.log_file_per_process:
+        path = path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}")
+    return path
 
 
 def configure_logger() -> None:
     """Configure the global Loguru logger.
 
-    This sets up a file sink and ensures logs are written with rotation.
+    This sets up a file sink and ensures logs are written with rotation. File records are
+    written as JSON lines with `settings.log_json`, and by a background thread with
+    `settings.log_async`.
     """
     # Remove default handlers to avoid duplicate logs
     logger.remove()
@@ -25,20 +221,54 @@ def configure_logger() -> None:
     # Output logs to stderr for console
     logger.add(sys.stderr, level=settings.log_level)
 
-    # Output logs to file with rotation
-    logger.add(
-        "logs/app.log",
-        rotation="5 MB",
-        retention="7 days",
-        compression="zip",
-        level=settings.log_level,
-    )
+    # Output logs to file with rotation; the file is created on the first message
+    if settings.log_async:
+        sink = BackgroundFileSink(
+            log_path(),
+            max_queue=settings.log_queue_size,
+            overflow=settings.log_overflow,
+            serialize=settings.log_json,
+        )
+        logger.add(sink, level=settings.log_level, serialize=settings.log_json)
+    else:
+        logger.add(
+            log_path(),
+            rotation=ROTATION_BYTES,
+            retention=timedelta(seconds=RETENTION_SECONDS),
+            compression=compress_in_background,
+            level=settings.log_level,
+            serialize=settings.log_json,
+            delay=True,
+        )
+
+    # Render uncaught exceptions with Rich
+    sys.excepthook = _rich_excepthook
+
+
+def _ensure_configured() -> None:
+    global _configured
+    if not _configured:
+        with _configure_lock:
+            if not _configured:
+                configure_logger()
+                _configured = True
+
+
+class DeferredLogger:
+    """Stand-in for the Loguru logger that configures it on first use.
+
+    Modules call `get_logger` at import; the sinks are only added once one of them logs, so
+    importing a module (or running ``--help``) does not touch the log file or stderr handlers.
+    """
+
+    def __getattr__(self, name: str):
+        _ensure_configured()
+        return getattr(logger, name)
 
 
-# Configure logger at import time
-configure_logger()
+_deferred = DeferredLogger()
 
 
-def get_logger():
-    """Return the configured Loguru logger instance."""
-    return logger
+def get_logger() -> DeferredLogger:
+    """Return the logger; the global Loguru logger is configured when it is first used."""
+    return _deferred
@@ -0,0 +1,295 @@
+"""Per-stage performance instrumentation.
+
+`stage` (a context manager) and `timed` (a decorator) measure a unit of work: wall time, CPU time,
+the peak RSS of the process, and the rows and bytes it handled, which the code being measured
+adds with `record`. Every measurement goes into a process-wide `MetricsRegistry`, exposed in
+Prometheus text format by the API's ``/metrics`` endpoint and summarised by the CLI's
+``--profile`` option.
+
+`profile_run` captures a cProfile (or, with the optional pyinstrument package, an HTML) profile
+of a whole run.
+"""
+
+import functools
+import inspect
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from rich.table import Table
+
+# Upper bounds (seconds) of the buckets of the stage duration histogram.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+PREFIX = "edp"
+
+
+@dataclass
+class StageStats:
+    """Measurements of one execution of a stage."""
+
+    stage: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    rows: int = 0
+    bytes: int = 0
+    failed: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1e6 / self.wall_seconds if self.wall_seconds else 0.0
+
+
+@dataclass
+class StageTotals:
+    """Aggregated measurements of all executions of a stage."""
+
+    runs: int = 0
+    failures: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+
+
+class MetricsRegistry:
+    """Thread-safe store of stage measurements.
+
+    Args:
+        history: Number of recent individual measurements to keep, for `recent`.
+    """
+
+    def __init__(self, history: int = 1000):
+        self._lock = threading.Lock()
+        self._totals: dict[str, StageTotals] = {}
+        self._recent: deque[StageStats] = deque(maxlen=history)
+        self._recorded = 0
+
+    def add(self, stats: StageStats) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(stats.stage, StageTotals())
+            totals.runs += 1
+            totals.failures += stats.failed
+            totals.wall_seconds += stats.wall_seconds
+            totals.cpu_seconds += stats.cpu_seconds
+            totals.rows += stats.rows
+            totals.bytes += stats.bytes
+            for i, bound in enumerate(BUCKETS):
+                if stats.wall_seconds <= bound:
+                    totals.buckets[i] += 1
+            self._recent.append(stats)
+            self._recorded += 1
+
+    def mark(self) -> int:
+        """Return a marker to pass to `recent` to get the measurements recorded after this call."""
+        with self._lock:
+            return self._recorded
+
+    def recent(self, since: int = 0) -> list[StageStats]:
+        """Return the kept measurements recorded after the `mark` `since`, oldest first."""
+        with self._lock:
+            count = min(self._recorded - since, len(self._recent))
+            return list(self._recent)[len(self._recent) - count :]
+
+    def totals(self) -> dict[str, StageTotals]:
+        with self._lock:
+            return {name: StageTotals(**vars(t)) for name, t in self._totals.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._recent.clear()
+            self._recorded = 0
+
+    def render_prometheus(self) -> str:
+        """Render the totals and the peak RSS in the Prometheus text exposition format."""
+        totals = sorted(self.totals().items())
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help: str, samples: list[tuple[str, float]]) -> None:
+            lines.append(f"# HELP {PREFIX}_{name} {help}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            lines.extend(f"{PREFIX}_{sample} {value:g}" for sample, value in samples)
+
+        def by_stage(name: str, attr: str) -> list[tuple[str, float]]:
+            return [(f'{name}{{stage="{stage}"}}', getattr(t, attr)) for stage, t in totals]
+
+        histogram = []
+        for stage, t in totals:
+            for bound, count in zip(BUCKETS, t.buckets):
+                histogram.append(
+                    (f'stage_duration_seconds_bucket{{stage="{stage}",le="{bound:g}"}}', count)
+                )
+            histogram.append(
+                (f'stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}}', t.runs)
+            )
+            histogram.append((f'stage_duration_seconds_sum{{stage="{stage}"}}', t.wall_seconds))
+            histogram.append((f'stage_duration_seconds_count{{stage="{stage}"}}', t.runs))
+        family("stage_duration_seconds", "histogram", "Wall time of stage runs.", histogram)
+        family(
+            "stage_failures_total",
+            "counter",
+            "Stage runs that raised.",
+            by_stage("stage_failures_total", "failures"),
+        )
+        family(
+            "stage_cpu_seconds_total",
+            "counter",
+            "Process CPU time spent in stages.",
+            by_stage("stage_cpu_seconds_total", "cpu_seconds"),
+        )
+        family(
+            "stage_rows_total",
+            "counter",
+            "Rows handled by stages.",
+            by_stage("stage_rows_total", "rows"),
+        )
+        family(
+            "stage_bytes_total",
+            "counter",
+            "Bytes handled by stages.",
+            by_stage("stage_bytes_total", "bytes"),
+        )
+        family(
+            "process_peak_rss_bytes",
+            "gauge",
+            "Peak resident set size of the process.",
+            [("process_peak_rss_bytes", peak_rss_bytes())],
+        )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+_current: ContextVar[StageStats | None] = ContextVar("current_stage", default=None)
+
+
+def peak_rss_bytes() -> int:
+    """Return the peak resident set size of the process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageStats]:
+    """Measure the enclosed block as one run of stage `name`.
+
+    CPU time is that of the whole process, so it includes the worker threads of Polars and
+    DuckDB. Rows and bytes are added with `record`, or by setting them on the yielded stats.
+    """
+    stats = StageStats(stage=name)
+    token = _current.set(stats)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield stats
+    except BaseException:
+        stats.failed = True
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:  # exited in another context, e.g. a generator resumed elsewhere
+            pass
+        stats.wall_seconds = time.perf_counter() - wall
+        stats.cpu_seconds = time.process_time() - cpu
+        stats.peak_rss_bytes = peak_rss_bytes()
+        registry.add(stats)
+
+
+def timed(name: str) -> Callable:
+    """Decorate a function (or coroutine function) so that each call is measured by `stage`."""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with stage(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record(rows: int = 0, bytes: int = 0) -> None:
+    """Add rows and bytes to the innermost stage being measured, if any."""
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += rows
+        stats.bytes += bytes
+
+
+def render_profile(stats: list[StageStats]) -> "Table":
+    """Build a Rich table summarising stage measurements, as printed by the CLI's --profile."""
+    from rich.table import Table
+
+    table = Table(title="Profile")
+    columns = ("Stage", "Wall s", "CPU s", "Peak RSS MB", "Rows", "Rows/s", "MB", "MB/s")
+    for column in columns:
+        table.add_column(column, justify="left" if column == "Stage" else "right")
+    for s in stats:
+        table.add_row(
+            f"{s.stage} (failed)" if s.failed else s.stage,
+            f"{s.wall_seconds:.3f}",
+            f"{s.cpu_seconds:.3f}",
+            f"{s.peak_rss_bytes / 2**20:.0f}",
+            f"{s.rows:,}",
+            f"{s.rows_per_second:,.0f}",
+            f"{s.bytes / 1e6:.1f}",
+            f"{s.mb_per_second:.1f}",
+        )
+    return table
+
+
+@contextmanager
+def profile_run(output: str | Path) -> Iterator[None]:
+    """Profile the enclosed block and write the profile to `output`.
+
+    Files ending in ``.html`` get a pyinstrument report (which needs the optional pyinstrument
+    package); anything else gets cProfile statistics, readable with `pstats` or snakeviz.
+    """
+    output = Path(output)
+    if output.suffix == ".html":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise RuntimeError("HTML profiles require the pyinstrument package") from None
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            output.write_text(profiler.output_html())
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output)
@@ -0,0 +1,11 @@
+"""Domain models of the datasets, shared by the schema registry and the API."""
+
+from pydantic import BaseModel, EmailStr, Field
+
+
+class Record(BaseModel):
+    """Schema representing a simple record with id, email and age."""
+
+    id: int = Field(..., gt=0)
+    email: EmailStr
+    age: int = Field(..., gt=0, lt=120)
@@ -0,0 +1,190 @@
+"""Registry of the column types of known CSV datasets.
+
+Reading a CSV with default options makes Polars scan the data to infer column types, which costs
+a pass over the sample and can guess wrong (an id column with one stray value becomes a string).
+Datasets registered here are read with their types pinned and inference switched off, so parsing
+starts immediately. Columns the registry does not know are read as strings.
+
+Schemas are declared per dataset or derived from a Pydantic model, and are matched to files by
+name pattern. Drift is detected from the header alone: `check_columns` reports expected columns
+that are missing and columns that are not in the schema.
+"""
+
+import datetime
+import fnmatch
+import types
+import typing
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+from pydantic import BaseModel, EmailStr
+
+from .config import settings
+from .logger import get_logger
+from .models import Record
+
+logger = get_logger()
+
+_PYTHON_TYPES: dict[Any, pl.DataType] = {
+    int: pl.Int64(),
+    float: pl.Float64(),
+    bool: pl.Boolean(),
+    str: pl.String(),
+    EmailStr: pl.String(),
+    datetime.date: pl.Date(),
+    datetime.datetime: pl.Datetime(),
+}
+
+
+@dataclass
+class SchemaDrift:
+    """Differences between the columns of a file and its registered schema."""
+
+    dataset: str
+    missing: list[str] = field(default_factory=list)
+    unexpected: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.missing or self.unexpected)
+
+    def __str__(self) -> str:
+        return f"{self.dataset}: missing {self.missing}, unexpected {self.unexpected}"
+
+
+@dataclass(frozen=True)
+class DatasetSchema:
+    """Column types of a dataset and the file names it applies to.
+
+    Attributes:
+        name: Name of the dataset.
+        dtypes: Polars data type of every expected column, in order.
+        patterns: Glob patterns of the file names (e.g. ``input*.csv``) read with this schema.
+    """
+
+    name: str
+    dtypes: dict[str, pl.DataType]
+    patterns: tuple[str, ...] = ()
+
+    @classmethod
+    def from_model(
+        cls, name: str, model: type[BaseModel], patterns: Iterable[str] = ()
+    ) -> "DatasetSchema":
+        """Derive the column types from the field annotations of a Pydantic model.
+
+        Fields whose annotation has no Polars equivalent are read as strings.
+        """
+        dtypes = {
+            column: _PYTHON_TYPES.get(_unwrap_optional(info.annotation), pl.String())
+            for column, info in model.model_fields.items()
+        }
+        return cls(name=name, dtypes=dtypes, patterns=tuple(patterns))
+
+    def matches(self, source: str | Path) -> bool:
+        file_name = Path(source).name
+        return any(fnmatch.fnmatch(file_name, pattern) for pattern in self.patterns)
+
+    def coerce(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Cast string columns of a frame read without a schema to the schema types.
+
+        A column is only cast if all of its values parse; otherwise it is left as strings, so the
+        values that do not fit stay visible, e.g. to report them as validation errors.
+        """
+        casts = {}
+        for column, dtype in self.dtypes.items():
+            if column in df.columns and df.schema[column] == pl.String and dtype != pl.String:
+                cast = df[column].cast(dtype, strict=False)
+                if cast.null_count() == df[column].null_count():
+                    casts[column] = cast
+        return df.with_columns(**casts) if casts else df
+
+    def check_columns(self, columns: Iterable[str]) -> SchemaDrift:
+        """Compare the columns of a file with the schema, logging a warning on drift."""
+        columns = list(columns)
+        drift = SchemaDrift(
+            dataset=self.name,
+            missing=[c for c in self.dtypes if c not in columns],
+            unexpected=[c for c in columns if c not in self.dtypes],
+        )
+        if drift:
+            logger.warning(f"Schema drift in {drift}")
+        return drift
+
+
+_registry: dict[str, DatasetSchema] = {}
+
+
+def register(schema: DatasetSchema) -> DatasetSchema:
+    """Add or replace a dataset schema in the registry."""
+    _registry[schema.name] = schema
+    return schema
+
+
+def get_schema(name: str) -> DatasetSchema:
+    """Return a registered schema by dataset name."""
+    return _registry[name]
+
+
+def schema_for(source: str | Path | None) -> DatasetSchema | None:
+    """Return the schema whose patterns match the file name of `source`, if any."""
+    if source is None:
+        return None
+    return next((s for s in _registry.values() if s.matches(source)), None)
+
+
+def csv_options(
+    source: str | Path | None = None,
+    columns: list[str] | None = None,
+    schema: DatasetSchema | None = None,
+    lazy: bool = False,
+) -> dict[str, Any]:
+    """Return the `pl.read_csv` (or, with `lazy`, `pl.scan_csv`) options for a CSV source.
+
+    With a schema, explicitly given or matched by file name, its types are pinned and type
+    inference is disabled; otherwise the types are inferred as before. The low-memory and
+    thread-count settings are applied in both cases.
+
+    Args:
+        source: Path or name of the file, used to look up its schema.
+        columns: Columns to read; all by default.
+        schema: Schema to use instead of looking one up.
+        lazy: Return options accepted by `pl.scan_csv`.
+    """
+    schema = schema or schema_for(source)
+    options: dict[str, Any] = {"low_memory": settings.csv_low_memory}
+    if schema is not None:
+        options["schema_overrides"] = dict(schema.dtypes)
+        options["infer_schema"] = False
+    if lazy:
+        return options
+    if settings.csv_threads:
+        options["n_threads"] = settings.csv_threads
+    if columns:
+        options["columns"] = columns
+    return options
+
+
+def check_csv(path: str | Path, schema: DatasetSchema | None = None) -> SchemaDrift | None:
+    """Check the header of a CSV file against its schema, without reading any data rows.
+
+    Returns:
+        The drift, or None if no schema applies to the file.
+    """
+    schema = schema or schema_for(path)
+    if schema is None:
+        return None
+    header = pl.scan_csv(path, infer_schema=False).collect_schema().names()
+    return schema.check_columns(header)
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+register(DatasetSchema.from_model("records", Record, patterns=settings.records_patterns))
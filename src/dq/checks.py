@@ -1,35 +1,228 @@
 """Data quality check execution.
 
-This module applies the defined rules in `dq.rules` to a dataset and reports the number of failing rows per rule.
+This module applies the rules in `dq.rules` to a dataset and reports the number of failing rows per
+rule. All rules are fused into a single Polars query, so the data is scanned once no matter how
+many rules there are, and the rule expressions are evaluated in parallel. `stream_evaluate` does
+the same on Polars' streaming engine, for datasets larger than memory.
 """
 
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
 import polars as pl
 
 from ..core.config import settings
 from ..core.logger import get_logger
-from .rules import RULES
+from ..core.metrics import record, timed
+from ..etl.extract import scan_dataset
+from .rules import RULES, Rule
 
 logger = get_logger()
 
+ROW_INDEX = "row"
+_ROWS = "__rows"
+_SAMPLE = "__sample_{}"
+_FAILED = "__failed_{}"
+_KEY = "__key"
+
+
+@dataclass
+class DQResult:
+    """Outcome of evaluating a set of rules over a dataset.
+
+    Attributes:
+        rows: Number of rows checked.
+        failures: Number of failing rows per rule.
+        masks: One boolean column per rule that is True where the row violates the rule, if
+            requested.
+        samples: Up to `sample_size` failing rows per rule, with their `row` index, if requested.
+    """
+
+    rows: int
+    failures: dict[str, int]
+    masks: pl.DataFrame | None = None
+    samples: dict[str, pl.DataFrame] = field(default_factory=dict)
+
+
+def evaluate(
+    data: pl.DataFrame | pl.LazyFrame,
+    rules: Mapping[str, Rule] = RULES,
+    masks: bool = False,
+    sample_size: int = 0,
+) -> DQResult:
+    """Evaluate all rules over a dataset in one pass.
+
+    Failure counts for every rule, and the positions of the first failing rows when samples are
+    requested, are computed by a single `select`. Masks are collected together with it so the
+    input is read once; the sample rows themselves are then fetched by a second, filtered read.
+
+    Args:
+        data: The dataset to check; a LazyFrame (e.g. from `pl.scan_csv`) avoids loading columns
+            no rule refers to.
+        rules: Rules to evaluate, keyed by name.
+        masks: Whether to return the row-level violation masks.
+        sample_size: Maximum number of failing rows to return per rule.
+
+    Returns:
+        The failure counts and the optional masks and samples.
+    """
+    lf = data.lazy()
+    failed = {name: rule.failed().alias(name) for name, rule in rules.items()}
+
+    summary = [pl.len().alias(_ROWS)] + [f.sum() for f in failed.values()]
+    if sample_size:
+        summary += [
+            f.arg_true().head(sample_size).implode().alias(_SAMPLE.format(name))
+            for name, f in failed.items()
+        ]
+
+    queries = [lf.select(summary)]
+    if masks:
+        queries.append(lf.select(failed.values()))
+    collected = pl.collect_all(queries)
+
+    totals = collected[0].row(0, named=True)
+    result = DQResult(rows=totals[_ROWS], failures={name: totals[name] for name in failed})
+    if masks:
+        result.masks = collected[1]
+    if sample_size:
+        positions = {name: totals[_SAMPLE.format(name)] for name in failed}
+        wanted = sorted({i for rows in positions.values() for i in rows})
+        sampled = lf.with_row_index(ROW_INDEX).filter(pl.col(ROW_INDEX).is_in(wanted)).collect()
+        for name, rows in positions.items():
+            result.samples[name] = sampled.filter(pl.col(ROW_INDEX).is_in(rows))
+    return result
+
+
+class ReservoirSampler:
+    """Uniform fixed-size samples of the failing rows of each rule, fed batch by batch.
+
+    Every row carries a pseudo-random key, and the sample of a rule is the `size` failing rows
+    with the smallest keys seen so far. That is a uniform sample without replacement of all
+    failing rows, held in memory proportional to `size`.
+
+    Args:
+        names: Names of the rules to sample for.
+        size: Maximum number of rows kept per rule.
+    """
+
+    def __init__(self, names: list[str], size: int):
+        self.size = size
+        self.samples: dict[str, pl.DataFrame | None] = dict.fromkeys(names)
+
+    def update(self, batch: pl.DataFrame) -> None:
+        """Offer a batch of rows carrying the failure flags and the sampling key."""
+        candidates = []
+        for name, sample in self.samples.items():
+            failing = pl.col(_FAILED.format(name))
+            if sample is not None and sample.height == self.size:
+                failing &= pl.col(_KEY) < sample[_KEY].max()
+            position = pl.int_range(pl.len(), dtype=pl.UInt32).filter(failing)
+            candidates.append(
+                position.bottom_k_by(pl.col(_KEY).filter(failing), self.size).implode().alias(name)
+            )
+        # One parallel pass over the batch finds each rule's candidates; only those are copied.
+        positions = batch.select(candidates).row(0, named=True)
+        rows = batch.select(c for c in batch.columns if not c.startswith(_FAILED.format("")))
+        for name, sample in self.samples.items():
+            if not positions[name]:
+                continue
+            new = rows[positions[name]]
+            if sample is not None:
+                new = pl.concat([sample, new])
+            self.samples[name] = new.bottom_k(self.size, by=_KEY)
+
+    def result(self, schema: pl.Schema) -> dict[str, pl.DataFrame]:
+        """Return the samples in row order, with empty frames for rules that never failed."""
+        return {
+            name: (pl.DataFrame(schema=schema) if sample is None else sample.sort(ROW_INDEX)).drop(
+                _KEY, strict=False
+            )
+            for name, sample in self.samples.items()
+        }
+
+
+def stream_evaluate(
+    data: pl.LazyFrame,
+    rules: Mapping[str, Rule] = RULES,
+    sample_size: int = 0,
+    seed: int = 0,
+) -> DQResult:
+    """Evaluate all rules over a dataset on Polars' streaming engine, in bounded memory.
+
+    The failure counts are aggregated by the streaming engine. Rows failing any rule are streamed
+    in batches through a `ReservoirSampler`, from the same scan of the input. Unlike `evaluate`,
+    the samples are drawn uniformly from all failing rows instead of being the first ones.
+
+    Args:
+        data: The dataset to check, e.g. from `etl.extract.scan_dataset`.
+        rules: Rules to evaluate, keyed by name.
+        sample_size: Maximum number of failing rows to sample per rule.
+        seed: Seed of the sampling keys; equal seeds give equal samples of equal data.
+
+    Returns:
+        The failure counts and the samples.
+    """
+    lf = data.lazy()
+    failed = {name: rule.failed().alias(name) for name, rule in rules.items()}
+    queries = [lf.select([pl.len().alias(_ROWS)] + [f.sum() for f in failed.values()])]
+
+    sampler = ReservoirSampler(list(failed), sample_size)
+    indexed = lf.with_row_index(ROW_INDEX)
+    if sample_size and failed:
+        flags = [f.alias(_FAILED.format(name)) for name, f in failed.items()]
+        failing = indexed.with_columns(*flags, pl.col(ROW_INDEX).hash(seed).alias(_KEY)).filter(
+            pl.any_horizontal(pl.col(_FAILED.format(name)) for name in failed)
+        )
+        queries.append(failing.sink_batches(sampler.update, lazy=True))
+    collected = pl.collect_all(queries, engine="streaming")
+
+    totals = collected[0].row(0, named=True)
+    result = DQResult(rows=totals[_ROWS], failures={name: totals[name] for name in failed})
+    if sample_size:
+        result.samples = sampler.result(indexed.collect_schema())
+    return result
+
+
+@timed("dq")
+def run_dq(
+    source: str = "input.csv",
+    rules: Mapping[str, Rule] = RULES,
+    sample_size: int | None = None,
+    streaming: bool = True,
+) -> DQResult | None:
+    """Run data quality checks on a dataset.
+
+    The source is scanned lazily and all rules are evaluated in one pass, on the streaming engine
+    by default so that memory use does not grow with the size of the input. Logs the number of
+    failed rows per rule and prints a summary.
 
-def run_dq() -> None:
-    """Run data quality checks on the raw input CSV.
+    Args:
+        source: CSV file in the raw directory, Parquet file or dataset directory in the
+            processed directory, or a path.
+        rules: Rules to evaluate, keyed by name.
+        sample_size: Failing rows to sample per rule; defaults to `settings.dq_sample_size`.
+        streaming: Whether to use the streaming engine rather than the in-memory one.
 
-    Reads the input CSV from the configured raw data directory and applies each rule from the RULES dictionary.
-    Logs the number of failed rows per rule and prints a summary.
+    Returns:
+        The result of the checks, or None if the source does not exist.
     """
-    file_path = f"{settings.raw_dir}/input.csv"
+    if sample_size is None:
+        sample_size = settings.dq_sample_size
     try:
-        df = pl.read_csv(file_path)
+        data = scan_dataset(source)
     except FileNotFoundError:
-        logger.error(f"Input file {file_path} not found.")
-        return
+        logger.error(f"Input {source} not found.")
+        return None
 
-    results: dict[str, int] = {}
-    for name, rule in RULES.items():
-        failing = df.filter(~rule(df))
-        results[name] = failing.shape[0]
-        logger.info(f"Rule {name}: {results[name]} failing rows")
+    if streaming:
+        result = stream_evaluate(data, rules, sample_size)
+    else:
+        result = evaluate(data, rules, sample_size=sample_size)
+    record(rows=result.rows)
+    for name, failures in result.failures.items():
+        logger.info(f"Rule {name}: {failures} failing rows")
 
     # Print summary to stdout
-    print(results)
+    print(result.failures)
+    return result
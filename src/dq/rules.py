@@ -1,21 +1,43 @@
 """Data quality rules for validating datasets.
 
-Each rule is a callable that accepts a Polars DataFrame and returns a Boolean mask or performs a check.
+Each rule wraps a Polars expression that is True for valid rows. Because rules are expressions
+rather than functions of a DataFrame, any number of them can be fused into a single query by
+`dq.checks.evaluate`. Rules remain callable on a DataFrame and then return the validity mask.
 """
 
+from dataclasses import dataclass
+
 import polars as pl
 
 
-# Define rules as functions returning boolean series
-def email_not_null(df: pl.DataFrame) -> pl.Series:
-    return df["email"].is_not_null()
+@dataclass(frozen=True)
+class Rule:
+    """A named data quality rule.
+
+    Attributes:
+        name: Unique name of the rule, used as the column name of its results.
+        expr: Boolean expression that is True for rows satisfying the rule. Rows where it
+            evaluates to null are not counted as failures.
+        description: Human-readable explanation of the rule.
+    """
+
+    name: str
+    expr: pl.Expr
+    description: str = ""
+
+    def __call__(self, df: pl.DataFrame) -> pl.Series:
+        return df.select(self.expr.alias(self.name)).to_series()
+
+    def failed(self) -> pl.Expr:
+        """Expression that is True exactly for the rows violating the rule."""
+        return (~self.expr).fill_null(False).alias(self.name)
+
 
+email_not_null = Rule("email_not_null", pl.col("email").is_not_null(), "Email must be present")
 
-def age_valid(df: pl.DataFrame) -> pl.Series:
-    return (df["age"] > 0) & (df["age"] < 120)
+age_valid = Rule(
+    "age_valid", (pl.col("age") > 0) & (pl.col("age") < 120), "Age must be between 1 and 119"
+)
 
 
-RULES = {
-    "email_not_null": email_not_null,
-    "age_valid": age_valid,
-}
+RULES: dict[str, Rule] = {rule.name: rule for rule in (email_not_null, age_valid)}
@@ -0,0 +1,274 @@
+"""Local cache of S3 objects, validated with conditional requests.
+
+Cached bodies live in ``blobs/`` under a name derived from bucket, key and ETag, so a blob never
+changes once written. A small JSON entry per object in ``index/`` records the ETag of its latest
+blob and when it was last used. Looking an object up sends a HEAD with ``If-None-Match``; S3
+answers ``304 Not Modified`` when the cached version is current. Otherwise the object is fetched
+with ``If-Match`` on the ETag of the HEAD, as one GET or, for large objects, parallel ranged
+GETs, so a blob cannot mix the parts of two versions.
+
+Blobs are copied (reflinked where the file system supports it) to their destination, never
+linked: the destination is an ordinary file that callers may modify, and its modification time
+is that of the blob, so it only changes when the object does.
+
+Several processes may share the cache: blobs and index entries are written to temporary files
+and renamed into place, a per-object ``flock`` keeps two processes from downloading the same
+object at once, and eviction takes an exclusive lock that readers only hold shared while they
+update the index and copy a blob out of the cache, not while they download. Blobs are evicted
+least recently used first, in the order recorded in the index.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from boto3.s3.transfer import create_transfer_manager
+from botocore.exceptions import ClientError
+from s3transfer.subscribers import BaseSubscriber
+
+from ..core.config import settings
+from ..core.logger import get_logger
+from ..core.utils import ensure_dir
+from .s3 import _bucket, get_s3_client, get_transfer_config
+
+logger = get_logger()
+
+_STALE_TMP_SECONDS = 3600
+# ioctl request that clones a file's extents on Linux (btrfs, XFS, ...).
+_FICLONE = 0x40049409
+
+
+@dataclass
+class CacheEntry:
+    """Index record of the cached version of an S3 object."""
+
+    bucket: str
+    key: str
+    etag: str
+    size: int
+    last_used: float = 0.0
+
+
+class ObjectCache:
+    """Size-capped, cross-process cache of S3 objects.
+
+    Args:
+        root: Cache directory; defaults to ``s3`` in `settings.cache_dir`.
+        max_bytes: Total size of cached blobs above which the least recently used are evicted;
+            defaults to `settings.s3_cache_mb`.
+    """
+
+    def __init__(self, root: str | None = None, max_bytes: int | None = None):
+        self.root = Path(root or f"{settings.cache_dir}/s3")
+        self.max_bytes = settings.s3_cache_mb * 2**20 if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_downloaded = 0
+        for sub in ("blobs", "index", "locks", "tmp"):
+            ensure_dir(self.root / sub)
+
+    def get(
+        self,
+        key: str,
+        dest: str | Path,
+        bucket: str | None = None,
+        subscribers: list[BaseSubscriber] | None = None,
+    ) -> bool:
+        """Place the current version of an object at `dest`, downloading it only if it changed.
+
+        `dest` is a copy of the cached blob. It is not rewritten while the object and the
+        copy are both unchanged, so it keeps its modification time.
+
+        Args:
+            key: The key of the S3 object.
+            dest: Local path to write the object to.
+            bucket: Bucket name; defaults to `settings.s3_bucket`.
+            subscribers: s3transfer subscribers notified of the download, if there is one.
+
+        Returns:
+            True if the cached copy was current and no object body was transferred.
+        """
+        bucket = _bucket(bucket)
+        name = _digest(bucket, key)
+        with self._lock(self.root / "locks" / f"{name}.lock", fcntl.LOCK_EX):
+            while True:
+                entry = self._read_entry(name)
+                downloaded = self._refresh(bucket, key, entry, subscribers)
+                try:
+                    with self._lock(self.root / ".evict.lock", fcntl.LOCK_SH):
+                        if downloaded is None:
+                            blob = self._blob(entry)
+                            if not blob.exists():
+                                continue  # evicted since it was validated
+                            self.hits += 1
+                        else:
+                            new, tmp = downloaded
+                            blob = self._blob(new)
+                            os.replace(tmp, blob)
+                            if entry and entry.etag != new.etag:
+                                self._blob(entry).unlink(missing_ok=True)
+                            entry = new
+                            self.misses += 1
+                        entry.last_used = time.time()
+                        self._write_entry(name, entry)
+                        _place(blob, Path(dest))
+                finally:
+                    if downloaded is not None:
+                        downloaded[1].unlink(missing_ok=True)
+                break
+        hit = downloaded is None
+        if not hit:
+            self.evict()
+        return hit
+
+    def evict(self) -> int:
+        """Remove least recently used blobs until the cache fits in `max_bytes`.
+
+        Returns:
+            The number of bytes freed.
+        """
+        freed = 0
+        with self._lock(self.root / ".evict.lock", fcntl.LOCK_EX):
+            now = time.time()
+            for tmp in (self.root / "tmp").iterdir():
+                if now - tmp.stat().st_mtime > _STALE_TMP_SECONDS:
+                    tmp.unlink(missing_ok=True)
+
+            # Blobs no longer referenced by an index entry sort first.
+            last_used = {}
+            for path in (self.root / "index").iterdir():
+                if entry := self._read_entry(path.stem):
+                    last_used[self._blob(entry).name] = (entry.last_used, path)
+            blobs = [(p.stat(), p) for p in (self.root / "blobs").iterdir()]
+            total = sum(stat.st_size for stat, _ in blobs)
+            for stat, path in sorted(blobs, key=lambda item: last_used.get(item[1].name, (0.0,))):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                if path.name in last_used:
+                    last_used[path.name][1].unlink(missing_ok=True)
+                total -= stat.st_size
+                freed += stat.st_size
+        if freed:
+            logger.info(f"Evicted {freed / 2**20:.1f} MB from the S3 cache")
+        return freed
+
+    def size(self) -> int:
+        """Return the total size of the cached blobs in bytes."""
+        return sum(p.stat().st_size for p in (self.root / "blobs").iterdir())
+
+    def _refresh(
+        self,
+        bucket: str,
+        key: str,
+        entry: CacheEntry | None,
+        subscribers: list[BaseSubscriber] | None = None,
+    ) -> tuple[CacheEntry, Path] | None:
+        """Download the object to a temporary file unless `entry` is current.
+
+        The cached version is validated by a HEAD with ``If-None-Match``, so no body is sent when
+        it is current. Otherwise the version reported by the HEAD is downloaded, as one GET or as
+        parallel ranged GETs, each with ``If-Match`` on its ETag.
+
+        Returns:
+            The entry of the new version and the file holding it, or None if `entry` is current.
+        """
+        client = get_s3_client()
+        kwargs = {"IfNoneMatch": entry.etag} if entry and self._blob(entry).exists() else {}
+        try:
+            head = client.head_object(Bucket=bucket, Key=key, **kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("304", "NotModified"):
+                logger.info(f"s3://{bucket}/{key} is unchanged; using the cached copy")
+                return None
+            raise
+
+        new = CacheEntry(bucket=bucket, key=key, etag=head["ETag"], size=head["ContentLength"])
+        tmp = self.root / "tmp" / uuid.uuid4().hex
+        try:
+            with create_transfer_manager(client, get_transfer_config()) as manager:
+                pinned = _PinnedVersion(new.size, new.etag)
+                manager.download(
+                    bucket, key, str(tmp), subscribers=[pinned, *(subscribers or [])]
+                ).result()
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self.bytes_downloaded += new.size
+        logger.info(f"Cached s3://{bucket}/{key} ({new.size} bytes, ETag {new.etag})")
+        return new, tmp
+
+    def _blob(self, entry: CacheEntry) -> Path:
+        return self.root / "blobs" / _digest(entry.bucket, entry.key, entry.etag)
+
+    def _read_entry(self, name: str) -> CacheEntry | None:
+        try:
+            return CacheEntry(**json.loads((self.root / "index" / f"{name}.json").read_text()))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+    def _write_entry(self, name: str, entry: CacheEntry) -> None:
+        tmp = self.root / "tmp" / uuid.uuid4().hex
+        tmp.write_text(json.dumps(entry.__dict__))
+        os.replace(tmp, self.root / "index" / f"{name}.json")
+
+    @staticmethod
+    @contextmanager
+    def _lock(path: Path, mode: int) -> Iterator[None]:
+        with open(path, "a") as f:
+            fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class _PinnedVersion(BaseSubscriber):
+    """Give a download the size and ETag already known, so every GET sends If-Match."""
+
+    def __init__(self, size: int, etag: str):
+        self._size = size
+        self._etag = etag
+
+    def on_queued(self, future, **kwargs):
+        future.meta.provide_transfer_size(self._size)
+        future.meta.provide_object_etag(self._etag)
+
+
+def _place(blob: Path, dest: Path) -> None:
+    """Copy a blob to `dest` atomically, unless `dest` is still the copy placed earlier.
+
+    The copy gets the blob's modification time, which together with its size tells whether it
+    was modified since.
+    """
+    ensure_dir(dest.parent)
+    stat = blob.stat()
+    try:
+        current = dest.stat()
+        if (current.st_size, current.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return
+    except FileNotFoundError:
+        pass
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}")
+    try:
+        with open(blob, "rb") as src, open(tmp, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                shutil.copyfileobj(src, dst, 2**20)
+        os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
@@ -1,10 +1,17 @@
 """Extraction functions for the ETL pipeline."""
 
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
 import polars as pl
+import pyarrow.parquet as pq
 
+from ..core.batches import iter_csv_batches
 from ..core.config import settings
 from ..core.logger import get_logger
-from .s3 import download_from_s3
+from ..core.schemas import check_csv, csv_options, schema_for
+from .ingest import cached
 
 logger = get_logger()
 
@@ -12,30 +19,161 @@ logger = get_logger()
 def extract_local(file_name: str) -> pl.DataFrame:
     """Read a CSV file from the raw data directory into a Polars DataFrame.
 
+    Files that have been ingested (see `etl.ingest`) are memory-mapped from their Arrow IPC copy
+    instead of being parsed. Otherwise, files with a registered schema (see `core.schemas`) are
+    parsed with their column types pinned instead of inferred, and their columns are checked for
+    drift.
+
     Args:
-        file_name: Name of the CSV file to read (within the raw directory).
+        file_name: Name of the CSV file to read (within the raw directory), or an absolute path.
 
     Returns:
         A Polars DataFrame containing the file contents.
     """
-    path = f"{settings.raw_dir}/{file_name}"
+    path = file_name if Path(file_name).is_absolute() else f"{settings.raw_dir}/{file_name}"
+    if (ingested := cached(path)) is not None:
+        logger.info(f"Reading local file {path} from {ingested}")
+        return pl.read_ipc(ingested, memory_map=True, rechunk=False)
     logger.info(f"Reading local file {path}")
-    return pl.read_csv(path)
+    df = pl.read_csv(path, **csv_options(path))
+    if (schema := schema_for(path)) is not None:
+        schema.check_columns(df.columns)
+    return df
+
+
+def scan_local(file_name: str) -> pl.LazyFrame:
+    """Lazily scan a CSV file from the raw data directory.
+
+    Nothing is read until the frame is collected or sunk, so filters and column selections applied
+    to the result are pushed down into the CSV reader. Ingested copies and registered schemas are
+    used as by `extract_local`; drift is checked from the header line only.
+
+    Args:
+        file_name: Name of the CSV file to scan (within the raw directory), or an absolute path.
+
+    Returns:
+        A Polars LazyFrame over the file contents.
+    """
+    path = file_name if Path(file_name).is_absolute() else f"{settings.raw_dir}/{file_name}"
+    if (ingested := cached(path)) is not None:
+        logger.info(f"Scanning local file {path} from {ingested}")
+        return pl.scan_ipc(ingested, memory_map=True)
+    logger.info(f"Scanning local file {path}")
+    check_csv(path)
+    return pl.scan_csv(path, **csv_options(path, lazy=True))
 
 
-def extract_from_s3(key: str) -> pl.DataFrame:
-    """Download a CSV from S3 and read it into a DataFrame.
+def scan_dataset(source: str) -> pl.LazyFrame:
+    """Lazily scan a CSV, Parquet or Arrow IPC file, or a directory of Parquet files.
 
-    This function will download the object specified by `key` from the configured S3 bucket
-    into the raw directory, then load it as a Polars DataFrame.
+    Relative names are looked up in the raw directory first and then in the processed directory.
+    Directories are scanned as (possibly hive-partitioned) Parquet datasets, and CSV files that
+    have been ingested are scanned from their memory-mapped Arrow IPC copy.
 
     Args:
-        key: S3 object key (path within the bucket)
+        source: File or directory name, or a path.
+
+    Returns:
+        A Polars LazyFrame over the dataset.
+
+    Raises:
+        FileNotFoundError: If the source does not exist.
+    """
+    path = Path(source)
+    if not path.exists() and not path.is_absolute():
+        candidates = [Path(base) / source for base in (settings.raw_dir, settings.processed_dir)]
+        path = next((p for p in candidates if p.exists()), path)
+    if not path.exists():
+        raise FileNotFoundError(f"No such file or dataset: {source}")
+
+    logger.info(f"Scanning dataset {path}")
+    if path.is_dir():
+        return pl.scan_parquet(path, hive_partitioning=True)
+    if path.suffix == ".parquet":
+        return pl.scan_parquet(path)
+    if path.suffix in (".arrow", ".feather", ".ipc"):
+        return pl.scan_ipc(path)
+    if (ingested := cached(path)) is not None:
+        return pl.scan_ipc(ingested, memory_map=True)
+    check_csv(path)
+    return pl.scan_csv(path, **csv_options(path, lazy=True))
+
+
+def read_s3_parquet(
+    key: str, columns: list[str] | None = None, filters: Any = None
+) -> pl.DataFrame:
+    """Read a Parquet object from S3 through ranged reads, fetching only what is needed.
+
+    The footer is read first; then only the chunks of the requested columns in the row groups
+    whose statistics may satisfy `filters` are downloaded.
+
+    Args:
+        key: Object key, or an ``s3://bucket/key`` URL.
+        columns: Columns to read; all by default.
+        filters: Row filter in `pyarrow.parquet.read_table` form, e.g. ``[("age", ">", 18)]``.
+
+    Returns:
+        A Polars DataFrame with the selected rows and columns.
+    """
+    from .s3 import S3RangeReader  # boto3 is only loaded when S3 is used
+
+    with S3RangeReader(key) as source:
+        table = pq.read_table(source, columns=columns, filters=filters)
+        logger.info(
+            f"Read {table.num_rows} rows from s3://{source.bucket}/{source.key} with "
+            f"{source.requests} ranged GETs ({source.bytes_fetched} of {source.size} bytes)"
+        )
+    return pl.from_arrow(table)
+
+
+def iter_s3_csv_batches(key: str, batch_size: int = 100_000) -> Iterator[pl.DataFrame]:
+    """Stream a (possibly gzip- or zstd-compressed) CSV object from S3 in bounded batches.
+
+    Args:
+        key: Object key, or an ``s3://bucket/key`` URL.
+        batch_size: Maximum number of rows per batch.
+
+    Yields:
+        Polars DataFrames sharing the schema inferred from the first batch.
+    """
+    from .s3 import open_s3_object
+
+    with open_s3_object(key) as stream:
+        yield from iter_csv_batches(stream, batch_size, **csv_options(key))
+
+
+def extract_from_s3(
+    key: str, stream: bool = False, columns: list[str] | None = None, filters: Any = None
+) -> pl.DataFrame:
+    """Read a CSV or Parquet object from S3 into a DataFrame.
+
+    By default the object specified by `key` is downloaded from the configured S3 bucket into the
+    raw directory and then loaded as a CSV. With `stream`, nothing touches the local disk: CSV
+    objects (optionally gzip- or zstd-compressed) are decompressed and parsed as they are
+    received, and Parquet objects are read with ranged GETs of just the needed row groups and
+    columns. CSV objects with a registered schema are parsed with pinned column types.
+
+    Args:
+        key: S3 object key (path within the bucket), or an ``s3://bucket/key`` URL when streaming.
+        stream: Read directly from S3 instead of downloading the object first.
+        columns: Columns to read when streaming.
+        filters: Row filter for Parquet objects, see `read_s3_parquet`.
 
     Returns:
         A Polars DataFrame containing the data.
     """
-    # download file
-    local_path = download_from_s3(key, destination_dir=settings.raw_dir)
-    logger.info(f"Downloaded {key} to {local_path}")
-    return pl.read_csv(local_path)
+    from .s3 import download_from_s3, open_s3_object
+
+    if stream:
+        if key.endswith(".parquet"):
+            return read_s3_parquet(key, columns, filters)
+        with open_s3_object(key) as source:
+            df = pl.read_csv(source, **csv_options(key, columns))
+    else:
+        # download file
+        local_path = download_from_s3(key, destination_dir=settings.raw_dir)
+        logger.info(f"Downloaded {key} to {local_path}")
+        df = pl.read_csv(local_path, **csv_options(local_path))
+    if not columns and (schema := schema_for(key)) is not None:
+        schema.check_columns(df.columns)
+    return df
@@ -0,0 +1,107 @@
+"""One-time conversion of raw CSV files into a memory-mappable Arrow IPC cache.
+
+Every stage that reads a raw CSV (ETL, DQ) would otherwise parse the text again. `ingest_file`
+parses a file once, with the column types of its registered schema, and writes it uncompressed
+to Arrow IPC under `settings.cache_dir`. The readers in `etl.extract` then memory-map that copy
+instead of parsing the CSV, so loading it costs little more than mapping the pages.
+
+A cached copy is used only while the size and modification time of its source are unchanged;
+anything else falls back to parsing the CSV until the file is ingested again.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import polars as pl
+
+from ..core.config import settings
+from ..core.logger import get_logger
+from ..core.schemas import check_csv, csv_options
+from ..core.utils import ensure_dir
+
+logger = get_logger()
+
+
+@dataclass
+class IngestResult:
+    """Outcome of ingesting one raw file."""
+
+    source: str
+    target: str
+    rows: int
+    bytes_in: int
+    seconds: float
+    converted: bool
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_in / 1e6 / self.seconds if self.seconds else 0.0
+
+
+def cache_path(source: str | Path) -> Path:
+    """Return the location of the Arrow IPC copy of a raw file under `settings.cache_dir`."""
+    resolved = str(Path(source).resolve())
+    digest = hashlib.sha1(resolved.encode()).hexdigest()[:12]
+    return Path(settings.cache_dir) / "ingest" / f"{Path(source).stem}-{digest}.arrow"
+
+
+def cached(source: str | Path) -> Path | None:
+    """Return the Arrow IPC copy of a raw file if it is up to date with the file, else None."""
+    target = cache_path(source)
+    try:
+        meta = json.loads(_meta_path(target).read_text())
+        stat = os.stat(source)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if (meta["size"], meta["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        return None
+    return target if target.exists() else None
+
+
+def ingest_file(source: str | Path, force: bool = False) -> IngestResult:
+    """Convert a raw CSV file into its Arrow IPC cache copy, unless it is already up to date.
+
+    The file is parsed with `core.schemas.csv_options` and streamed to an uncompressed IPC file,
+    so memory use stays bounded and the copy can be memory-mapped without decoding.
+
+    Args:
+        source: Path of the CSV file.
+        force: Convert the file even if its cached copy is up to date.
+
+    Returns:
+        The cache location, row count and timing; `converted` is False if the copy was reused.
+    """
+    start = time.perf_counter()
+    path = Path(source).resolve()
+    target = cache_path(path)
+    stat = path.stat()
+    converted = force or cached(path) is None
+    if converted:
+        logger.info(f"Ingesting {path} into {target}")
+        check_csv(path)
+        ensure_dir(target.parent)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        lf = pl.scan_csv(path, **csv_options(path, lazy=True))
+        lf.sink_ipc(tmp, compression="uncompressed")
+        os.replace(tmp, target)
+        meta = {"source": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        tmp_meta = _meta_path(tmp)
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_meta, _meta_path(target))
+    rows = pl.scan_ipc(target).select(pl.len()).collect().item()
+    return IngestResult(
+        source=str(path),
+        target=str(target),
+        rows=rows,
+        bytes_in=stat.st_size,
+        seconds=time.perf_counter() - start,
+        converted=converted,
+    )
+
+
+def _meta_path(target: Path) -> Path:
+    return target.with_name(f"{target.name}.json")
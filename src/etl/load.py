@@ -1,10 +1,16 @@
 """Load functions for the ETL pipeline."""
 
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 import polars as pl
 
 from ..core.config import settings
 from ..core.logger import get_logger
-from .snowflake import load_parquet_to_snowflake
+from ..core.utils import ensure_dir
+
+if TYPE_CHECKING:
+    from .snowflake import LoadReport
 
 logger = get_logger()
 
@@ -14,23 +20,74 @@ def load_parquet(df: pl.DataFrame, file_name: str) -> str:
 
     Args:
         df: DataFrame to write.
-        file_name: Name of the Parquet file (within processed directory).
+        file_name: Name of the Parquet file (within processed directory), or an absolute path.
+            Missing parent directories are created.
 
     Returns:
         The path to the Parquet file.
     """
-    path = f"{settings.processed_dir}/{file_name}"
+    path = file_name if Path(file_name).is_absolute() else f"{settings.processed_dir}/{file_name}"
+    ensure_dir(Path(path).parent)
     logger.info(f"Writing Parquet to {path}")
     df.write_parquet(path)
     return path
 
 
-def load_snowflake(parquet_path: str, table_name: str) -> None:
-    """Load a Parquet file into a Snowflake table.
+def sink_parquet(lf: pl.LazyFrame, file_name: str, snowflake_table: str | None = None) -> str:
+    """Execute a LazyFrame with the streaming engine and write it to the processed directory.
+
+    Data flows through the query in batches, so the result never has to fit in memory. With a
+    `snowflake_table`, the same batches are also uploaded to Snowflake as they are produced,
+    without re-reading the Parquet file.
+
+    Args:
+        lf: LazyFrame to execute.
+        file_name: Name of the Parquet file (within processed directory), or an absolute path.
+            Missing parent directories are created.
+        snowflake_table: Snowflake table (schema.table) to load the result into as well.
+
+    Returns:
+        The path to the Parquet file.
+    """
+    path = str(Path(settings.processed_dir, file_name))
+    ensure_dir(Path(path).parent)
+    logger.info(f"Streaming Parquet to {path}")
+    if snowflake_table is None:
+        lf.sink_parquet(path)
+        return path
+
+    from .snowflake import FrameUploader  # the connector is only loaded for Snowflake loads
+
+    uploader = FrameUploader(snowflake_table)
+    try:
+        pl.collect_all(
+            [lf.sink_parquet(path, lazy=True), lf.sink_batches(uploader.write, lazy=True)],
+            engine="streaming",
+        )
+    except BaseException:
+        uploader.abort()
+        raise
+    uploader.close()
+    return path
+
+
+def load_snowflake(data: str | pl.DataFrame | pl.LazyFrame, table_name: str) -> "LoadReport":
+    """Load a Parquet file or an in-memory frame into a Snowflake table.
+
+    Frames are serialized to Parquet in memory and uploaded as they are produced, see
+    `load_frame_to_snowflake`.
 
     Args:
-        parquet_path: Path to the Parquet file to load.
+        data: Path to the Parquet file or dataset directory to load, or a DataFrame or LazyFrame.
         table_name: Name of the target Snowflake table (schema.table).
+
+    Returns:
+        The load statistics.
     """
-    logger.info(f"Loading {parquet_path} into Snowflake table {table_name}")
-    load_parquet_to_snowflake(parquet_path, table_name)
+    from .snowflake import load_frame_to_snowflake, load_parquet_to_snowflake
+
+    if isinstance(data, str):
+        logger.info(f"Loading {data} into Snowflake table {table_name}")
+        return load_parquet_to_snowflake(data, table_name)
+    logger.info(f"Loading {type(data).__name__} into Snowflake table {table_name}")
+    return load_frame_to_snowflake(data, table_name)
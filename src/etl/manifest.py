@@ -0,0 +1,142 @@
+"""File-fingerprint manifest used to skip unchanged inputs in incremental ETL runs."""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from ..core.config import settings
+from ..core.utils import ensure_dir
+
+
+@dataclass
+class Fingerprint:
+    """Identity of a file's contents at a point in time."""
+
+    size: int
+    mtime_ns: int
+    sha256: str | None = None  # None if the contents were not hashed
+
+    @classmethod
+    def of(cls, path: str | Path, digest: bool = True) -> "Fingerprint":
+        """Stat a file and, with `digest`, hash its contents."""
+        stat = os.stat(path)
+        sha256 = None
+        if digest:
+            with open(path, "rb") as f:
+                sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+        return cls(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=sha256)
+
+
+@dataclass
+class ManifestEntry:
+    """Fingerprint of one input file and the output artifacts produced from it."""
+
+    fingerprint: Fingerprint
+    outputs: list[str] = field(default_factory=list)
+
+
+class Manifest:
+    """Mapping of input paths to their last processed fingerprint and output artifacts.
+
+    Unchanged files are detected from size and modification time alone; the content hash is only
+    computed when those differ, so a no-op check costs one `stat` per file. Inputs recorded
+    without a hash (by non-incremental runs) count as changed as soon as their stat differs.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str | Path, options: dict[str, Any] | None = None):
+        self.path = Path(path)
+        self.options = options or {}
+        self.entries: dict[str, ManifestEntry] = {}
+        self.dirty = False
+        self._hashed: dict[str, Fingerprint] = {}
+
+    @classmethod
+    def for_output(cls, output: str | Path) -> Path:
+        """Return the manifest location under `settings.cache_dir` for an output artifact."""
+        resolved = str(Path(output).resolve())
+        digest = hashlib.sha1(resolved.encode()).hexdigest()[:12]
+        return Path(settings.cache_dir) / "etl" / f"{Path(output).name}-{digest}.json"
+
+    @classmethod
+    def load(cls, path: str | Path, options: dict[str, Any] | None = None) -> "Manifest":
+        """Load a manifest, starting empty if it is missing or was built with other options.
+
+        Args:
+            path: Location of the manifest JSON file.
+            options: Pipeline options that influence the outputs. Entries recorded under
+                different options are discarded so every input is processed again.
+        """
+        manifest = cls(path, options)
+        try:
+            data = json.loads(manifest.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return manifest
+        if data.get("version") != cls.VERSION or data.get("options") != manifest.options:
+            return manifest
+        for source, entry in data["entries"].items():
+            manifest.entries[source] = ManifestEntry(
+                fingerprint=Fingerprint(**entry["fingerprint"]), outputs=entry["outputs"]
+            )
+        return manifest
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+        ensure_dir(self.path.parent)
+        data = {
+            "version": self.VERSION,
+            "options": self.options,
+            "entries": {source: asdict(entry) for source, entry in self.entries.items()},
+        }
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def is_unchanged(self, source: str | Path) -> bool:
+        """Return True if `source` matches its recorded fingerprint.
+
+        When only the size or modification time differ but the content hash still matches, the
+        stored stat information is refreshed so the next check is cheap again.
+        """
+        entry = self.entries.get(str(source))
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            return False
+        recorded = entry.fingerprint
+        if stat.st_size == recorded.size and stat.st_mtime_ns == recorded.mtime_ns:
+            return True
+        if recorded.sha256 is None:
+            return False
+        current = Fingerprint.of(source)
+        if current.sha256 != recorded.sha256:
+            self._hashed[str(source)] = current
+            return False
+        entry.fingerprint = current
+        self.dirty = True
+        return True
+
+    def pop_hashed(self, source: str | Path) -> Fingerprint | None:
+        """Return, once, the fingerprint `is_unchanged` computed for a changed `source`, if any."""
+        return self._hashed.pop(str(source), None)
+
+    def fingerprint(self, source: str | Path) -> Fingerprint:
+        """Return the hashed fingerprint of `source`, reusing the one computed by `is_unchanged`."""
+        return self.pop_hashed(source) or Fingerprint.of(source)
+
+    def record(self, source: str | Path, fingerprint: Fingerprint, outputs: list[str]) -> None:
+        """Store the fingerprint and outputs of a processed input."""
+        self.entries[str(source)] = ManifestEntry(fingerprint=fingerprint, outputs=outputs)
+        self.dirty = True
+
+    def forget(self, source: str | Path) -> ManifestEntry | None:
+        """Remove an input from the manifest, returning its previous entry."""
+        self.dirty = True
+        return self.entries.pop(str(source), None)
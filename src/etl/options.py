@@ -0,0 +1,17 @@
+"""Option types shared by the ETL modules and the CLI.
+
+Kept free of third-party imports so the CLI can declare its options without loading Polars.
+"""
+
+from enum import Enum
+
+# Partition column derived from the modification time of each raw file.
+INGEST_DATE = "ingest_date"
+
+
+class Engine(str, Enum):
+    """Execution strategy for the ETL pipeline."""
+
+    EAGER = "eager"  # read the whole CSV, filter in memory, then write
+    LAZY = "lazy"  # optimised LazyFrame plan, collected in memory before writing
+    STREAMING = "streaming"  # optimised LazyFrame plan sunk to Parquet by the streaming engine
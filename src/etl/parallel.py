@@ -0,0 +1,298 @@
+"""Parallel ETL over many raw files with hive-partitioned Parquet output."""
+
+import glob
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+import polars as pl
+from rich.table import Table
+
+from ..core.config import settings
+from ..core.logger import get_logger
+from ..core.metrics import record, timed
+from .extract import extract_local
+from .load import load_parquet
+from .manifest import Fingerprint, Manifest
+from .options import INGEST_DATE
+from .pipeline import ADULTS, Pipeline
+
+logger = get_logger()
+
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+_GLOB_CHARS = set("*?[")
+
+
+@dataclass
+class FileResult:
+    """Outcome of processing a single raw file."""
+
+    source: str
+    rows_in: int
+    rows_out: int
+    bytes_in: int
+    seconds: float
+    outputs: list[str] = field(default_factory=list)
+    fingerprint: Fingerprint | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_in / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_in / 1e6 / self.seconds if self.seconds else 0.0
+
+
+def is_dataset_source(source: str) -> bool:
+    """Return True if `source` names a directory or glob rather than a single file."""
+    return bool(_GLOB_CHARS & set(source)) or _raw_path(source).is_dir()
+
+
+def resolve_sources(source: str) -> list[Path]:
+    """Expand a file name, directory or glob (relative to the raw directory) into CSV paths.
+
+    Args:
+        source: File name, directory or glob pattern. Relative values are resolved against
+            `settings.raw_dir`; `**` matches nested directories.
+
+    Returns:
+        Sorted absolute paths of the matching files.
+    """
+    # Resolve and sort plain strings once; per-path work dominates no-op incremental runs.
+    path = _raw_path(source).absolute()
+    if path.is_dir():
+        base = path.resolve()
+        with os.scandir(base) as entries:
+            names = sorted(e.name for e in entries if e.name.endswith(".csv") and e.is_file())
+        return [base / name for name in names]
+    if _GLOB_CHARS & set(source):
+        matches = sorted(p for p in glob.glob(str(path), recursive=True) if os.path.isfile(p))
+        return [Path(p) for p in matches]
+    return [path.resolve()] if path.is_file() else []
+
+
+def partition_path(keys: list[str], values: tuple[Any, ...]) -> str:
+    """Build the hive-style directory (``key=value/...``) for one partition."""
+    parts = []
+    for key, value in zip(keys, values):
+        text = HIVE_NULL if value is None else quote(str(value), safe="")
+        parts.append(f"{key}={text}")
+    return "/".join(parts)
+
+
+def process_file(
+    source: str,
+    dataset_dir: str,
+    partition_by: list[str],
+    columns: list[str] | None = None,
+    pipeline: Pipeline = ADULTS,
+    fingerprint: Fingerprint | None = None,
+    digest: bool = True,
+) -> FileResult:
+    """Extract, transform and load one raw file into a partitioned dataset.
+
+    Each partition receives one Parquet file named after the source file, so files processed
+    concurrently never write to the same path.
+
+    Args:
+        source: Absolute path of the CSV file.
+        dataset_dir: Absolute path of the dataset root directory.
+        partition_by: Columns to partition by; `ingest_date` is derived if absent.
+        columns: Optional subset of columns to keep in the output.
+        pipeline: Transform applied to the rows; must keep the partition columns.
+        fingerprint: Fingerprint of the input, if it has already been computed.
+        digest: Whether to hash the input when computing its fingerprint; only incremental runs
+            need the hash.
+
+    Returns:
+        Row, byte and timing figures for the file, with outputs relative to `dataset_dir`.
+    """
+    start = time.perf_counter()
+    path = Path(source)
+    fingerprint = fingerprint or Fingerprint.of(path, digest)
+    df = extract_local(source)
+    if INGEST_DATE in partition_by and INGEST_DATE not in df.columns:
+        landed = date.fromtimestamp(path.stat().st_mtime)
+        df = df.with_columns(pl.lit(landed).alias(INGEST_DATE))
+
+    lf = pipeline.transform(df.lazy())
+    if columns:
+        lf = lf.select([*columns, *(k for k in partition_by if k not in columns)])
+    df_t = lf.collect()
+
+    outputs = []
+    for values, part in df_t.partition_by(partition_by, as_dict=True, include_key=False).items():
+        name = f"{partition_path(partition_by, values)}/{path.stem}.parquet"
+        load_parquet(part, f"{dataset_dir}/{name}")
+        outputs.append(name)
+
+    return FileResult(
+        source=source,
+        rows_in=len(df),
+        rows_out=len(df_t),
+        bytes_in=fingerprint.size,
+        seconds=time.perf_counter() - start,
+        outputs=outputs,
+        fingerprint=fingerprint,
+    )
+
+
+@timed("etl_parallel")
+def run_parallel_etl(
+    source: str,
+    output: str,
+    partition_by: list[str] | None = None,
+    workers: int | None = None,
+    columns: list[str] | None = None,
+    incremental: bool = False,
+    pipeline: Pipeline = ADULTS,
+) -> list[FileResult]:
+    """Run the ETL pipeline over every file matched by `source` using a process pool.
+
+    Full runs build the dataset in a staging directory and swap it into place once all files are
+    done, so readers never observe a partially written dataset. Incremental runs consult the
+    file-fingerprint manifest and only process new or changed inputs, replacing just the files
+    those inputs produced and removing the outputs of inputs that have disappeared.
+
+    Args:
+        source: Directory or glob of CSV files, relative to the raw directory.
+        output: Name of the dataset directory in the processed directory.
+        partition_by: Partition columns; defaults to the ingestion date of each file.
+        workers: Number of worker processes; defaults to the number of CPUs.
+        columns: Optional subset of columns to keep in the output.
+        incremental: Skip inputs whose fingerprint matches the manifest.
+        pipeline: Transform applied to every file; see `etl.pipeline`.
+
+    Returns:
+        One `FileResult` per processed input file, in input order.
+    """
+    partition_by = partition_by or [INGEST_DATE]
+    workers = workers or os.cpu_count() or 1
+    sources = resolve_sources(source)
+    stems = [p.stem for p in sources]
+    if len(set(stems)) != len(stems):
+        raise ValueError(f"Input files matched by {source} must have unique names")
+
+    dataset = _processed_path(output).resolve()
+    staging = dataset.with_name(f"{dataset.name}.staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    options = {"partition_by": partition_by, "columns": columns}
+    if pipeline is not ADULTS:
+        options["pipeline"] = repr(pipeline)
+    manifest = Manifest.load(Manifest.for_output(dataset), options)
+
+    full = not (incremental and manifest.entries and dataset.exists())
+    if full:
+        manifest.entries.clear()
+        pending = sources
+        removed: set[str] = set()
+    else:
+        pending = [p for p in sources if not manifest.is_unchanged(p)]
+        removed = set(manifest.entries) - {str(p) for p in sources}
+        if not pending and not removed:
+            if manifest.dirty:
+                manifest.save()
+            logger.info(f"All {len(sources)} files from {source} are unchanged; nothing to do")
+            return []
+
+    logger.info(
+        f"Processing {len(pending)} of {len(sources)} files from {source} with {workers} workers"
+    )
+    # Inputs already hashed by `is_unchanged` pass their fingerprint on; the rest are hashed (if
+    # at all) by the workers, in parallel.
+    args = [
+        (str(p), str(staging), partition_by, columns, pipeline, manifest.pop_hashed(p), incremental)
+        for p in pending
+    ]
+    results = _process_all(args, workers)
+
+    if full:
+        shutil.rmtree(dataset, ignore_errors=True)
+        if staging.exists():
+            staging.rename(dataset)
+        else:
+            dataset.mkdir(parents=True)
+    else:
+        for stale in removed:
+            _remove_outputs(dataset, manifest.forget(stale).outputs)
+        for r in results:
+            for name in r.outputs:
+                (dataset / name).parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staging / name, dataset / name)
+            previous = manifest.entries.get(r.source)
+            if previous:
+                _remove_outputs(dataset, sorted(set(previous.outputs) - set(r.outputs)))
+        shutil.rmtree(staging, ignore_errors=True)
+
+    for r in results:
+        manifest.record(r.source, r.fingerprint, r.outputs)
+    record(rows=sum(r.rows_in for r in results), bytes=sum(r.bytes_in for r in results))
+    manifest.save()
+    logger.info(f"Wrote {sum(len(r.outputs) for r in results)} Parquet files to {dataset}")
+    return results
+
+
+def _process_all(args: list[tuple], workers: int) -> list[FileResult]:
+    if workers == 1 or len(args) <= 1:
+        return [process_file(*a) for a in args]
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    ) as pool:
+        futures = [pool.submit(process_file, *a) for a in args]
+        return [f.result() for f in futures]
+
+
+def _remove_outputs(dataset: Path, outputs: list[str]) -> None:
+    # Delete an input's output files and any partition directories left empty.
+    for name in outputs:
+        path = dataset / name
+        path.unlink(missing_ok=True)
+        for parent in path.parents:
+            if parent == dataset or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+
+def render_report(results: list[FileResult]) -> Table:
+    """Summarise per-file throughput of a parallel run as a Rich table."""
+    table = Table(title="ETL throughput")
+    for column in ("file", "rows in", "rows out", "MB", "seconds", "rows/s", "MB/s"):
+        table.add_column(column, justify="left" if column == "file" else "right")
+    for r in results:
+        table.add_row(
+            Path(r.source).name,
+            f"{r.rows_in:,}",
+            f"{r.rows_out:,}",
+            f"{r.bytes_in / 1e6:.2f}",
+            f"{r.seconds:.3f}",
+            f"{r.rows_per_second:,.0f}",
+            f"{r.mb_per_second:.1f}",
+        )
+    return table
+
+
+def _init_worker(threads: int) -> None:
+    # Cap each worker's Polars thread pool so processes do not oversubscribe the CPUs.
+    os.environ["POLARS_MAX_THREADS"] = str(threads)
+
+
+def _raw_path(source: str) -> Path:
+    path = Path(source)
+    return path if path.is_absolute() else Path(settings.raw_dir) / source
+
+
+def _processed_path(output: str) -> Path:
+    path = Path(output)
+    return path if path.is_absolute() else Path(settings.processed_dir) / output
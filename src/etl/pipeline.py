@@ -0,0 +1,338 @@
+"""Declarative transform pipelines compiled into a single Polars query plan.
+
+A pipeline is a DAG of named nodes. Each node reads a source or another node and applies a list
+of steps (filter, select, cast, join, dedupe, aggregate). Nothing is materialized between steps:
+`Pipeline.build` chains them into LazyFrames, so Polars can push predicates and projections down
+across all steps into the scans. `Pipeline.run` sinks every output with one `pl.collect_all`, which
+executes independent branches concurrently and computes shared upstream nodes once.
+
+Pipelines can be written in Python or loaded from YAML (with the optional PyYAML package)::
+
+    sources:
+      people: input.csv
+      countries: countries.csv
+    nodes:
+      adults:
+        input: people
+        steps:
+          - filter: age > 18
+          - dedupe: [id]
+      by_country:
+        input: adults
+        steps:
+          - join: {right: countries, on: country}
+          - aggregate: {by: [name], aggs: [count(id) AS adults, avg(age) AS avg_age]}
+    outputs:
+      adults: adults.parquet
+      by_country: by_country.parquet
+
+Expressions are SQL expressions, parsed with `pl.sql_expr`.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar, Literal
+
+import polars as pl
+
+from ..core.config import settings
+from ..core.logger import get_logger
+from ..core.utils import ensure_dir
+from .extract import scan_dataset
+
+try:
+    import yaml
+except ImportError:  # optional: only needed for YAML pipeline files
+    yaml = None
+
+logger = get_logger()
+
+Frames = Mapping[str, pl.LazyFrame]
+
+
+class Step(ABC):
+    """A transformation of one LazyFrame, which may refer to other nodes of the pipeline."""
+
+    kind: ClassVar[str]
+
+    @abstractmethod
+    def apply(self, lf: pl.LazyFrame, frames: Frames) -> pl.LazyFrame:
+        """Return `lf` transformed; `frames` holds the LazyFrames of the other nodes."""
+
+    def depends_on(self) -> list[str]:
+        """Return the names of the other nodes or sources this step reads."""
+        return []
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> "Step":
+        """Build the step from its YAML value: a mapping of arguments or a single argument."""
+        return cls(**spec) if isinstance(spec, Mapping) else cls(spec)
+
+
+@dataclass(frozen=True)
+class Filter(Step):
+    """Keep the rows matching a SQL predicate, e.g. ``age > 18``."""
+
+    kind = "filter"
+    predicate: str
+
+    def apply(self, lf: pl.LazyFrame, frames: Frames) -> pl.LazyFrame:
+        return lf.filter(pl.sql_expr(self.predicate))
+
+
+@dataclass(frozen=True)
+class Select(Step):
+    """Project columns or SQL expressions, e.g. ``age * 12 AS age_months``."""
+
+    kind = "select"
+    columns: tuple[str, ...]
+
+    def __init__(self, columns: str | list[str] | tuple[str, ...]):
+        object.__setattr__(self, "columns", _as_tuple(columns))
+
+    def apply(self, lf: pl.LazyFrame, frames: Frames) -> pl.LazyFrame:
+        return lf.select(pl.sql_expr(list(self.columns)))
+
+
+@dataclass(frozen=True)
+class Cast(Step):
+    """Cast columns to Polars data types given by name, e.g. ``{"age": "Int32"}``."""
+
+    kind = "cast"
+    dtypes: tuple[tuple[str, str], ...]
+
+    def __init__(self, dtypes: Mapping[str, str] | tuple[tuple[str, str], ...]):
+        object.__setattr__(self, "dtypes", tuple(dict(dtypes).items()))
+        for _, name in self.dtypes:
+            _dtype(name)
+
+    def apply(self, lf: pl.LazyFrame, frames: Frames) -> pl.LazyFrame:
+        return lf.cast({column: _dtype(name) for column, name in self.dtypes})
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> "Cast":
+        return cls(spec)
+
+
+@dataclass(frozen=True)
+class Join(Step):
+    """Join another node or source on key columns."""
+
+    kind = "join"
+    right: str
+    on: tuple[str, ...]
+    how: Literal["inner", "left", "full", "semi", "anti", "cross"] = "inner"
+
+    def __init__(self, right: str, on: str | list[str], how: str = "inner"):
+        object.__setattr__(self, "right", right)
+        object.__setattr__(self, "on", _as_tuple(on))
+        object.__setattr__(self, "how", how)
+
+    def apply(self, lf: pl.LazyFrame, frames: Frames) -> pl.LazyFrame:
+        return lf.join(frames[self.right], on=list(self.on), how=self.how)
+
+    def depends_on(self) -> list[str]:
+        return [self.right]
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> "Join":
+        # YAML 1.1 reads an unquoted `on:` key as the boolean True.
+        return cls(**{"on" if key is True else key: value for key, value in spec.items()})
+
+
+@dataclass(frozen=True)
+class Dedupe(Step):
+    """Drop duplicate rows, or rows with duplicate `subset` columns, keeping their order."""
+
+    kind = "dedupe"
+    subset: tuple[str, ...] | None = None
+    keep: Literal["first", "last", "any", "none"] = "first"
+
+    def __init__(self, subset: str | list[str] | None = None, keep: str = "first"):
+        object.__setattr__(self, "subset", None if subset is None else _as_tuple(subset))
+        object.__setattr__(self, "keep", keep)
+
+    def apply(self, lf: pl.LazyFrame, frames: Frames) -> pl.LazyFrame:
+        subset = None if self.subset is None else list(self.subset)
+        return lf.unique(subset=subset, keep=self.keep, maintain_order=True)
+
+
+@dataclass(frozen=True)
+class Aggregate(Step):
+    """Group by columns and compute SQL aggregates, e.g. ``avg(age) AS avg_age``."""
+
+    kind = "aggregate"
+    by: tuple[str, ...]
+    aggs: tuple[str, ...]
+
+    def __init__(self, by: str | list[str], aggs: str | list[str]):
+        object.__setattr__(self, "by", _as_tuple(by))
+        object.__setattr__(self, "aggs", _as_tuple(aggs))
+
+    def apply(self, lf: pl.LazyFrame, frames: Frames) -> pl.LazyFrame:
+        return lf.group_by(list(self.by), maintain_order=True).agg(pl.sql_expr(list(self.aggs)))
+
+
+STEPS: dict[str, type[Step]] = {
+    step.kind: step for step in (Filter, Select, Cast, Join, Dedupe, Aggregate)
+}
+
+
+@dataclass
+class Node:
+    """A named result: the steps applied in order to a source or another node."""
+
+    input: str
+    steps: list[Step] = field(default_factory=list)
+
+
+@dataclass
+class Pipeline:
+    """A DAG of transform nodes over named sources.
+
+    Attributes:
+        sources: Dataset names or paths, resolved by `etl.extract.scan_dataset`, by source name;
+            None for sources that are always passed in as frames.
+        nodes: The transform nodes by name.
+        outputs: Parquet file names in the processed directory by node name.
+    """
+
+    sources: dict[str, str | None] = field(default_factory=dict)
+    nodes: dict[str, Node] = field(default_factory=dict)
+    outputs: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, spec: Mapping[str, Any]) -> "Pipeline":
+        """Build a pipeline from its dictionary (e.g. parsed YAML) form.
+
+        Raises:
+            ValueError: If a step kind is unknown or a node refers to an unknown name.
+        """
+        nodes = {}
+        for name, node in spec.get("nodes", {}).items():
+            steps = []
+            for step in node.get("steps", []):
+                if not isinstance(step, Mapping) or len(step) != 1:
+                    raise ValueError(f"Node {name}: each step must be a single-key mapping")
+                ((kind, args),) = step.items()
+                if kind not in STEPS:
+                    raise ValueError(f"Node {name}: unknown step {kind!r}")
+                steps.append(STEPS[kind].from_spec(args))
+            nodes[name] = Node(input=node["input"], steps=steps)
+        pipeline = cls(
+            sources=dict(spec.get("sources", {})),
+            nodes=nodes,
+            outputs=dict(spec.get("outputs", {})),
+        )
+        pipeline.order()
+        return pipeline
+
+    @classmethod
+    def from_yaml(cls, path: str | Path) -> "Pipeline":
+        """Load a pipeline from a YAML file; requires the PyYAML package."""
+        if yaml is None:
+            raise RuntimeError("Reading YAML pipelines requires the pyyaml package")
+        with open(path) as f:
+            return cls.from_dict(yaml.safe_load(f))
+
+    def order(self) -> list[str]:
+        """Return the node names in dependency order.
+
+        Raises:
+            ValueError: If a node refers to an unknown name or the nodes form a cycle.
+        """
+        ordered: list[str] = []
+        visiting: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in ordered or name in self.sources:
+                return
+            if name not in self.nodes:
+                raise ValueError(f"Unknown node or source {name!r}")
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through {name!r}")
+            visiting.add(name)
+            node = self.nodes[name]
+            for dependency in [node.input, *(d for s in node.steps for d in s.depends_on())]:
+                visit(dependency)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in [*self.nodes, *self.outputs]:
+            visit(name)
+        return ordered
+
+    def build(self, inputs: Frames | None = None) -> dict[str, pl.LazyFrame]:
+        """Compile every node into a LazyFrame, without executing anything.
+
+        Args:
+            inputs: Frames to use for some or all sources instead of scanning them.
+
+        Returns:
+            The LazyFrames of all sources and nodes by name.
+        """
+        frames = dict(inputs or {})
+        for name, source in self.sources.items():
+            if name not in frames:
+                if source is None:
+                    raise ValueError(f"Source {name!r} must be passed as an input frame")
+                frames[name] = scan_dataset(source)
+        for name in self.order():
+            node = self.nodes[name]
+            lf = frames[node.input]
+            for step in node.steps:
+                lf = step.apply(lf, frames)
+            frames[name] = lf
+        return frames
+
+    def transform(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        """Apply a single-source pipeline to a LazyFrame.
+
+        Returns:
+            The frame of the first output, or of the last node if there are no outputs.
+        """
+        if len(self.sources) != 1:
+            raise ValueError("transform() needs a pipeline with exactly one source")
+        (source,) = self.sources
+        order = self.order()
+        final = next(iter(self.outputs), order[-1] if order else source)
+        return self.build({source: lf})[final]
+
+    def run(self, inputs: Frames | None = None) -> dict[str, str]:
+        """Execute the pipeline on the streaming engine and write every output.
+
+        All outputs are sunk by a single `pl.collect_all`, which runs independent branches in
+        parallel and evaluates nodes shared by several outputs only once.
+
+        Args:
+            inputs: Frames to use for some or all sources instead of scanning them.
+
+        Returns:
+            The written Parquet paths by node name.
+        """
+        frames = self.build(inputs)
+        ensure_dir(settings.processed_dir)
+        paths = {name: f"{settings.processed_dir}/{file}" for name, file in self.outputs.items()}
+        logger.info(f"Running pipeline with {len(self.nodes)} nodes into {list(paths.values())}")
+        pl.collect_all(
+            [frames[name].sink_parquet(path, lazy=True) for name, path in paths.items()],
+            engine="streaming",
+        )
+        return paths
+
+
+ADULTS = Pipeline(sources={"input": None}, nodes={"adults": Node("input", [Filter("age > 18")])})
+"""The default ETL transform: keep the rows with ``age > 18``."""
+
+
+def _as_tuple(value: str | list[str] | tuple[str, ...]) -> tuple[str, ...]:
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+def _dtype(name: str) -> type[pl.DataType]:
+    dtype = getattr(pl, name, None)
+    if not (isinstance(dtype, type) and issubclass(dtype, pl.DataType)):
+        raise ValueError(f"Unknown Polars data type {name!r}")
+    return dtype
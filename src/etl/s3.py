@@ -1,19 +1,41 @@
 """Helper functions for interacting with AWS S3."""
 
+import gzip
+import io
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 
 import boto3
-from botocore.exceptions import BotoCoreError, NoCredentialsError
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
+from s3transfer.subscribers import BaseSubscriber
 
 from ..core.config import settings
 from ..core.logger import get_logger
+from ..core.metrics import record, timed
 from ..core.utils import ensure_dir
 
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .zst objects
+    zstandard = None
+
 logger = get_logger()
 
 
+@lru_cache(maxsize=1)
 def get_s3_client() -> boto3.client:
-    """Create and return a boto3 S3 client using configured credentials."""
+    """Return a shared boto3 S3 client using configured credentials.
+
+    The client is created once per process and reused, so TLS connections are kept alive across
+    calls. Its connection pool is sized by `settings.s3_max_pool_connections`; boto3 clients are
+    thread-safe, so the same client serves every download thread.
+    """
     if not settings.aws_access_key_id or not settings.aws_secret_access_key:
         raise RuntimeError(
             "AWS credentials are not configured. Please set aws_access_key_id and aws_secret_access_key in your .env file."
@@ -25,12 +47,47 @@ def get_s3_client() -> boto3.client:
         aws_secret_access_key=settings.aws_secret_access_key,
         aws_session_token=settings.aws_session_token,
         region_name=settings.aws_region,
+        endpoint_url=settings.s3_endpoint_url,
+        config=Config(
+            max_pool_connections=settings.s3_max_pool_connections,
+            retries={"max_attempts": 5, "mode": "adaptive"},
+        ),
+    )
+
+
+def get_transfer_config(max_concurrency: int | None = None) -> TransferConfig:
+    """Return the transfer settings for downloads.
+
+    Objects of at least `settings.s3_multipart_chunk_mb` are fetched as parallel ranged GETs of
+    that size.
+
+    Args:
+        max_concurrency: Maximum number of concurrent requests; defaults to
+            `settings.s3_max_concurrency`.
+    """
+    chunk = settings.s3_multipart_chunk_mb * 2**20
+    return TransferConfig(
+        multipart_threshold=chunk,
+        multipart_chunksize=chunk,
+        max_concurrency=max_concurrency or settings.s3_max_concurrency,
     )
 
 
+def _bucket(bucket: str | None = None) -> str:
+    bucket = bucket or settings.s3_bucket
+    if not bucket:
+        raise RuntimeError("S3 bucket name is not configured. Set s3_bucket in your .env file.")
+    return bucket
+
+
+@timed("s3_download")
 def download_from_s3(key: str, destination_dir: str | None = None) -> str:
     """Download a file from S3 to the local filesystem.
 
+    Large objects are downloaded in parallel parts according to `get_transfer_config`. Unless
+    `settings.s3_cache_mb` is 0, objects go through the local `etl.cache.ObjectCache`, so an
+    object that has not changed since it was last downloaded is not transferred again.
+
     Args:
         key: The key of the S3 object to download.
         destination_dir: Local directory where the file should be saved. If None, uses settings.raw_dir.
@@ -38,10 +95,9 @@ def download_from_s3(key: str, destination_dir: str | None = None) -> str:
     Returns:
         Path to the downloaded file.
     """
-    bucket = settings.s3_bucket
-    if not bucket:
-        raise RuntimeError("S3 bucket name is not configured. Set s3_bucket in your .env file.")
+    from .cache import ObjectCache
 
+    bucket = _bucket()
     dest_dir = destination_dir or settings.raw_dir
     ensure_dir(dest_dir)
     filename = Path(key).name
@@ -50,8 +106,252 @@ def download_from_s3(key: str, destination_dir: str | None = None) -> str:
     client = get_s3_client()
     try:
         logger.info(f"Downloading s3://{bucket}/{key} to {dest_path}")
-        client.download_file(bucket, key, dest_path)
+        if settings.s3_cache_mb > 0:
+            ObjectCache().get(key, dest_path, bucket)
+        else:
+            client.download_file(bucket, key, dest_path, Config=get_transfer_config())
     except (BotoCoreError, NoCredentialsError) as e:
         raise RuntimeError(f"Failed to download {key} from S3: {e}")
 
+    record(bytes=Path(dest_path).stat().st_size)
     return dest_path
+
+
+def list_keys(prefix: str = "") -> Iterator[tuple[str, int]]:
+    """List the objects under a prefix of the configured bucket.
+
+    Args:
+        prefix: Key prefix to list; the whole bucket by default.
+
+    Yields:
+        The key and size in bytes of every object, skipping directory placeholders.
+    """
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=_bucket(), Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith("/"):
+                yield obj["Key"], obj["Size"]
+
+
+@dataclass
+class DownloadReport:
+    """Outcome of a batch download."""
+
+    files: list[str] = field(default_factory=list)
+    bytes: int = 0
+    cached: int = 0
+    seconds: float = 0.0
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 2**20 / self.seconds if self.seconds else 0.0
+
+
+class _ProgressSubscriber(BaseSubscriber):
+    def __init__(self, callback: Callable[[int], None]):
+        self._callback = callback
+
+    def on_progress(self, future, bytes_transferred, **kwargs):
+        self._callback(bytes_transferred)
+
+
+def download_many(
+    keys: list[str],
+    destination_dir: str | None = None,
+    prefix: str = "",
+    workers: int | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> DownloadReport:
+    """Download many objects concurrently from the configured bucket.
+
+    All downloads share one transfer manager, whose thread pool of `workers` threads fetches
+    small objects whole and large ones as parallel ranged GETs, over the pooled connections of
+    the shared client. A failing key is recorded in the report instead of stopping the batch.
+
+    Unless `settings.s3_cache_mb` is 0, each object goes through the local
+    `etl.cache.ObjectCache` instead, on a pool of `workers` threads, so objects that have not
+    changed since the last batch are copied from the cache rather than transferred again.
+
+    Args:
+        keys: Keys of the objects to download.
+        destination_dir: Local directory to download into; defaults to `settings.raw_dir`.
+        prefix: Common prefix stripped from each key to build its path below `destination_dir`.
+        workers: Maximum number of concurrent requests; defaults to `settings.s3_max_concurrency`.
+        on_progress: Called from the worker threads with the number of bytes just received.
+
+    Returns:
+        The downloaded paths, total bytes, number of objects served from the cache, elapsed time
+        and failed keys.
+    """
+    bucket = _bucket()
+    dest_dir = Path(destination_dir or settings.raw_dir).resolve()
+    subscribers = [_ProgressSubscriber(on_progress)] if on_progress else None
+    report = DownloadReport()
+    started = time.perf_counter()
+
+    targets = {}
+    for key in keys:
+        dest = (dest_dir / key.removeprefix(prefix).lstrip("/")).resolve()
+        if not dest.is_relative_to(dest_dir) or dest == dest_dir:
+            report.failed[key] = "key does not map to a path inside the destination directory"
+            continue
+        ensure_dir(dest.parent)
+        targets[key] = dest
+
+    if settings.s3_cache_mb > 0:
+        _download_cached(bucket, targets, workers, on_progress, report)
+    else:
+        with create_transfer_manager(get_s3_client(), get_transfer_config(workers)) as manager:
+            futures = {
+                key: manager.download(bucket, key, str(dest), subscribers=subscribers)
+                for key, dest in targets.items()
+            }
+            for key, future in futures.items():
+                try:
+                    future.result()
+                except (BotoCoreError, ClientError) as e:
+                    report.failed[key] = str(e)
+                    continue
+                report.files.append(str(targets[key]))
+                report.bytes += future.meta.size or 0
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        f"Downloaded {len(report.files)} objects ({report.bytes / 2**20:.1f} MB, "
+        f"{report.cached} cached) from s3://{bucket}/{prefix} in {report.seconds:.2f}s "
+        f"({report.mb_per_second:.1f} MB/s), {len(report.failed)} failed"
+    )
+    return report
+
+
+def _download_cached(
+    bucket: str,
+    targets: dict[str, Path],
+    workers: int | None,
+    on_progress: Callable[[int], None] | None,
+    report: DownloadReport,
+) -> None:
+    """Fetch each object of a batch through the object cache, filling in `report`.
+
+    Objects served from the cache count towards the progress in one step, once they are placed.
+    """
+    from .cache import ObjectCache
+
+    def fetch(key: str) -> bool:
+        subscribers = [_ProgressSubscriber(on_progress)] if on_progress else None
+        hit = ObjectCache().get(key, targets[key], bucket, subscribers=subscribers)
+        if hit and on_progress:
+            on_progress(targets[key].stat().st_size)
+        return hit
+
+    workers = workers or settings.s3_max_concurrency
+    with ThreadPoolExecutor(workers, thread_name_prefix="s3-download") as pool:
+        futures = {key: pool.submit(fetch, key) for key in targets}
+        for key, future in futures.items():
+            try:
+                hit = future.result()
+            except (BotoCoreError, ClientError) as e:
+                report.failed[key] = str(e)
+                continue
+            report.files.append(str(targets[key]))
+            report.bytes += targets[key].stat().st_size
+            report.cached += hit
+
+
+def parse_s3_url(url: str) -> tuple[str | None, str]:
+    """Split ``s3://bucket/key`` into bucket and key; plain keys use the configured bucket."""
+    if not url.startswith("s3://"):
+        return None, url
+    bucket, _, key = url.removeprefix("s3://").partition("/")
+    return bucket, key
+
+
+def open_s3_object(key: str, bucket: str | None = None) -> io.BufferedIOBase:
+    """Open an S3 object as a forward-only binary stream, without writing it to disk.
+
+    The response body is read as it arrives from the network. Objects named ``*.gz`` or sent
+    with ``Content-Encoding: gzip`` are gunzipped on the fly, and ``*.zst`` objects are
+    decompressed with the optional ``zstandard`` package.
+
+    Args:
+        key: Object key, or an ``s3://bucket/key`` URL.
+        bucket: Bucket name; defaults to `settings.s3_bucket`.
+
+    Returns:
+        A buffered binary stream of the decompressed object contents.
+    """
+    url_bucket, key = parse_s3_url(key)
+    bucket = _bucket(bucket or url_bucket)
+    logger.info(f"Streaming s3://{bucket}/{key}")
+    response = get_s3_client().get_object(Bucket=bucket, Key=key)
+    body = response["Body"]
+    if key.endswith((".zst", ".zstd")):
+        if zstandard is None:
+            raise RuntimeError("Reading .zst objects requires the zstandard package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(body))
+    if key.endswith((".gz", ".gzip")) or response.get("ContentEncoding") == "gzip":
+        return io.BufferedReader(gzip.GzipFile(fileobj=body))
+    return io.BufferedReader(body)
+
+
+class S3RangeReader(io.RawIOBase):
+    """Seekable read-only file over an S3 object that fetches only the byte ranges read.
+
+    Columnar readers such as `pyarrow.parquet` seek to the footer and then to the column chunks
+    they need, so only those ranges are downloaded. Each ranged GET fetches at least
+    `block_size` bytes and the last block is kept to serve small sequential reads.
+
+    Args:
+        key: Object key, or an ``s3://bucket/key`` URL.
+        bucket: Bucket name; defaults to `settings.s3_bucket`.
+        block_size: Minimum number of bytes fetched per request.
+    """
+
+    def __init__(self, key: str, bucket: str | None = None, block_size: int = 2**16):
+        url_bucket, self.key = parse_s3_url(key)
+        self.bucket = _bucket(bucket or url_bucket)
+        self.block_size = block_size
+        self.size = get_s3_client().head_object(Bucket=self.bucket, Key=self.key)["ContentLength"]
+        self.requests = 0
+        self.bytes_fetched = 0
+        self._pos = 0
+        self._block_start = 0
+        self._block = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        n = min(len(view), self.size - self._pos)
+        if n <= 0:
+            return 0
+        offset = self._pos - self._block_start
+        if offset < 0 or offset + n > len(self._block):
+            self._fetch(self._pos, max(n, self.block_size))
+            offset = 0
+        view[:n] = self._block[offset : offset + n]
+        self._pos += n
+        return n
+
+    def _fetch(self, start: int, length: int) -> None:
+        end = min(start + length, self.size) - 1
+        response = get_s3_client().get_object(
+            Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end}"
+        )
+        self._block = response["Body"].read()
+        self._block_start = start
+        self.requests += 1
+        self.bytes_fetched += len(self._block)
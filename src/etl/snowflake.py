@@ -1,12 +1,34 @@
 """Snowflake loader utilities."""
 
+import io
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 import snowflake.connector
 
 from ..core.config import settings
 from ..core.logger import get_logger
+from ..core.metrics import record, timed
+from ..core.utils import ensure_dir
+from .watermark import Watermark, WatermarkStore
 
 logger = get_logger()
 
+_session: snowflake.connector.SnowflakeConnection | None = None
+_session_lock = threading.Lock()
+
 
 def get_snowflake_connection() -> snowflake.connector.SnowflakeConnection:
     """Create a connection to Snowflake using configured credentials."""
@@ -30,37 +52,483 @@ def get_snowflake_connection() -> snowflake.connector.SnowflakeConnection:
         warehouse=settings.snowflake_warehouse,
         database=settings.snowflake_database,
         schema=settings.snowflake_schema,
+        client_session_keep_alive=True,
     )
     return ctx
 
 
-def load_parquet_to_snowflake(parquet_path: str, table_name: str) -> None:
-    """Load a Parquet file from local storage into a Snowflake table.
+def get_session() -> snowflake.connector.SnowflakeConnection:
+    """Return the process-wide Snowflake connection, reconnecting if it has been closed.
 
-    This function uses the Snowflake PUT and COPY INTO commands to upload the file and load it.
-    Note: the table must already exist in Snowflake with appropriate columns matching the Parquet schema.
+    Loads share this connection, so the login handshake is paid once per process rather than
+    once per load. The connector is thread-safe; each caller uses its own cursor.
+    """
+    global _session
+    with _session_lock:
+        if _session is None or _session.is_closed():
+            _session = get_snowflake_connection()
+        return _session
+
+
+def close_session() -> None:
+    """Close the shared Snowflake connection, if one is open."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+@dataclass
+class LoadReport:
+    """Outcome of a bulk load."""
+
+    table: str
+    files: list[str] = field(default_factory=list)
+    bytes: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 2**20 / self.seconds if self.seconds else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def parquet_files(source: str | Path) -> list[Path]:
+    """Return a Parquet file, or the Parquet files of a dataset directory, in sorted order."""
+    source = Path(source)
+    if source.is_dir():
+        return sorted(source.rglob("*.parquet"))
+    if not source.exists():
+        raise FileNotFoundError(source)
+    return [source]
+
+
+def split_parquet(path: str | Path, dest_dir: str | Path, chunk_bytes: int) -> list[Path]:
+    """Split a Parquet file into files of about `chunk_bytes` each.
+
+    The number of rows per chunk is estimated from the size and row count of the source, and
+    rows are streamed batch by batch, so memory use is bounded by one batch. Files no larger
+    than `chunk_bytes` are linked into `dest_dir` unchanged.
+
+    Args:
+        path: Parquet file to split.
+        dest_dir: Directory to write the chunks to.
+        chunk_bytes: Target size of each chunk.
+
+    Returns:
+        The paths of the chunks.
+    """
+    path, dest_dir = Path(path), Path(dest_dir)
+    ensure_dir(dest_dir)
+    size = path.stat().st_size
+    prefix = f"{uuid.uuid4().hex[:8]}_{path.stem}"
+    if size <= chunk_bytes:
+        target = dest_dir / f"{prefix}.parquet"
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copyfile(path, target)
+        return [target]
+
+    source = pq.ParquetFile(path)
+    rows = source.metadata.num_rows
+    rows_per_chunk = max(1, math.ceil(rows * chunk_bytes / size))
+    batches = source.iter_batches(batch_size=min(rows_per_chunk, 131_072))
+    chunks = _write_chunks(batches, dest_dir / prefix, rows_per_chunk)
+    logger.info(f"Split {path} ({size / 2**20:.1f} MB, {rows} rows) into {len(chunks)} files")
+    return chunks
+
+
+def split_dataset(source: str | Path, dest_dir: str | Path, chunk_bytes: int) -> list[Path]:
+    """Split a hive-partitioned Parquet dataset into files of about `chunk_bytes` each.
+
+    The partition columns (e.g. ``ingest_date=...``) are only encoded in the directory names, so
+    the dataset is read as `extract.scan_dataset` reads it, with the partition values added back
+    as columns, and streamed into the chunks batch by batch.
+
+    Args:
+        source: Dataset directory.
+        dest_dir: Directory to write the chunks to.
+        chunk_bytes: Target size of each chunk.
+
+    Returns:
+        The paths of the chunks.
+    """
+    source, dest_dir = Path(source), Path(dest_dir)
+    ensure_dir(dest_dir)
+    files = parquet_files(source)
+    size = sum(f.stat().st_size for f in files)
+    rows = sum(pq.read_metadata(f).num_rows for f in files)
+    rows_per_chunk = max(1, math.ceil(rows * chunk_bytes / max(size, 1)))
+    lf = pl.scan_parquet(source, hive_partitioning=True)
+    batches = (
+        batch
+        for df in lf.collect_batches(chunk_size=min(rows_per_chunk, 131_072))
+        for batch in df.to_arrow().to_batches()
+    )
+    chunks = _write_chunks(
+        batches, dest_dir / f"{uuid.uuid4().hex[:8]}_{source.name}", rows_per_chunk
+    )
+    logger.info(f"Split {source} ({size / 2**20:.1f} MB, {rows} rows) into {len(chunks)} files")
+    return chunks
+
+
+def _write_chunks(
+    batches: Iterable[pa.RecordBatch], prefix: Path, rows_per_chunk: int
+) -> list[Path]:
+    """Write record batches to ``<prefix>_NNNNN.parquet`` files of `rows_per_chunk` rows."""
+    chunks: list[Path] = []
+    writer: pq.ParquetWriter | None = None
+    written = 0
+    try:
+        for batch in batches:
+            while batch.num_rows:
+                if writer is None:
+                    chunks.append(prefix.with_name(f"{prefix.name}_{len(chunks):05d}.parquet"))
+                    writer = pq.ParquetWriter(chunks[-1], batch.schema)
+                    written = 0
+                part = batch.slice(0, rows_per_chunk - written)
+                writer.write_batch(part)
+                written += part.num_rows
+                batch = batch.slice(part.num_rows)
+                if written == rows_per_chunk:
+                    writer.close()
+                    writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+    return chunks
+
+
+def _is_partitioned(source: Path) -> bool:
+    """Whether a dataset directory has hive partition directories (``key=value``)."""
+    return source.is_dir() and any(
+        "=" in part for f in parquet_files(source) for part in f.relative_to(source).parts[:-1]
+    )
+
+
+@timed("snowflake_load")
+def bulk_load_parquet(
+    source: str | Path,
+    table_name: str,
+    chunk_mb: int | None = None,
+    parallel: int | None = None,
+) -> LoadReport:
+    """Load a Parquet file or dataset directory into a Snowflake table in one COPY.
+
+    The input is split into files of about `chunk_mb`, which lets Snowflake load them in
+    parallel. A single PUT uploads all of them with `parallel` threads to a unique path of
+    the table stage, and a single COPY then loads the staged set and purges it. The shared
+    connection from `get_session` is used. The partition columns of a hive-partitioned dataset
+    are added back to the files, so the table gets the same columns as a merge of the dataset.
 
     Args:
-        parquet_path: Path to the local Parquet file.
+        source: Parquet file or directory of Parquet files.
+        table_name: Fully-qualified target table name (e.g. SCHEMA.TABLE). The table must already
+            exist with columns matching the Parquet schema.
+        chunk_mb: Target size of the staged files; defaults to `settings.snowflake_chunk_mb`.
+        parallel: Upload threads of the PUT; defaults to `settings.snowflake_put_parallel`.
+
+    Returns:
+        The names of the staged files, bytes uploaded, rows loaded and elapsed time.
+    """
+    chunk_bytes = (chunk_mb or settings.snowflake_chunk_mb) * 2**20
+    parallel = min(max(parallel or settings.snowflake_put_parallel, 1), 99)
+    stage = f"@%{table_name}/load_{uuid.uuid4().hex}/"
+    report = LoadReport(table=table_name)
+    started = time.perf_counter()
+
+    ensure_dir(settings.cache_dir)
+    with tempfile.TemporaryDirectory(dir=settings.cache_dir, prefix="snowflake-") as spool:
+        if _is_partitioned(Path(source)):
+            chunks = split_dataset(source, spool, chunk_bytes)
+        else:
+            chunks = [
+                c for path in parquet_files(source) for c in split_parquet(path, spool, chunk_bytes)
+            ]
+        report.files = [c.name for c in chunks]
+        report.bytes = sum(c.stat().st_size for c in chunks)
+
+        with get_session().cursor() as cs:
+            logger.info(f"Uploading {len(report.files)} files to stage {stage}")
+            cs.execute(
+                f"PUT 'file://{Path(spool).as_posix()}/*.parquet' '{stage}' "
+                f"PARALLEL={parallel} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
+            )
+            _check_put(cs)
+            report.rows = _copy_staged(cs, table_name, stage)
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        f"Loaded {report.rows} rows in {len(report.files)} files "
+        f"({report.bytes / 2**20:.1f} MB) into {table_name} in {report.seconds:.2f}s "
+        f"({report.mb_per_second:.1f} MB/s, {report.rows_per_second:.0f} rows/s)"
+    )
+    record(rows=report.rows, bytes=report.bytes)
+    return report
+
+
+def _columns(cs) -> list[str]:
+    return [d[0].lower() for d in cs.description or []]
+
+
+def _check_put(cs) -> None:
+    """Raise if any file of the last PUT was not uploaded."""
+    columns = _columns(cs)
+    failed = [
+        f"{row['source']}: {row.get('message') or row['status']}"
+        for row in (dict(zip(columns, r)) for r in cs.fetchall())
+        if row["status"] not in ("UPLOADED", "SKIPPED")
+    ]
+    if failed:
+        raise RuntimeError(f"Snowflake PUT failed for {len(failed)} files: {'; '.join(failed)}")
+
+
+def _copy_staged(cs, table_name: str, stage: str) -> int:
+    """Load and purge the files staged under `stage`; return the number of rows loaded."""
+    logger.info(f"Copying into {table_name}")
+    cs.execute(
+        f"COPY INTO {table_name} FROM '{stage}' FILE_FORMAT = (TYPE = 'PARQUET') "
+        "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE PURGE = TRUE"
+    )
+    columns = _columns(cs)
+    if "rows_loaded" not in columns:
+        return 0  # "Copy executed with 0 files processed."
+    index = columns.index("rows_loaded")
+    return sum(row[index] or 0 for row in cs.fetchall())
+
+
+class FrameUploader:
+    """Serializes DataFrame batches into in-memory Parquet files and uploads each once full.
+
+    Batches passed to `write` are appended to a Parquet file in memory. When it reaches
+    `chunk_mb` it is handed to a pool of `parallel` threads, each PUTting its file through
+    the shared session, while the caller goes on producing and serializing the next one.
+    `write` blocks while `parallel` uploads are pending, so memory stays bounded by about
+    `parallel + 1` chunks. `close` uploads the last file and loads all of them with one COPY.
+
+    Args:
+        table_name: Fully-qualified target table name (e.g. SCHEMA.TABLE). The table must already
+            exist with columns matching the frame schema.
+        chunk_mb: Target size of the staged files; defaults to `settings.snowflake_chunk_mb`.
+        parallel: Concurrent uploads; defaults to `settings.snowflake_put_parallel`.
+    """
+
+    def __init__(self, table_name: str, chunk_mb: int | None = None, parallel: int | None = None):
+        self.chunk_bytes = (chunk_mb or settings.snowflake_chunk_mb) * 2**20
+        parallel = max(parallel or settings.snowflake_put_parallel, 1)
+        self.stage = f"@%{table_name}/load_{uuid.uuid4().hex}/"
+        self.report = LoadReport(table=table_name)
+        self._started = time.perf_counter()
+        self._executor = ThreadPoolExecutor(parallel, thread_name_prefix="snowflake-put")
+        self._slots = threading.BoundedSemaphore(parallel)
+        self._futures: list[Future] = []
+        self._sink: io.BytesIO | None = None
+        self._writer: pq.ParquetWriter | None = None
+
+    def write(self, batch: pl.DataFrame) -> None:
+        """Append a batch, uploading the current file once it has reached the target size."""
+        self._raise_failed()
+        table = batch.to_arrow()
+        if self._writer is None:
+            self._sink = io.BytesIO()
+            self._writer = pq.ParquetWriter(self._sink, table.schema)
+        self._writer.write_table(table)
+        if self._sink.tell() >= self.chunk_bytes:
+            self._flush()
+
+    def close(self) -> LoadReport:
+        """Upload the remaining rows, wait for all uploads and COPY the staged files."""
+        try:
+            if self._writer is not None:
+                self._flush()
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+        if self.report.files:
+            with get_session().cursor() as cs:
+                self.report.rows = _copy_staged(cs, self.report.table, self.stage)
+        self.report.seconds = time.perf_counter() - self._started
+        logger.info(
+            f"Loaded {self.report.rows} rows in {len(self.report.files)} in-memory files "
+            f"({self.report.bytes / 2**20:.1f} MB) into {self.report.table} in "
+            f"{self.report.seconds:.2f}s ({self.report.mb_per_second:.1f} MB/s, "
+            f"{self.report.rows_per_second:.0f} rows/s)"
+        )
+        return self.report
+
+    def abort(self) -> None:
+        """Stop uploading without loading anything."""
+        self._executor.shutdown(cancel_futures=True)
+
+    def _flush(self) -> None:
+        self._writer.close()
+        data, self._sink, self._writer = self._sink, None, None
+        data.seek(0)
+        name = f"part-{len(self.report.files):05d}.parquet"
+        self.report.files.append(name)
+        self.report.bytes += data.getbuffer().nbytes
+        self._slots.acquire()
+        future = self._executor.submit(self._put, name, data)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _put(self, name: str, data: io.BytesIO) -> None:
+        with get_session().cursor() as cs:
+            cs.execute(
+                f"PUT 'file://{name}' '{self.stage}' AUTO_COMPRESS=FALSE OVERWRITE=TRUE",
+                file_stream=data,
+            )
+            _check_put(cs)
+
+    def _raise_failed(self) -> None:
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+
+@timed("snowflake_load_frame")
+def load_frame_to_snowflake(
+    data: pl.DataFrame | pl.LazyFrame,
+    table_name: str,
+    chunk_mb: int | None = None,
+    parallel: int | None = None,
+) -> LoadReport:
+    """Load a DataFrame or LazyFrame into a Snowflake table without writing it to disk.
+
+    A LazyFrame is executed by the streaming engine and its batches are uploaded by a
+    `FrameUploader` as they are produced; a DataFrame is uploaded slice by slice.
+
+    Args:
+        data: The frame to load.
         table_name: Fully-qualified target table name (e.g. SCHEMA.TABLE).
+        chunk_mb: Target size of the staged files; defaults to `settings.snowflake_chunk_mb`.
+        parallel: Concurrent uploads; defaults to `settings.snowflake_put_parallel`.
+
+    Returns:
+        The staged files, bytes uploaded, rows loaded and elapsed time.
     """
-    conn = get_snowflake_connection()
-    cs = conn.cursor()
+    uploader = FrameUploader(table_name, chunk_mb, parallel)
     try:
-        # Stage name: use a temporary internal stage
-        stage_name = f"@%{table_name}"
+        if isinstance(data, pl.LazyFrame):
+            data.sink_batches(uploader.write)
+        else:
+            for batch in data.iter_slices(65_536):
+                uploader.write(batch)
+    except BaseException:
+        uploader.abort()
+        raise
+    report = uploader.close()
+    record(rows=report.rows, bytes=report.bytes)
+    return report
+
 
-        # Put the file into stage
-        logger.info(f"Uploading {parquet_path} to stage {stage_name}")
-        put_cmd = f"PUT file://{parquet_path} {stage_name} AUTO_COMPRESS=TRUE OVERWRITE=TRUE"
-        cs.execute(put_cmd)
+@timed("snowflake_merge")
+def merge_frame_to_snowflake(
+    data: pl.DataFrame | pl.LazyFrame,
+    table_name: str,
+    keys: list[str],
+    watermark: str | None = None,
+    store: WatermarkStore | None = None,
+    chunk_mb: int | None = None,
+    parallel: int | None = None,
+) -> LoadReport:
+    """Merge the rows of a frame that changed since the last load into a Snowflake table.
+
+    With a `watermark` column (e.g. an update timestamp or increasing id), only rows at or beyond
+    the high-water mark recorded by the previous load are selected, so the filter is pushed down
+    into the scan and the upload is proportional to the change set. The delta is streamed into a
+    temporary table, as by `load_frame_to_snowflake`, and merged into `table_name` on `keys`:
+    matching rows are updated and the others inserted. Only the latest row of each key (by
+    `watermark`, else the last in the data) is staged, since Snowflake rejects a MERGE whose source
+    matches a target row more than once. The new mark is only recorded once the
+    MERGE has succeeded.
+
+    Args:
+        data: The full or already filtered source data.
+        table_name: Fully-qualified target table name (e.g. SCHEMA.TABLE).
+        keys: Columns identifying a row.
+        watermark: Monotonically increasing column to load incrementally by.
+        store: Where high-water marks are kept; defaults to `WatermarkStore()`.
+        chunk_mb: Target size of the staged files; defaults to `settings.snowflake_chunk_mb`.
+        parallel: Concurrent uploads; defaults to `settings.snowflake_put_parallel`.
 
-        # Copy into table
-        logger.info(f"Copying into {table_name}")
-        copy_cmd = f"COPY INTO {table_name} FROM {stage_name} FILE_FORMAT = (TYPE = 'PARQUET')"
-        cs.execute(copy_cmd)
+    Returns:
+        The staged files, bytes uploaded, rows merged and elapsed time.
+    """
+    lf = data.lazy()
+    columns = lf.collect_schema().names()
+    missing = [c for c in [*keys, *([watermark] if watermark else [])] if c not in columns]
+    if not keys or missing:
+        raise ValueError(f"Merge key and watermark columns must exist in the data: {missing}")
+    store = store or WatermarkStore()
+    mark = store.get(table_name, watermark) if watermark else None
+    if mark is not None:
+        logger.info(f"Selecting rows with {watermark} >= {mark.value} for {table_name}")
+        lf = mark.filter(lf)
 
-        logger.info("Snowflake load completed")
+    session = get_session()
+    delta = f"{table_name}_DELTA_{uuid.uuid4().hex[:8].upper()}"
+    with session.cursor() as cs:
+        cs.execute(f"CREATE TEMPORARY TABLE {delta} LIKE {table_name}")
+    try:
+        uploader = FrameUploader(delta, chunk_mb, parallel)
+        changes = lf.sort(watermark, maintain_order=True) if watermark else lf
+        changes = changes.unique(subset=keys, keep="last", maintain_order=True)
+        queries = [changes.sink_batches(uploader.write, lazy=True)]
+        if watermark:
+            queries.append(lf.select(pl.col(watermark).max()))
+        try:
+            collected = pl.collect_all(queries, engine="streaming")
+        except BaseException:
+            uploader.abort()
+            raise
+        report = uploader.close()
+        if report.rows:
+            with session.cursor() as cs:
+                cs.execute(_merge_sql(table_name, delta, columns, keys))
+                counts = dict(zip(_columns(cs), cs.fetchone() or ()))
+            logger.info(f"Merged into {table_name}: {counts}")
     finally:
-        cs.close()
-        conn.close()
+        with session.cursor() as cs:
+            cs.execute(f"DROP TABLE IF EXISTS {delta}")
+
+    report.table = table_name
+    if watermark and report.rows:
+        store.set(table_name, Watermark.of(watermark, collected[-1].item()))
+    record(rows=report.rows, bytes=report.bytes)
+    return report
+
+
+def _merge_sql(table_name: str, source: str, columns: list[str], keys: list[str]) -> str:
+    on = " AND ".join(f"t.{k} = s.{k}" for k in keys)
+    updates = ", ".join(f"t.{c} = s.{c}" for c in columns if c not in keys)
+    values = ", ".join(f"s.{c}" for c in columns)
+    matched = f" WHEN MATCHED THEN UPDATE SET {updates}" if updates else ""
+    return (
+        f"MERGE INTO {table_name} t USING {source} s ON {on}{matched} "
+        f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({values})"
+    )
+
+
+def load_parquet_to_snowflake(parquet_path: str, table_name: str) -> LoadReport:
+    """Load a Parquet file from local storage into a Snowflake table.
+
+    This function uses the Snowflake PUT and COPY INTO commands to upload the file and load it;
+    see `bulk_load_parquet`.
+    Note: the table must already exist in Snowflake with appropriate columns matching the Parquet schema.
+
+    Args:
+        parquet_path: Path to the local Parquet file, or a directory of Parquet files.
+        table_name: Fully-qualified target table name (e.g. SCHEMA.TABLE).
+
+    Returns:
+        The load statistics.
+    """
+    return bulk_load_parquet(parquet_path, table_name)
@@ -1,15 +1,19 @@
 """Transformation functions for the ETL pipeline."""
 
+from typing import TypeVar
+
 import polars as pl
 
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
 
-def filter_adults(df: pl.DataFrame) -> pl.DataFrame:
+def filter_adults(df: FrameT) -> FrameT:
     """Filter out rows where age is less than 18.
 
     Args:
-        df: Input DataFrame.
+        df: Input DataFrame or LazyFrame.
 
     Returns:
-        DataFrame containing only rows with age > 18.
+        Frame of the same kind containing only rows with age > 18.
     """
     return df.filter(pl.col("age") > 18)
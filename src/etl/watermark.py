@@ -0,0 +1,69 @@
+"""High-water marks recording how far incremental loads into each table have got."""
+
+import datetime
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from ..core.config import settings
+from ..core.utils import ensure_dir
+
+
+@dataclass
+class Watermark:
+    """Largest value of a monotonically increasing column that has been loaded into a table.
+
+    Temporal values are stored as ISO 8601 strings and cast back to the column type when used.
+    """
+
+    column: str
+    value: Any
+
+    def filter(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        """Keep the rows at or beyond the mark.
+
+        Rows equal to the mark are kept because more of them may have arrived after it was taken;
+        loading them again is harmless when the rows are merged on a key.
+        """
+        dtype = lf.collect_schema()[self.column]
+        return lf.filter(pl.col(self.column) >= pl.lit(self.value).cast(dtype))
+
+    @classmethod
+    def of(cls, column: str, value: Any) -> "Watermark":
+        """Build a mark from a column maximum as returned by Polars."""
+        if isinstance(value, (datetime.date, datetime.time)):
+            value = value.isoformat()
+        return cls(column=column, value=value)
+
+
+class WatermarkStore:
+    """JSON file of the high-water mark of every incrementally loaded table.
+
+    Args:
+        path: Location of the JSON file; defaults to ``watermarks.json`` in `settings.cache_dir`.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path or Path(settings.cache_dir) / "watermarks.json")
+        try:
+            data = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.marks = {table: Watermark(**mark) for table, mark in data.items()}
+
+    def get(self, table: str, column: str) -> Watermark | None:
+        """Return the mark of `table`, unless it was recorded for another column."""
+        mark = self.marks.get(table.upper())
+        return mark if mark is not None and mark.column == column else None
+
+    def set(self, table: str, mark: Watermark) -> None:
+        """Record the mark of `table` and atomically write the store to disk."""
+        self.marks[table.upper()] = mark
+        ensure_dir(self.path.parent)
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps({table: asdict(m) for table, m in self.marks.items()}))
+        os.replace(tmp, self.path)
@@ -0,0 +1,111 @@
+"""In-memory stand-in for the Snowflake connector, shared by the tests and the benchmarks.
+
+`FakeConnection` keeps staged files and tables in memory and understands the statements issued
+by `etl.snowflake`: the client-side work of a load (splitting the input, reading and
+"uploading" the files, parsing the results) runs for real, the warehouse does not.
+"""
+
+import glob
+import io
+import re
+from collections import defaultdict
+
+import polars as pl
+import pyarrow.parquet as pq
+
+
+class FakeCursor:
+    """Executes the statements issued by `etl.snowflake` against an in-memory stage and tables."""
+
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.description = None
+        self._rows: list[tuple] = []
+
+    def execute(self, sql: str, file_stream: io.BytesIO | None = None) -> "FakeCursor":
+        self.connection.statements.append(sql)
+        self.description, self._rows = None, []
+        if sql.startswith("PUT"):
+            pattern, stage = re.match(r"PUT 'file://(.+?)' '(.+?)'", sql).groups()
+            self.description = [("source",), ("target",), ("source_size",), ("status",)]
+            for path in [pattern] if file_stream else sorted(glob.glob(pattern)):
+                if file_stream:
+                    data = file_stream.read()
+                else:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                name = path.rsplit("/", 1)[-1]
+                self.connection.stage[stage + name] = data
+                self._rows.append((name, name, len(data), self.connection.put_status))
+        elif sql.startswith("COPY"):
+            table, stage = re.match(r"COPY INTO (\S+) FROM '(.+?)'", sql).groups()
+            self.description = [("file",), ("status",), ("rows_parsed",), ("rows_loaded",)]
+            for path in [p for p in self.connection.stage if p.startswith(stage)]:
+                data = io.BytesIO(self.connection.stage.pop(path))
+                if self.connection.keep_rows:
+                    df = pl.read_parquet(data)
+                    self.connection.tables[table] = pl.concat([self.connection.tables[table], df])
+                    rows = df.height
+                else:
+                    rows = pq.ParquetFile(data).metadata.num_rows
+                self._rows.append((path, "LOADED", rows, rows))
+                self.connection.loaded += rows
+        elif sql.startswith("CREATE TEMPORARY TABLE"):
+            table, like = re.match(r"CREATE TEMPORARY TABLE (\S+) LIKE (\S+)", sql).groups()
+            self.connection.tables[table] = self.connection.tables[like].clear()
+        elif sql.startswith("MERGE"):
+            target, source, on = re.match(
+                r"MERGE INTO (\S+) t USING (\S+) s ON (.+?) WHEN", sql
+            ).groups()
+            keys = re.findall(r"t\.(\w+) = s\.", on)
+            old, new = self.connection.tables[target], self.connection.tables[source]
+            if new.select(keys).is_duplicated().any():
+                raise RuntimeError("Duplicate row detected during DML action")  # nondeterministic
+            self.description = [("number of rows inserted",), ("number of rows updated",)]
+            updated = old.join(new, on=keys, how="semi").height
+            self._rows = [(new.height - updated, updated)]
+            self.connection.tables[target] = pl.concat(
+                [old.join(new, on=keys, how="anti"), new]
+            ).sort(keys)
+        elif sql.startswith("DROP TABLE"):
+            self.connection.tables.pop(sql.split()[-1], None)
+        return self
+
+    def fetchone(self) -> tuple | None:
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self) -> list[tuple]:
+        return self._rows
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+class FakeConnection:
+    """Stand-in for a ``snowflake.connector`` connection.
+
+    Args:
+        keep_rows: Whether COPY reads the staged files into `tables`. Without it, only the row
+            counts are taken from the Parquet footers, so a benchmark does not time the fake.
+    """
+
+    def __init__(self, keep_rows: bool = True):
+        self.keep_rows = keep_rows
+        self.statements: list[str] = []
+        self.stage: dict[str, bytes] = {}
+        self.tables: dict[str, pl.DataFrame] = defaultdict(pl.DataFrame)
+        self.loaded = 0
+        self.put_status = "UPLOADED"
+        self.closed = False
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def close(self) -> None:
+        self.closed = True
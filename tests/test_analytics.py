@@ -0,0 +1,299 @@
+"""Tests for the analytics module."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import pyarrow as pa
+import pytest
+
+from src.analytics import catalog as catalog_module
+from src.analytics import engine as engine_module
+from src.analytics.catalog import Catalog
+from src.analytics.engine import (
+    AnalyticsEngine,
+    ResultCache,
+    is_deterministic,
+    is_read_only,
+    normalize_sql,
+)
+from src.analytics.query import OutputFormat, export_query
+from src.core.config import settings
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Create an analytics engine backed by a temporary database file."""
+    engine = AnalyticsEngine(str(tmp_path / "analytics.duckdb"), pool_size=2)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def shared_engine(engine, monkeypatch):
+    """Install the test engine as the process-wide analytics engine."""
+    monkeypatch.setattr(engine_module, "_engine", engine)
+    return engine
+
+
+@pytest.fixture
+def catalog(engine, tmp_path):
+    """Attach a catalog over a temporary processed directory to the test engine."""
+    root = tmp_path / "processed"
+    root.mkdir()
+    pl.DataFrame({"id": [1, 2, 3], "age": [25, 17, 40]}).write_parquet(root / "people.parquet")
+    for day, ids in (("2024-01-01", [1, 2]), ("2024-01-02", [3])):
+        part = root / "events" / f"ingest_date={day}"
+        part.mkdir(parents=True)
+        pl.DataFrame({"id": ids}).write_parquet(part / "input.parquet")
+    engine.catalog = Catalog(
+        engine, root=str(root), state_path=str(tmp_path / "catalog.json"), refresh_seconds=0
+    )
+    return engine.catalog
+
+
+def test_normalize_sql_preserves_literals():
+    """Test whitespace is collapsed outside string literals only."""
+    sql = "SELECT  *\n  FROM t\tWHERE name = 'a  b' ;"
+
+    assert normalize_sql(sql) == "SELECT * FROM t WHERE name = 'a  b'"
+
+
+def test_is_read_only():
+    """Test only single read statements are considered cacheable."""
+    assert is_read_only("select 1")
+    assert is_read_only("WITH x AS (SELECT 1) SELECT * FROM x;")
+    assert is_read_only("select ';' as s")
+    assert not is_read_only("CREATE TABLE t AS SELECT 1")
+    assert not is_read_only("select 1; drop table t")
+
+
+def test_query_result_is_cached(engine):
+    """Test repeated queries are served from the result cache."""
+    first = engine.query("SELECT 42 AS answer")
+    second = engine.query("SELECT 42\n   AS answer;")
+
+    assert first["answer"].to_list() == [42]
+    assert second.equals(first)
+    assert engine.cache.hits == 1
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT random() AS v",
+        "SELECT now() AS v",
+        "SELECT current_timestamp AS v",
+        "SELECT * FROM range(1000) USING SAMPLE 1",
+    ],
+)
+def test_volatile_queries_are_not_cached(engine, sql):
+    """Test statements calling volatile functions are executed every time."""
+    engine.query(sql)
+    engine.query(sql)
+
+    assert engine.cache.hits == 0
+    assert len(engine.cache) == 0
+    assert not is_deterministic(sql)
+    assert is_deterministic("SELECT 'random()' AS label")
+
+
+def test_cache_invalidated_when_file_changes(engine, tmp_path):
+    """Test cached results are not reused after a referenced file is modified."""
+    path = tmp_path / "data.parquet"
+    pl.DataFrame({"x": [1, 2]}).write_parquet(path)
+    sql = f"SELECT sum(x) AS total FROM read_parquet('{path}')"
+
+    assert engine.query(sql)["total"][0] == 3
+    pl.DataFrame({"x": [1, 2, 3]}).write_parquet(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+
+    assert engine.query(sql)["total"][0] == 6
+
+
+def test_cli_engine_does_not_cache_results(tmp_path, monkeypatch):
+    """Test the one-shot CLI engine runs every query instead of caching its result."""
+    monkeypatch.setattr(settings, "analytics_database", str(tmp_path / "analytics.duckdb"))
+    monkeypatch.setattr(settings, "processed_dir", str(tmp_path / "processed"))
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(engine_module, "_engine", None)
+    engine = engine_module.get_engine()
+    try:
+        engine.query("SELECT 42 AS answer")
+        engine.query("SELECT 42 AS answer")
+        assert len(engine.cache) == 0
+        assert engine.cache.hits == engine.cache.misses == 0
+    finally:
+        engine.close()
+
+
+def test_write_statement_clears_cache_and_persists(tmp_path):
+    """Test writes clear the cache and tables survive reopening the database."""
+    database = str(tmp_path / "analytics.duckdb")
+    engine = AnalyticsEngine(database)
+    engine.query("CREATE TABLE t AS SELECT 1 AS x")
+    assert engine.query("SELECT count(*) AS n FROM t")["n"][0] == 1
+    engine.query("INSERT INTO t VALUES (2)")
+    assert engine.query("SELECT count(*) AS n FROM t")["n"][0] == 2
+    engine.close()
+
+    reopened = AnalyticsEngine(database)
+    assert reopened.query("SELECT count(*) AS n FROM t")["n"][0] == 2
+    reopened.close()
+
+
+def test_result_cache_evicts_least_recently_used():
+    """Test the cache stays within its size limit by evicting the oldest entries."""
+    df = pa.table({"x": list(range(100))})
+    cache = ResultCache(max_bytes=int(df.nbytes * 2.5))
+
+    cache.put(("a", ()), df)
+    cache.put(("b", ()), df)
+    cache.get(("a", ()))
+    cache.put(("c", ()), df)
+
+    assert cache.get(("b", ())) is None
+    assert cache.get(("a", ())) is not None
+    assert cache.size <= cache.max_bytes
+
+
+def test_concurrent_queries_share_pool(engine):
+    """Test more concurrent queries than pooled cursors all complete."""
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(
+            pool.map(lambda i: engine.query(f"SELECT {i} AS i", use_cache=False), range(12))
+        )
+
+    assert [df["i"][0] for df in results] == list(range(12))
+
+
+def test_query_arrow_returns_table(engine):
+    """Test results can be fetched as Arrow tables."""
+    table = engine.query_arrow("SELECT range AS x FROM range(3)")
+
+    assert isinstance(table, pa.Table)
+    assert table.column("x").to_pylist() == [0, 1, 2]
+
+
+def test_record_batches_stream(engine):
+    """Test large results are streamed in bounded record batches."""
+    with engine.record_batches("SELECT range AS x FROM range(10000)", batch_size=2048) as reader:
+        sizes = [batch.num_rows for batch in reader]
+
+    assert sum(sizes) == 10000
+    assert max(sizes) <= 2048
+
+
+@pytest.mark.parametrize(
+    ("fmt", "read"),
+    [
+        (OutputFormat.PARQUET, pl.read_parquet),
+        (OutputFormat.ARROW, pl.read_ipc),
+        (OutputFormat.CSV, pl.read_csv),
+    ],
+)
+def test_export_query_formats(shared_engine, tmp_path, fmt, read):
+    """Test query results are exported to each supported file format."""
+    output = str(tmp_path / f"result.{fmt.value}")
+
+    rows = export_query("SELECT range AS x, 'v' || range AS y FROM range(5)", fmt, output)
+
+    assert rows == 5
+    assert read(output)["x"].to_list() == [0, 1, 2, 3, 4]
+
+
+def test_catalog_registers_views(catalog, engine):
+    """Test single files and hive-partitioned directories become queryable views."""
+    people = engine.query("SELECT count(*) AS n FROM people WHERE age >= 18")
+    events = engine.query(
+        "SELECT ingest_date, count(*) AS n FROM events GROUP BY ALL ORDER BY ingest_date"
+    )
+
+    assert people["n"][0] == 2
+    assert events["n"].to_list() == [2, 1]
+    assert catalog.datasets["events"].hive
+    assert catalog.datasets["people"].files[str(catalog.root / "people.parquet")].num_row_groups
+
+
+def test_catalog_refresh_rereads_only_changed_files(catalog, engine, monkeypatch):
+    """Test footers are re-read only for new or modified files, also across restarts."""
+    catalog.refresh()
+    reads = []
+    read_file_info = catalog_module.read_file_info
+    monkeypatch.setattr(
+        catalog_module, "read_file_info", lambda path: reads.append(path) or read_file_info(path)
+    )
+
+    assert catalog.refresh() == []
+    reloaded = Catalog(engine, root=str(catalog.root), state_path=str(catalog.state_path))
+    assert reloaded.refresh() == []
+
+    path = catalog.root / "people.parquet"
+    pl.DataFrame({"id": [4], "age": [50]}).write_parquet(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert catalog.refresh() == ["people"]
+    assert reads == [path]
+
+
+def test_catalog_drops_removed_datasets(catalog, engine):
+    """Test views disappear when their dataset is deleted."""
+    catalog.refresh()
+    (catalog.root / "people.parquet").unlink()
+
+    assert catalog.refresh() == ["people"]
+    with pytest.raises(Exception, match="people"):
+        engine.query("SELECT * FROM people")
+
+
+def test_catalog_skips_datasets_with_clashing_names(catalog, engine):
+    """Test a file named like a dataset directory does not replace the directory's view."""
+    pl.DataFrame({"other": [1]}).write_parquet(catalog.root / "events.parquet")
+
+    catalog.refresh()
+
+    assert catalog.datasets["events"].path == str(catalog.root / "events")
+    assert engine.query("SELECT count(*) AS n FROM events")["n"][0] == 3
+
+
+def test_catalog_skips_files_deleted_during_refresh(catalog, engine, monkeypatch):
+    """Test files that vanish between listing and reading are left out of the views."""
+    discover = catalog_module.discover
+
+    def listing(root):
+        found = discover(root)
+        path, files, hive = found["events"]
+        found["events"] = (path, [*files, path / "ingest_date=2024-01-03" / "gone.parquet"], hive)
+        found["gone"] = (catalog.root / "gone.parquet", [catalog.root / "gone.parquet"], False)
+        return found
+
+    monkeypatch.setattr(catalog_module, "discover", listing)
+
+    assert sorted(catalog.refresh()) == ["events", "people"]
+    assert len(catalog.datasets["events"].files) == 2
+    assert engine.query("SELECT count(*) AS n FROM events")["n"][0] == 3
+
+
+def test_view_file_deleted_between_refreshes(catalog, engine):
+    """Test a file removed since the last refresh triggers a refresh instead of an error."""
+    sql = "SELECT count(*) AS n FROM events"
+    assert engine.query(sql)["n"][0] == 3
+    catalog.refresh_seconds = 3600
+
+    (catalog.root / "events" / "ingest_date=2024-01-02" / "input.parquet").unlink()
+
+    assert engine.query(sql)["n"][0] == 2
+    assert len(catalog.datasets["events"].files) == 1
+
+
+def test_cached_view_results_invalidated_when_files_change(catalog, engine):
+    """Test results of queries over views are not served stale after the data changes."""
+    sql = "SELECT sum(age) AS total FROM people"
+    assert engine.query(sql)["total"][0] == 82
+    assert engine.query(sql)["total"][0] == 82
+    assert engine.cache.hits == 1
+
+    path = catalog.root / "people.parquet"
+    pl.DataFrame({"id": [4], "age": [50]}).write_parquet(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+
+    assert engine.query(sql)["total"][0] == 50
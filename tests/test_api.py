@@ -1,15 +1,43 @@
 """Tests for the API module."""
 
+import asyncio
 import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 
 import polars as pl
+import pyarrow as pa
+import pytest
 from fastapi.testclient import TestClient
 
+from src.analytics import engine as engine_module
+from src.analytics.engine import AnalyticsEngine
 from src.api.main import app
+from src.api.routers import query as query_module
+from src.api.routers import validate as validate_module
 from src.api.models import Record
+from src.api.validation import validate_frame
+from src.core.config import settings
 
 client = TestClient(app)
 
+SLOW_SQL = "SELECT sum(a.range * b.range) AS s FROM range(100000) a, range(100000) b"
+
+
+@pytest.fixture
+def analytics_engine(tmp_path, monkeypatch):
+    """Serve /query from a sandboxed engine that may only read a temporary processed directory."""
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    engine = AnalyticsEngine(":memory:", pool_size=2, allowed_directories=[str(processed)])
+    monkeypatch.setattr(engine_module, "_api_engine", engine)
+    monkeypatch.setattr(query_module, "_slots", None)
+    yield engine
+    engine.close()
+
 
 def test_health_endpoint():
     """Test the health check endpoint."""
@@ -83,3 +111,298 @@ def test_validate_endpoint_invalid_csv():
     data = response.json()
     assert data["rows"] == 2
     assert len(data["errors"]) >= 1  # At least one error for invalid email
+
+
+def test_validate_endpoint_unparseable_values():
+    """Test values that do not fit the pinned types are reported as errors, not server errors."""
+    csv_data = "id,email,age\n1,test1@example.com,25\n2,test2@example.com,old"
+
+    response = client.post(
+        "/validate/",
+        files={"file": ("test.csv", io.BytesIO(csv_data.encode()), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    errors = response.json()["errors"]
+    assert [error["row"]["id"] for error in errors] == [2]
+
+
+def test_validate_refuses_uploads_beyond_pending_limit(monkeypatch):
+    """Test /validate runs off the event loop and answers 429 once its queue is full."""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_validate(data):
+        started.set()
+        release.wait(5)
+        return {"rows": 0, "errors": []}
+
+    monkeypatch.setattr(validate_module, "validate_upload", slow_validate)
+    monkeypatch.setattr(settings, "validate_max_pending", 1)
+    upload = {"file": ("test.csv", b"id,email,age\n", "text/csv")}
+
+    with TestClient(app) as c, ThreadPoolExecutor(1) as pool:
+        first = pool.submit(c.post, "/validate/", files=upload)
+        assert started.wait(5)
+        refused = c.post("/validate/", files=upload)
+        health = c.get("/health")
+        release.set()
+
+        assert refused.status_code == 429
+        assert refused.headers["retry-after"] == "1"
+        assert health.status_code == 200
+        assert first.result(5).status_code == 200
+
+
+def test_validate_stream_shares_pending_limit(monkeypatch):
+    """Test /validate/stream is refused with 429 while /validate holds every slot."""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_validate(data):
+        started.set()
+        release.wait(5)
+        return {"rows": 0, "errors": []}
+
+    monkeypatch.setattr(validate_module, "validate_upload", slow_validate)
+    monkeypatch.setattr(settings, "validate_max_pending", 1)
+    upload = {"file": ("test.csv", b"id,email,age\n1,a@example.com,25\n", "text/csv")}
+
+    with TestClient(app) as c, ThreadPoolExecutor(1) as pool:
+        first = pool.submit(c.post, "/validate/", files=upload)
+        assert started.wait(5)
+        refused = c.post("/validate/stream", files=upload)
+        release.set()
+        assert first.result(5).status_code == 200
+
+        assert refused.status_code == 429
+        assert c.post("/validate/stream", files=upload).status_code == 200
+    assert validate_module._pending == 0
+
+
+def test_cancelled_validation_keeps_its_slot_until_the_worker_ends(monkeypatch):
+    """Test a request cancelled while its upload is validated frees its slot only afterwards."""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_validate(data):
+        started.set()
+        release.wait(5)
+        return {"rows": 0, "errors": []}
+
+    monkeypatch.setattr(validate_module, "validate_upload", slow_validate)
+
+    async def cancel() -> int:
+        task = asyncio.create_task(validate_module.validate(SimpleNamespace(file=io.BytesIO())))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return validate_module._pending
+
+    assert asyncio.run(cancel()) == 1
+    release.set()
+    deadline = time.monotonic() + 5
+    while validate_module._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert validate_module._pending == 0
+
+
+def test_metrics_endpoint_reports_validate_stage():
+    """Test /metrics exposes the timings and row counts of /validate in Prometheus format."""
+    csv_data = "id,email,age\n1,test1@example.com,25\n2,test2@example.com,30"
+    client.post("/validate/", files={"file": ("test.csv", io.BytesIO(csv_data.encode()), "")})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'edp_stage_duration_seconds_count{stage="validate"}' in response.text
+    assert 'edp_stage_rows_total{stage="validate"}' in response.text
+
+
+def test_validate_frame_matches_per_row_validation():
+    """Test columnar validation reports exactly the errors of per-row Pydantic validation."""
+    df = pl.DataFrame(
+        {
+            "id": [1, 0, 3, 4, 5, 6, 7],
+            "email": [
+                "a@example.com",
+                "b@example.com",
+                "not-an-email",
+                "d@example.test",
+                None,
+                "F@Example.COM",
+                "g@example.com",
+            ],
+            "age": [25, 30, 35, 40, 45, 120, 1],
+        }
+    )
+
+    expected = []
+    for row in df.to_dicts():
+        try:
+            Record(**row)
+        except Exception as e:
+            expected.append({"row": row, "error": str(e)})
+
+    assert validate_frame(df) == expected
+    assert [e["row"]["id"] for e in expected] == [0, 3, 4, 5, 6]
+
+
+def test_validate_frame_string_columns():
+    """Test values Pydantic coerces from strings are not reported as errors."""
+    df = pl.DataFrame(
+        {"id": ["1", "+2", " 3", "x"], "email": ["a@example.com"] * 4, "age": ["25"] * 4}
+    )
+
+    errors = validate_frame(df)
+
+    assert [e["row"]["id"] for e in errors] == ["x"]
+
+
+def test_validate_frame_missing_column():
+    """Test every row fails when a required column is absent."""
+    df = pl.DataFrame({"id": [1, 2], "email": ["a@example.com", "b@example.com"]})
+
+    errors = validate_frame(df)
+
+    assert len(errors) == 2
+    assert "age" in errors[0]["error"]
+
+
+def test_validate_stream_endpoint():
+    """Test streaming validation returns NDJSON errors followed by a summary line."""
+    csv_data = "id,email,age\n1,a@example.com,25\n2,invalid-email,30\n3,c@example.com,150\n"
+    csv_file = io.BytesIO(csv_data.encode())
+
+    response = client.post(
+        "/validate/stream?batch_size=2",
+        files={"file": ("test.csv", csv_file, "text/csv")},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["row"]["id"] for line in lines[:-1]] == [2, 3]
+    assert lines[-1] == {"rows": 3, "error_count": 2, "truncated": False}
+
+
+def test_validate_stream_endpoint_max_errors():
+    """Test streaming validation keeps counting once the error limit is reached."""
+    csv_data = "id,email,age\n" + "\n".join(f"{i},bad,25" for i in range(1, 6))
+    csv_file = io.BytesIO(csv_data.encode())
+
+    response = client.post(
+        "/validate/stream?max_errors=2",
+        files={"file": ("test.csv", csv_file, "text/csv")},
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 3
+    assert lines[-1] == {"rows": 5, "error_count": 5, "truncated": True}
+
+
+def test_query_endpoint_streams_arrow(analytics_engine):
+    """Test query results are streamed as an Arrow IPC stream in several batches."""
+    response = client.post(
+        "/query/",
+        json={"sql": "SELECT range AS x, 'v' || range AS y FROM range(5000)", "batch_size": 1024},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    reader = pa.ipc.open_stream(response.content)
+    batches = list(reader)
+    assert len(batches) > 1
+    assert pa.Table.from_batches(batches).column("x").to_pylist() == list(range(5000))
+
+
+def test_query_endpoint_streams_ndjson(analytics_engine):
+    """Test query results can be streamed as newline-delimited JSON."""
+    response = client.post(
+        "/query/", json={"sql": "SELECT range AS x FROM range(3)", "format": "ndjson"}
+    )
+
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"x": 0},
+        {"x": 1},
+        {"x": 2},
+    ]
+
+
+@pytest.mark.parametrize("sql", ["CREATE TABLE t AS SELECT 1", "SELECT * FROM missing_table"])
+def test_query_endpoint_rejects_bad_sql(analytics_engine, sql):
+    """Test write statements and failing queries are reported as client errors."""
+    response = client.post("/query/", json={"sql": sql})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT content FROM read_text('/etc/hostname')",
+        "SELECT * FROM read_csv('{outside}')",
+        "SELECT * FROM read_csv('{processed}/../outside.csv')",
+        "SELECT * FROM read_csv('http://127.0.0.1:1/data.csv')",
+        "SELECT * FROM glob('/etc/*')",
+    ],
+)
+def test_query_endpoint_cannot_read_outside_processed_dir(analytics_engine, tmp_path, sql):
+    """Test API queries may read the processed directory but no other file or URL."""
+    (tmp_path / "outside.csv").write_text("secret\n1\n")
+    processed = tmp_path / "processed"
+    pl.DataFrame({"x": [1, 2]}).write_parquet(processed / "data.parquet")
+
+    allowed = client.post(
+        "/query/",
+        json={"sql": f"SELECT max(x) AS s FROM '{processed}/data.parquet'", "format": "ndjson"},
+    )
+    response = client.post(
+        "/query/", json={"sql": sql.format(outside=tmp_path / "outside.csv", processed=processed)}
+    )
+
+    assert allowed.json() == {"s": 2}
+    assert response.status_code == 400
+    assert "secret" not in response.text
+
+
+def test_query_endpoint_timeout_interrupts_query(analytics_engine):
+    """Test slow queries are cancelled and their cursors returned to the pool."""
+    response = client.post("/query/", json={"sql": SLOW_SQL, "timeout": 0.2})
+    assert response.status_code == 504
+
+    for _ in range(analytics_engine.pool_size):
+        response = client.post("/query/", json={"sql": "SELECT 1 AS x", "format": "ndjson"})
+        assert response.json() == {"x": 1}
+
+
+def test_query_slot_is_released_once_the_worker_lets_go(analytics_engine, monkeypatch):
+    """Test closing a stream whose worker is still busy frees its slot only when the worker ends."""
+    started, release = threading.Event(), threading.Event()
+    released = []
+
+    def stuck_execute(self):
+        started.set()
+        release.wait(5)
+        return b""
+
+    monkeypatch.setattr(query_module.QueryStream, "_execute", stuck_execute)
+    stream = query_module.QueryStream(
+        "SELECT 1",
+        query_module.QueryFormat.ARROW,
+        10,
+        time.monotonic() + 0.2,
+        lambda: released.append(1),
+    )
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(stream.start())
+    assert started.is_set()
+    stream.close()
+    assert released == []
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while not released and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert released == [1]
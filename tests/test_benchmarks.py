@@ -0,0 +1,41 @@
+"""Tests for the benchmark data generator and baseline comparison."""
+
+import polars as pl
+
+from benchmarks.data import make_records, parse_rows, write_records
+from benchmarks.run import compare
+from src.api.validation import validate_frame
+
+
+def test_make_records_is_seeded_with_configurable_error_and_null_rates():
+    """Test the generator is reproducible and hits roughly the requested rates."""
+    df = make_records(20_000, error_rate=0.05, null_rate=0.02, seed=7)
+
+    assert df.equals(make_records(20_000, error_rate=0.05, null_rate=0.02, seed=7))
+    assert not df.equals(make_records(20_000, error_rate=0.05, null_rate=0.02, seed=8))
+    assert df.schema == {"id": pl.Int64, "email": pl.String, "age": pl.Int64}
+    assert 0.015 < df.null_count().sum_horizontal().item() / len(df) < 0.025
+    clean = make_records(20_000, error_rate=0.05, null_rate=0.0, seed=7)
+    assert 0.04 < len(validate_frame(clean)) / len(clean) < 0.06
+    assert validate_frame(make_records(1_000, error_rate=0.0)) == []
+
+
+def test_write_records_reuses_generated_files(tmp_path):
+    """Test a dataset is written once per set of parameters, in CSV or Parquet."""
+    csv = write_records(parse_rows("10k"), "csv", directory=tmp_path)
+    parquet = write_records(10_000, "parquet", directory=tmp_path)
+    mtime = csv.stat().st_mtime_ns
+
+    assert write_records(10_000, "csv", directory=tmp_path).stat().st_mtime_ns == mtime
+    assert pl.read_csv(csv).equals(pl.read_parquet(parquet))
+
+
+def test_compare_flags_cases_slower_than_threshold():
+    """Test only cases beyond both the relative threshold and the noise floor regress."""
+    baseline = {"cases": {"etl": {"seconds": 1.0}, "dq": {"seconds": 0.001}, "s3": {"seconds": 1}}}
+    current = {"cases": {"etl": {"seconds": 1.3}, "dq": {"seconds": 0.002}, "new": {"seconds": 1}}}
+
+    comparisons = compare(current, baseline, threshold=0.25)
+
+    assert [(c.case, c.regressed) for c in comparisons] == [("etl", True), ("dq", False)]
+    assert round(comparisons[0].change, 2) == 0.3
@@ -0,0 +1,46 @@
+"""Tests for the command line interface."""
+
+import subprocess
+import sys
+
+import pytest
+from typer.testing import CliRunner
+
+from src.cli.app import app
+from src.core.config import settings
+
+HEAVY_MODULES = ["polars", "duckdb", "boto3", "snowflake.connector", "pydantic_settings", "rich"]
+
+
+@pytest.mark.parametrize("args", [["--help"], ["etl", "--help"], ["analytics", "--help"]])
+def test_help_does_not_import_heavy_modules(args):
+    """Test --help only loads Typer and the option types, not the data subsystems."""
+    code = (
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from src.cli.app import app\n"
+        f"result = CliRunner().invoke(app, {args!r})\n"
+        "assert result.exit_code == 0, result.output\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_profile_prints_stage_table_and_writes_profile(tmp_path, monkeypatch):
+    """Test --profile summarises the measured stages and --profile-output writes cProfile stats."""
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "input.csv").write_text("id,email,age\n1,a@test.com,25\n2,b@test.com,17\n")
+    monkeypatch.setattr(settings, "raw_dir", str(raw))
+    output = tmp_path / "dq.prof"
+
+    result = CliRunner().invoke(app, ["--profile", "--profile-output", str(output), "dq"])
+
+    assert result.exit_code == 0, result.output
+    assert "Profile" in result.output
+    assert "dq" in result.output.split("Profile")[1]
+    assert output.stat().st_size > 0
@@ -0,0 +1,246 @@
+"""Tests for the core module."""
+
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+
+import polars as pl
+import pytest
+from loguru import logger
+
+from src.core import logger as logger_module
+from src.core import metrics
+from src.core.config import settings
+from src.core.batches import iter_csv_batches
+from src.core.logger import BackgroundFileSink
+from src.core.metrics import MetricsRegistry, StageStats, record, stage, timed
+from src.core.schemas import DatasetSchema, check_csv, csv_options, get_schema, schema_for
+
+
+def test_iter_csv_batches_sizes():
+    """Test CSV streams are split into batches of at most batch_size rows."""
+    data = "id,age\n" + "\n".join(f"{i},{i}" for i in range(1, 8)) + "\n"
+
+    batches = list(iter_csv_batches(io.BytesIO(data.encode()), batch_size=3))
+
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert batches[-1]["id"].to_list() == [7]
+
+
+def test_iter_csv_batches_quoted_newlines():
+    """Test quoted fields containing newlines stay within a single record."""
+    data = 'id,note\n1,"line one\nline two"\n\n2,"say ""hi"""\n'
+
+    batches = list(iter_csv_batches(io.BytesIO(data.encode()), batch_size=1))
+
+    assert [b["note"][0] for b in batches] == ["line one\nline two", 'say "hi"']
+
+
+def test_iter_csv_batches_pins_first_schema():
+    """Test later batches reuse the column types inferred for the first batch."""
+    data = "id,score\n1,1.5\n2,2\n"
+
+    batches = list(iter_csv_batches(io.BytesIO(data.encode()), batch_size=1))
+
+    assert batches[0].schema == batches[1].schema
+
+
+def test_records_schema_derived_from_model():
+    """Test the records schema takes its column types from the Record model."""
+    schema = get_schema("records")
+
+    assert schema.dtypes == {"id": pl.Int64, "email": pl.String, "age": pl.Int64}
+    assert schema_for("data/raw/input.csv") is schema
+    assert schema_for("data/raw/other.csv") is None
+
+
+def test_csv_options_pin_types(tmp_path):
+    """Test registered files are read with pinned types and without inference."""
+    path = tmp_path / "input.csv"
+    path.write_text("id,email,age,note\n1,a@example.com,30,1\n")
+
+    options = csv_options(path)
+    df = pl.read_csv(path, **options)
+
+    assert options["infer_schema"] is False
+    assert df.schema == {"id": pl.Int64, "email": pl.String, "age": pl.Int64, "note": pl.String}
+    assert "infer_schema" not in csv_options(tmp_path / "other.csv")
+
+
+def test_csv_options_reject_bad_values(tmp_path):
+    """Test a value that does not fit its pinned type fails the read instead of widening it."""
+    path = tmp_path / "input.csv"
+    path.write_text("id,email,age\n1,a@example.com,thirty\n")
+
+    with pytest.raises(pl.exceptions.ComputeError):
+        pl.read_csv(path, **csv_options(path))
+
+
+def test_check_csv_reports_drift(tmp_path):
+    """Test drift is reported from the header: missing and unexpected columns."""
+    path = tmp_path / "input_2024.csv"
+    path.write_text("id,age,country\n1,30,NL\n")
+
+    drift = check_csv(path)
+
+    assert drift
+    assert drift.missing == ["email"]
+    assert drift.unexpected == ["country"]
+    assert not check_csv(
+        path, DatasetSchema("t", {"id": pl.Int64, "age": pl.Int64, "country": pl.String})
+    )
+
+
+def test_schema_coerce_keeps_unparseable_columns_as_strings():
+    """Test coerce casts the columns that fully parse and leaves the others as strings."""
+    df = pl.DataFrame({"id": ["1", "2"], "email": ["a@x.io", None], "age": ["30", "old"]})
+
+    coerced = get_schema("records").coerce(df)
+
+    assert coerced.schema == {"id": pl.Int64, "email": pl.String, "age": pl.String}
+
+
+def test_background_sink_writes_rotates_and_compresses(tmp_path):
+    """Test records are written by the writer thread, and rotated files are zipped."""
+    path = tmp_path / "app.log"
+    handler = logger.add(BackgroundFileSink(path, rotation=50), format="{message}")
+
+    for i in range(20):
+        logger.info("record {}", i)
+    logger.remove(handler)
+    logger_module._compressor.submit(lambda: None).result()
+
+    archives = sorted(tmp_path.glob("app.*.log.zip"))
+    assert archives
+    assert not list(tmp_path.glob("app.*.log"))
+    text = ""
+    for archive in archives:
+        with zipfile.ZipFile(archive) as zf:
+            text += zf.read(zf.namelist()[0]).decode()
+    text += path.read_text() if path.exists() else ""
+    assert text.splitlines() == [f"record {i}" for i in range(20)]
+
+
+def test_background_sink_drops_when_full(tmp_path):
+    """Test the drop policy discards records while the queue is full and reports the count."""
+    gate = threading.Event()
+
+    class StalledSink(BackgroundFileSink):
+        def _write(self, messages):
+            gate.wait()
+            super()._write(messages)
+
+    sink = StalledSink(tmp_path / "app.log", max_queue=1, overflow="drop")
+    sink.write("a\n")
+    while not sink._queue.empty():  # the writer has taken "a" and is stalled
+        time.sleep(0.001)
+    for message in ("b\n", "c\n", "d\n"):
+        sink.write(message)
+    gate.set()
+    sink.stop()
+
+    assert sink.dropped == 2
+    lines = (tmp_path / "app.log").read_text().splitlines()
+    assert sorted(lines) == ["2 log records dropped while the log queue was full", "a", "b"]
+
+
+def test_background_sink_writes_own_file_after_fork(tmp_path, monkeypatch):
+    """Test a forked worker gets a writer thread and, per process, its own log file."""
+    monkeypatch.setattr(settings, "log_file", str(tmp_path / "app.log"))
+    monkeypatch.setattr(settings, "log_file_per_process", True)
+    sink = BackgroundFileSink(logger_module.log_path())
+    stopped = BackgroundFileSink(tmp_path / "old.log")
+    stopped.stop()
+    assert sink.path == tmp_path / f"app.{os.getpid()}.log"
+    assert stopped not in logger_module._sinks
+
+    pid = os.fork()
+    if pid == 0:
+        sink.write("child\n")
+        sink.stop()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    sink.write("parent\n")
+    sink.stop()
+
+    assert (tmp_path / f"app.{pid}.log").read_text() == "child\n"
+    assert sink.path.read_text() == "parent\n"
+
+
+def test_logger_imports_rich_on_first_console_use():
+    """Test importing the logger leaves Rich unloaded until the shared console is used."""
+    code = (
+        "import sys\n"
+        "from src.core import logger\n"
+        "print('rich' in sys.modules)\n"
+        "logger.console.print('ok')\n"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "ok"]
+
+
+def test_logger_is_configured_on_first_use(tmp_path):
+    """Test importing modules that hold a logger adds no sinks until a record is logged."""
+    code = (
+        "from src.core import logger\n"
+        "from src.etl import load\n"
+        "print(logger._configured)\n"
+        "load.logger.info('first record')\n"
+        "print(logger._configured)\n"
+    )
+    env = {**os.environ, "LOG_FILE": str(tmp_path / "app.log"), "LOG_ASYNC": "false"}
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "True"]
+    assert "first record" in (tmp_path / "app.log").read_text()
+
+
+def test_stage_records_time_rows_and_failures(monkeypatch):
+    """Test stages record wall and CPU time, rows and bytes, and count failures."""
+    monkeypatch.setattr(metrics, "registry", MetricsRegistry())
+
+    @timed("work")
+    def work(fail: bool = False) -> None:
+        record(rows=10, bytes=100)
+        if fail:
+            raise ValueError("boom")
+
+    work()
+    with pytest.raises(ValueError):
+        work(fail=True)
+    with stage("outer") as outer:
+        work()
+        outer.rows = 1
+
+    stats = metrics.registry.recent()
+    assert [s.stage for s in stats] == ["work", "work", "work", "outer"]
+    assert [s.failed for s in stats] == [False, True, False, False]
+    assert stats[-1].rows == 1  # rows recorded by the inner stage are not added to the outer one
+    assert all(s.wall_seconds > 0 and s.peak_rss_bytes > 0 for s in stats)
+    totals = metrics.registry.totals()["work"]
+    assert (totals.runs, totals.failures, totals.rows, totals.bytes) == (3, 1, 30, 300)
+
+
+def test_registry_renders_prometheus_text():
+    """Test the Prometheus rendering has cumulative buckets and per-stage counters."""
+    reg = MetricsRegistry()
+    reg.add(StageStats("load", wall_seconds=0.2, rows=5, bytes=50))
+    reg.add(StageStats("load", wall_seconds=2.0, rows=5, bytes=50))
+
+    text = reg.render_prometheus()
+
+    assert "# TYPE edp_stage_duration_seconds histogram" in text
+    assert 'edp_stage_duration_seconds_bucket{stage="load",le="0.25"} 1' in text
+    assert 'edp_stage_duration_seconds_bucket{stage="load",le="+Inf"} 2' in text
+    assert 'edp_stage_duration_seconds_count{stage="load"} 2' in text
+    assert 'edp_stage_rows_total{stage="load"} 10' in text
+    assert "edp_process_peak_rss_bytes " in text
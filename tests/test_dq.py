@@ -2,7 +2,15 @@
 
 import polars as pl
 
-from src.dq.rules import RULES, age_valid, email_not_null
+from src.core.config import settings
+from src.dq.checks import ReservoirSampler, evaluate, run_dq, stream_evaluate
+from src.dq.rules import RULES, Rule, age_valid, email_not_null
+
+DATA = {
+    "id": [1, 2, 3, 4],
+    "email": ["a@test.com", None, "c@test.com", None],
+    "age": [25, 30, 150, None],
+}
 
 
 def test_email_not_null_rule():
@@ -84,3 +92,96 @@ def test_rules_applied_to_dataset():
 
     assert email_failures == 1
     assert age_failures == 1
+
+
+def test_evaluate_counts_failures_in_one_pass():
+    """Test fused evaluation matches filtering the data rule by rule."""
+    df = pl.DataFrame(DATA)
+    rules = dict(RULES)
+    for limit in range(0, 200, 10):
+        rules[f"age_below_{limit}"] = Rule(f"age_below_{limit}", pl.col("age") < limit)
+
+    result = evaluate(df.lazy(), rules)
+
+    assert result.rows == 4
+    assert result.failures == {name: df.filter(~rule(df)).height for name, rule in rules.items()}
+    assert result.failures["email_not_null"] == 2
+    assert result.failures["age_valid"] == 1
+
+
+def test_evaluate_masks_and_samples():
+    """Test row-level violation masks and failing-row samples."""
+    result = evaluate(pl.DataFrame(DATA), masks=True, sample_size=1)
+
+    assert result.masks.to_dict(as_series=False) == {
+        "email_not_null": [False, True, False, True],
+        "age_valid": [False, False, True, False],
+    }
+    assert result.samples["email_not_null"].to_dicts() == [
+        {"row": 1, "id": 2, "email": None, "age": 30}
+    ]
+    assert result.samples["age_valid"]["id"].to_list() == [3]
+
+
+def test_evaluate_without_failures_returns_empty_samples():
+    """Test rules without failures yield empty samples with the data's columns."""
+    result = evaluate(pl.DataFrame(DATA).head(1), sample_size=5)
+
+    assert result.failures == {"email_not_null": 0, "age_valid": 0}
+    assert result.samples["age_valid"].columns == ["row", "id", "email", "age"]
+    assert result.samples["age_valid"].is_empty()
+
+
+def test_stream_evaluate_matches_in_memory_evaluation():
+    """Test the streaming engine counts failures exactly and samples only failing rows."""
+    df = pl.DataFrame({"id": range(1, 1001), "email": "a@test.com", "age": range(-500, 500)})
+
+    result = stream_evaluate(df.lazy(), sample_size=10)
+
+    assert result.rows == 1000
+    assert result.failures == evaluate(df).failures == {"email_not_null": 0, "age_valid": 881}
+    sample = result.samples["age_valid"]
+    assert sample.height == 10
+    assert ((sample["age"] <= 0) | (sample["age"] >= 120)).all()
+    assert result.samples["email_not_null"].is_empty()
+    assert stream_evaluate(df.lazy(), sample_size=10).samples["age_valid"].equals(sample)
+
+
+def test_reservoir_sampler_spans_batches():
+    """Test samples are bounded and drawn from every batch, not just the first ones."""
+    sampler = ReservoirSampler(["rule"], size=50)
+    for start in range(0, 10_000, 1000):
+        batch = pl.DataFrame({"row": range(start, start + 1000)}).with_columns(
+            pl.lit(True).alias("__failed_rule"), pl.col("row").hash(0).alias("__key")
+        )
+        sampler.update(batch)
+
+    sample = sampler.result(pl.Schema({"row": pl.Int64}))["rule"]
+
+    assert sample.height == 50
+    assert sample.columns == ["row"]
+    assert sample["row"].max() >= 5000
+
+
+def test_run_dq(tmp_path, monkeypatch):
+    """Test run_dq scans the raw input CSV and returns failure counts."""
+    monkeypatch.setattr(settings, "raw_dir", str(tmp_path))
+    pl.DataFrame(DATA).write_csv(tmp_path / "input.csv")
+
+    result = run_dq(sample_size=1)
+
+    assert result.failures == {"email_not_null": 2, "age_valid": 1}
+    assert result.samples["age_valid"]["id"].to_list() == [3]
+
+
+def test_run_dq_on_processed_dataset(tmp_path, monkeypatch):
+    """Test run_dq reads hive-partitioned Parquet datasets from the processed directory."""
+    monkeypatch.setattr(settings, "raw_dir", str(tmp_path / "raw"))
+    monkeypatch.setattr(settings, "processed_dir", str(tmp_path / "processed"))
+    for day, rows in (("2024-01-01", slice(0, 2)), ("2024-01-02", slice(2, 4))):
+        part = tmp_path / "processed" / "people" / f"ingest_date={day}"
+        part.mkdir(parents=True)
+        pl.DataFrame(DATA)[rows].write_parquet(part / "input.parquet")
+
+    assert run_dq("people").failures == {"email_not_null": 2, "age_valid": 1}
+    assert run_dq("missing") is None
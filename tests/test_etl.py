@@ -1,10 +1,34 @@
 """Tests for the ETL module."""
 
+from pathlib import Path
+
 import polars as pl
+import pytest
 
+from src.core.config import settings
+from src.etl import extract
+from src.etl import manifest as manifest_module
+from src.etl.ingest import cached, ingest_file
+from src.etl.parallel import is_dataset_source, resolve_sources, run_parallel_etl
+from src.etl.pipeline import Filter, Node, Pipeline, Step
+from src.etl.runner import Engine, run_etl
 from src.etl.transform import filter_adults
 
 
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    """Point the raw and processed directories at a temporary location with a sample CSV."""
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "input.csv").write_text(
+        "id,email,age\n1,a@test.com,25\n2,b@test.com,17\n3,c@test.com,40\n"
+    )
+    monkeypatch.setattr(settings, "raw_dir", str(raw))
+    monkeypatch.setattr(settings, "processed_dir", str(tmp_path / "processed"))
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path / "cache"))
+    return tmp_path
+
+
 def test_filter_adults_basic():
     """Test filter_adults removes rows with age <= 18."""
     data = {
@@ -78,3 +102,248 @@ def test_filter_adults_preserves_columns():
 
     assert set(result.columns) == {"id", "email", "age"}
     assert result.shape[0] == 2
+
+
+def test_filter_adults_lazy():
+    """Test filter_adults works on LazyFrames and stays lazy."""
+    lf = pl.LazyFrame({"id": [1, 2, 3], "age": [25, 17, 30]})
+
+    result = filter_adults(lf)
+
+    assert isinstance(result, pl.LazyFrame)
+    assert result.collect()["id"].to_list() == [1, 3]
+
+
+@pytest.mark.parametrize("engine", list(Engine))
+def test_run_etl_engines(data_dirs, engine):
+    """Test every engine writes the same filtered and projected Parquet output."""
+    path = run_etl("input.csv", "output.parquet", engine=engine, columns=["id", "email"])
+
+    result = pl.read_parquet(path)
+
+    assert result.columns == ["id", "email"]
+    assert result["id"].to_list() == [1, 3]
+
+
+@pytest.mark.parametrize("engine", list(Engine))
+def test_run_etl_nested_output(data_dirs, tmp_path, engine):
+    """Test every engine creates the parent directories of nested and absolute outputs."""
+    nested = run_etl("input.csv", "daily/2024/output.parquet", engine=engine)
+    absolute = run_etl("input.csv", str(tmp_path / "elsewhere" / "output.parquet"), engine=engine)
+
+    assert nested == str(data_dirs / "processed" / "daily" / "2024" / "output.parquet")
+    assert absolute == str(tmp_path / "elsewhere" / "output.parquet")
+    assert pl.read_parquet(nested).equals(pl.read_parquet(absolute))
+
+
+def test_resolve_sources_glob_and_directory(data_dirs):
+    """Test directories and globs expand to sorted CSV paths in the raw directory."""
+    hourly = data_dirs / "raw" / "hourly"
+    hourly.mkdir()
+    for name in ("b.csv", "a.csv", "notes.txt"):
+        (hourly / name).write_text("id,age\n1,30\n")
+
+    assert is_dataset_source("hourly") and is_dataset_source("hourly/*.csv")
+    assert not is_dataset_source("input.csv")
+    assert [p.name for p in resolve_sources("hourly")] == ["a.csv", "b.csv"]
+    assert [p.name for p in resolve_sources("**/*.csv")] == ["a.csv", "b.csv", "input.csv"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_parallel_etl_partitions(data_dirs, workers):
+    """Test multi-file runs write one file per source and partition, readable as a dataset."""
+    hourly = data_dirs / "raw" / "hourly"
+    hourly.mkdir()
+    (hourly / "h1.csv").write_text("id,region,age\n1,eu,30\n2,us,12\n3,us,45\n")
+    (hourly / "h2.csv").write_text("id,region,age\n4,eu,50\n")
+
+    results = run_parallel_etl("hourly", "people", ["region"], workers=workers)
+
+    assert [(r.rows_in, r.rows_out) for r in results] == [(3, 2), (1, 1)]
+    assert results[0].outputs == ["region=eu/h1.parquet", "region=us/h1.parquet"]
+    dataset = pl.scan_parquet(data_dirs / "processed" / "people", hive_partitioning=True)
+    assert sorted(dataset.collect()["id"].to_list()) == [1, 3, 4]
+
+
+def test_run_parallel_etl_incremental(data_dirs):
+    """Test incremental runs only reprocess changed inputs and drop outputs of removed ones."""
+    hourly = data_dirs / "raw" / "hourly"
+    hourly.mkdir()
+    for name in ("h1", "h2", "h3"):
+        (hourly / f"{name}.csv").write_text("id,region,age\n1,eu,30\n")
+    dataset = data_dirs / "processed" / "people"
+
+    assert len(run_parallel_etl("hourly", "people", ["region"], workers=1)) == 3
+    assert run_parallel_etl("hourly", "people", ["region"], workers=1, incremental=True) == []
+
+    (hourly / "h2.csv").write_text("id,region,age\n2,us,40\n")
+    (hourly / "h3.csv").unlink()
+    results = run_parallel_etl("hourly", "people", ["region"], workers=1, incremental=True)
+
+    assert [Path(r.source).name for r in results] == ["h2.csv"]
+    files = sorted(str(p.relative_to(dataset)) for p in dataset.rglob("*.parquet"))
+    assert files == ["region=eu/h1.parquet", "region=us/h2.parquet"]
+
+
+def test_run_etl_incremental_skips_unchanged_input(data_dirs):
+    """Test single-file incremental runs skip work when the input has not changed."""
+    path = run_etl("input.csv", "output.parquet", incremental=True)
+    written = Path(path).stat().st_mtime_ns
+
+    run_etl("input.csv", "output.parquet", incremental=True)
+    assert Path(path).stat().st_mtime_ns == written
+
+    run_etl("input.csv", "output.parquet", columns=["id"], incremental=True)
+    assert pl.read_parquet(path).columns == ["id"]
+
+
+def test_run_etl_hashes_input_only_when_needed(data_dirs, monkeypatch):
+    """Test plain runs never hash the input and incremental runs hash it once, after a stat miss."""
+    hashed = []
+    file_digest = manifest_module.hashlib.file_digest
+    monkeypatch.setattr(
+        manifest_module.hashlib,
+        "file_digest",
+        lambda f, digest: hashed.append(f.name) or file_digest(f, digest),
+    )
+    source = data_dirs / "raw" / "input.csv"
+
+    run_etl("input.csv", "output.parquet")
+    run_etl("input.csv", "output.parquet", incremental=True)
+    assert hashed == []
+
+    source.write_text("id,email,age\n1,a@test.com,30\n")
+    run_etl("input.csv", "output.parquet", incremental=True)
+    source.write_text("id,email,age\n1,a@test.com,31\n")
+    run_etl("input.csv", "output.parquet", incremental=True)
+    assert hashed == [str(source.resolve())] * 2
+
+
+PIPELINE_YAML = """
+sources:
+  people: input.csv
+  countries: countries.csv
+nodes:
+  adults:
+    input: people
+    steps:
+      - cast: {age: Int32}
+      - filter: age > 18
+      - dedupe: [id]
+      - select: [id, age, country]
+  by_country:
+    input: adults
+    steps:
+      - join: {right: countries, on: country, how: left}
+      - aggregate: {by: [name], aggs: [count(id) AS adults, avg(age) AS avg_age]}
+outputs:
+  adults: adults.parquet
+  by_country: by_country.parquet
+"""
+
+
+def test_pipeline_from_yaml_runs_all_outputs(data_dirs):
+    """Test a YAML pipeline with a join and branches writes every output in one run."""
+    raw = data_dirs / "raw"
+    (raw / "input.csv").write_text(
+        "id,email,age,country\n1,a,25,fr\n2,b,17,fr\n3,c,40,de\n1,a,25,fr\n4,d,60,de\n"
+    )
+    (raw / "countries.csv").write_text("country,name\nfr,France\nde,Germany\n")
+    (data_dirs / "pipeline.yaml").write_text(PIPELINE_YAML)
+
+    paths = Pipeline.from_yaml(data_dirs / "pipeline.yaml").run()
+
+    adults = pl.read_parquet(paths["adults"])
+    assert adults["id"].to_list() == [1, 3, 4]
+    assert adults.schema["age"] == pl.Int32
+    assert pl.read_parquet(paths["by_country"]).to_dicts() == [
+        {"name": "France", "adults": 1, "avg_age": 25.0},
+        {"name": "Germany", "adults": 2, "avg_age": 50.0},
+    ]
+
+
+def test_pipeline_compiles_into_one_plan(data_dirs):
+    """Test the steps are fused so projections and predicates reach the CSV scan."""
+    pipeline = Pipeline(
+        sources={"input": None},
+        nodes={"adults": Node("input", [Filter("age > 18"), Filter("id < 3")])},
+    )
+    lf = pipeline.transform(pl.scan_csv(data_dirs / "raw" / "input.csv")).select("id")
+
+    plan = lf.explain()
+    assert "FILTER" not in plan
+    assert "PROJECT 2/3 COLUMNS" in plan
+    assert lf.collect()["id"].to_list() == [1]
+
+
+@pytest.mark.parametrize(
+    ("spec", "error"),
+    [
+        ({"nodes": {"a": {"input": "missing"}}}, "Unknown node or source"),
+        ({"nodes": {"a": {"input": "b"}, "b": {"input": "a"}}}, "cycle"),
+        (
+            {"sources": {"s": "x.csv"}, "nodes": {"a": {"input": "s", "steps": [{"sort": "id"}]}}},
+            "unknown step",
+        ),
+        (
+            {
+                "sources": {"s": "x.csv"},
+                "nodes": {"a": {"input": "s", "steps": [{"cast": {"age": "Nope"}}]}},
+            },
+            "Unknown Polars data type",
+        ),
+    ],
+)
+def test_pipeline_validation(spec, error):
+    """Test invalid pipelines are rejected when they are built."""
+    with pytest.raises(ValueError, match=error):
+        Pipeline.from_dict(spec)
+
+
+def test_step_subclasses_must_implement_apply():
+    """Test a step without `apply` cannot be instantiated."""
+
+    class Sort(Step):
+        kind = "sort"
+
+    with pytest.raises(TypeError, match="apply"):
+        Sort()
+
+
+def test_run_etl_with_pipeline(data_dirs):
+    """Test the ETL runner applies a custom pipeline and rebuilds when the pipeline changes."""
+    pipeline = Pipeline.from_dict(
+        {
+            "sources": {"input": None},
+            "nodes": {"minors": {"input": "input", "steps": [{"filter": "age < 18"}]}},
+        }
+    )
+
+    run_etl("input.csv", "output.parquet", incremental=True)
+    path = run_etl("input.csv", "output.parquet", incremental=True, pipeline=pipeline)
+
+    assert pl.read_parquet(path)["id"].to_list() == [2]
+
+
+def test_ingest_file_is_read_without_parsing(data_dirs, monkeypatch):
+    """Test ingested files are read from their Arrow IPC copy until the CSV changes."""
+    source = data_dirs / "raw" / "input.csv"
+
+    first = ingest_file(source)
+    second = ingest_file(source)
+
+    assert first.converted and not second.converted
+    assert first.rows == 3
+    assert cached(source) == Path(first.target)
+
+    with monkeypatch.context() as m:
+        m.setattr(extract.pl, "read_csv", None)
+        m.setattr(extract.pl, "scan_csv", None)
+        df = extract.extract_local("input.csv")
+        assert df.schema == {"id": pl.Int64, "email": pl.String, "age": pl.Int64}
+        assert extract.scan_dataset("input.csv").collect().equals(df)
+        assert run_etl(engine=Engine.STREAMING)
+
+    source.write_text("id,email,age\n4,d@test.com,50\n")
+    assert cached(source) is None
+    assert extract.extract_local("input.csv")["id"].to_list() == [4]
@@ -0,0 +1,275 @@
+"""Tests for the S3 helpers, run against moto's in-memory S3."""
+
+import gzip
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import pytest
+from moto import mock_aws
+
+from src.core.config import settings
+from src.etl.cache import ObjectCache
+from src.etl.extract import extract_from_s3, iter_s3_csv_batches, read_s3_parquet
+from src.etl.s3 import S3RangeReader, download_from_s3, download_many, get_s3_client, list_keys
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def s3_client(tmp_path, monkeypatch):
+    """Point the S3 settings at a mocked bucket and return the shared client."""
+    monkeypatch.setattr(settings, "aws_access_key_id", "testing")
+    monkeypatch.setattr(settings, "aws_secret_access_key", "testing")
+    monkeypatch.setattr(settings, "aws_region", "us-east-1")
+    monkeypatch.setattr(settings, "s3_bucket", BUCKET)
+    monkeypatch.setattr(settings, "s3_multipart_chunk_mb", 1)
+    monkeypatch.setattr(settings, "raw_dir", str(tmp_path / "raw"))
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path / "cache"))
+    get_s3_client.cache_clear()
+    with mock_aws():
+        client = get_s3_client()
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+    get_s3_client.cache_clear()
+
+
+def test_client_is_reused(s3_client):
+    """Test the client is created once with the configured connection pool."""
+    assert get_s3_client() is s3_client
+    assert s3_client.meta.config.max_pool_connections == settings.s3_max_pool_connections
+
+
+def test_download_large_object_in_parts(s3_client, monkeypatch):
+    """Test objects above the multipart threshold are fetched as ranged GETs."""
+    monkeypatch.setattr(settings, "s3_cache_mb", 0)
+    body = os.urandom(3 * 2**20 + 123)
+    s3_client.put_object(Bucket=BUCKET, Key="exports/big.bin", Body=body)
+    ranges = []
+    s3_client.meta.events.register(
+        "provide-client-params.s3.GetObject",
+        lambda params, **kwargs: ranges.append(params.get("Range")),
+    )
+
+    path = download_from_s3("exports/big.bin")
+
+    assert path == f"{settings.raw_dir}/big.bin"
+    with open(path, "rb") as f:
+        assert f.read() == body
+    assert len(ranges) == 4
+    assert all(r and r.startswith("bytes=") for r in ranges)
+
+
+def test_cached_download_skips_unchanged_objects(s3_client):
+    """Test repeat downloads are served by a 304 and changed objects are fetched again."""
+    s3_client.put_object(Bucket=BUCKET, Key="input.csv", Body=b"id\n1\n")
+    requests = []
+    s3_client.meta.events.register(
+        "provide-client-params.s3.HeadObject", lambda params, **kwargs: requests.append(params)
+    )
+
+    path = download_from_s3("input.csv")
+    download_from_s3("input.csv")
+    with open(path, "rb") as f:
+        assert f.read() == b"id\n1\n"
+    assert "IfNoneMatch" not in requests[0]
+    assert "IfNoneMatch" in requests[1]
+
+    s3_client.put_object(Bucket=BUCKET, Key="input.csv", Body=b"id\n2\n")
+    cache = ObjectCache()
+    assert not cache.get("input.csv", path)
+    assert cache.get("input.csv", path)
+    with open(path, "rb") as f:
+        assert f.read() == b"id\n2\n"
+    assert (cache.misses, cache.hits, cache.bytes_downloaded) == (1, 1, 5)
+    assert len(os.listdir(cache.root / "blobs")) == 1
+
+
+def test_cache_evicts_least_recently_used(s3_client, tmp_path):
+    """Test the cache stays under its size cap by evicting the least recently used objects."""
+    for name in "abc":
+        s3_client.put_object(Bucket=BUCKET, Key=f"{name}.bin", Body=os.urandom(400_000))
+    cache = ObjectCache(max_bytes=1_000_000)
+
+    cache.get("a.bin", tmp_path / "a.bin")
+    cache.get("b.bin", tmp_path / "b.bin")
+    assert cache.get("a.bin", tmp_path / "a.bin")
+    cache.get("c.bin", tmp_path / "c.bin")
+
+    assert cache.size() == 800_000
+    assert cache.get("a.bin", tmp_path / "a.bin")
+    assert not cache.get("b.bin", tmp_path / "b.bin")
+    assert (tmp_path / "b.bin").stat().st_size == 400_000
+
+
+def test_cache_shared_by_concurrent_workers(s3_client, tmp_path):
+    """Test concurrent lookups of one object download it once and all see complete files."""
+    body = os.urandom(2 * 2**20 + 1)
+    s3_client.put_object(Bucket=BUCKET, Key="big.bin", Body=body)
+    caches = [ObjectCache() for _ in range(4)]
+
+    with ThreadPoolExecutor(4) as pool:
+        hits = list(
+            pool.map(lambda i: caches[i].get("big.bin", tmp_path / f"out{i}.bin"), range(4))
+        )
+
+    assert sorted(hits) == [False, True, True, True]
+    assert sum(c.bytes_downloaded for c in caches) == len(body)
+    assert all((tmp_path / f"out{i}.bin").read_bytes() == body for i in range(4))
+
+
+def test_cache_copies_blobs_to_destination(s3_client, tmp_path):
+    """Test hits leave the destination untouched and edits to it do not reach the cache."""
+    s3_client.put_object(Bucket=BUCKET, Key="input.csv", Body=b"id\n1\n")
+    cache = ObjectCache()
+    dest = tmp_path / "input.csv"
+
+    cache.get("input.csv", dest)
+    mtime_ns = dest.stat().st_mtime_ns
+    assert cache.get("input.csv", dest)
+    assert dest.stat().st_mtime_ns == mtime_ns
+    (blob,) = (cache.root / "blobs").iterdir()
+    assert not os.path.samefile(blob, dest)
+
+    with open(dest, "ab") as f:
+        f.write(b"2\n")
+    assert blob.read_bytes() == b"id\n1\n"
+    assert cache.get("input.csv", dest)
+    assert dest.read_bytes() == b"id\n1\n"
+
+
+def test_cache_pins_large_downloads_to_etag(s3_client, tmp_path):
+    """Test a large object is validated by a HEAD and fetched by ranged GETs of that version."""
+    s3_client.put_object(Bucket=BUCKET, Key="big.bin", Body=os.urandom(3 * 2**20))
+    requests = []
+    s3_client.meta.events.register(
+        "provide-client-params.s3.*", lambda params, model, **kwargs: requests.append(model.name)
+    )
+    s3_client.meta.events.register(
+        "provide-client-params.s3.GetObject", lambda params, **kwargs: requests.append(params)
+    )
+
+    ObjectCache().get("big.bin", tmp_path / "big.bin")
+
+    etag = s3_client.head_object(Bucket=BUCKET, Key="big.bin")["ETag"]
+    gets = [r for r in requests if isinstance(r, dict)]
+    assert len(gets) == 3
+    assert all(r["IfMatch"] == etag and "Range" in r for r in gets)
+    assert requests.count("HeadObject") == 2  # the cache's and the one above
+
+
+def test_list_keys_paginates(s3_client):
+    """Test listing follows continuation tokens and skips directory placeholders."""
+    for i in range(1005):
+        s3_client.put_object(Bucket=BUCKET, Key=f"logs/{i:04d}.csv", Body=b"x" * i)
+    s3_client.put_object(Bucket=BUCKET, Key="logs/", Body=b"")
+    s3_client.put_object(Bucket=BUCKET, Key="other.csv", Body=b"x")
+
+    keys = dict(list_keys("logs/"))
+
+    assert len(keys) == 1005
+    assert keys["logs/1004.csv"] == 1004
+
+
+@pytest.mark.parametrize("cache_mb", [0, 1024])
+def test_download_many(s3_client, tmp_path, monkeypatch, cache_mb):
+    """Test batch downloads keep relative paths, report progress and record failures."""
+    monkeypatch.setattr(settings, "s3_cache_mb", cache_mb)
+    objects = {
+        f"daily/2024-01-0{d}/part-{p}.csv": os.urandom(1000 * d + p) for d in (1, 2) for p in (0, 1)
+    }
+    objects["daily/big.bin"] = os.urandom(2 * 2**20 + 1)
+    for key, body in objects.items():
+        s3_client.put_object(Bucket=BUCKET, Key=key, Body=body)
+    progress = []
+
+    report = download_many(
+        [*objects, "daily/missing.csv", "daily/../../escape.csv"],
+        destination_dir=str(tmp_path / "out"),
+        prefix="daily/",
+        workers=4,
+        on_progress=progress.append,
+    )
+
+    assert sorted(report.failed) == ["daily/../../escape.csv", "daily/missing.csv"]
+    assert len(report.files) == len(objects)
+    assert report.bytes == sum(progress) == sum(len(b) for b in objects.values())
+    for key, body in objects.items():
+        assert (tmp_path / "out" / key.removeprefix("daily/")).read_bytes() == body
+    assert not (tmp_path / "escape.csv").exists()
+
+
+def test_download_many_skips_unchanged_objects(s3_client, tmp_path):
+    """Test a repeated batch download is served from the cache without fetching any body."""
+    objects = {f"daily/part-{p}.csv": os.urandom(1000 + p) for p in range(3)}
+    for key, body in objects.items():
+        s3_client.put_object(Bucket=BUCKET, Key=key, Body=body)
+    gets = []
+    s3_client.meta.events.register(
+        "provide-client-params.s3.GetObject", lambda params, **kwargs: gets.append(params)
+    )
+
+    first = download_many(list(objects), destination_dir=str(tmp_path / "out"), prefix="daily/")
+    progress = []
+    second = download_many(
+        list(objects),
+        destination_dir=str(tmp_path / "out"),
+        prefix="daily/",
+        on_progress=progress.append,
+    )
+
+    assert len(gets) == 3
+    assert (first.cached, second.cached) == (0, 3)
+    assert second.bytes == sum(progress) == sum(len(b) for b in objects.values())
+    for key, body in objects.items():
+        assert (tmp_path / "out" / key.removeprefix("daily/")).read_bytes() == body
+
+
+def test_range_reader_seeks_and_reads(s3_client):
+    """Test the ranged reader behaves like a local seekable file."""
+    body = os.urandom(300_000)
+    s3_client.put_object(Bucket=BUCKET, Key="blob.bin", Body=body)
+
+    with S3RangeReader(f"s3://{BUCKET}/blob.bin", block_size=1000) as reader:
+        assert reader.read(10) == body[:10]
+        reader.seek(-5, io.SEEK_END)
+        assert reader.read() == body[-5:]
+        reader.seek(100_000)
+        assert reader.read(150_000) == body[100_000:250_000]
+        assert reader.bytes_fetched < len(body)
+
+
+def test_read_s3_parquet_fetches_only_needed_ranges(s3_client):
+    """Test column selection and row-group pruning limit the bytes read from S3."""
+    df = pl.DataFrame({"id": range(100_000), "name": [f"name-{i}" for i in range(100_000)]})
+    buffer = io.BytesIO()
+    df.write_parquet(buffer, row_group_size=10_000)
+    s3_client.put_object(Bucket=BUCKET, Key="people.parquet", Body=buffer.getvalue())
+    fetched = []
+    s3_client.meta.events.register(
+        "provide-client-params.s3.GetObject", lambda params, **kwargs: fetched.append(params)
+    )
+
+    result = read_s3_parquet("people.parquet", columns=["id"], filters=[("id", ">=", 95_000)])
+
+    assert result.columns == ["id"]
+    assert result["id"].to_list() == list(range(95_000, 100_000))
+    assert all("Range" in params for params in fetched)
+    assert len(fetched) <= 3
+
+
+@pytest.mark.parametrize("key", ["data.csv", "data.csv.gz"])
+def test_stream_csv_from_s3(s3_client, key):
+    """Test CSV objects are parsed straight from S3, decompressing them on the fly."""
+    csv = pl.DataFrame({"id": range(1, 1001), "age": [20] * 1000}).write_csv().encode()
+    s3_client.put_object(
+        Bucket=BUCKET, Key=key, Body=gzip.compress(csv) if key.endswith(".gz") else csv
+    )
+
+    df = extract_from_s3(key, stream=True, columns=["id"])
+    batches = list(iter_s3_csv_batches(f"s3://{BUCKET}/{key}", batch_size=400))
+
+    assert df["id"].to_list() == list(range(1, 1001))
+    assert [b.height for b in batches] == [400, 400, 200]
+    assert not os.path.exists(settings.raw_dir)
@@ -0,0 +1,205 @@
+"""Tests for the Snowflake loader, run against a fake connector."""
+
+from datetime import datetime
+
+import polars as pl
+import pytest
+import snowflake.connector
+
+from src.core.config import settings
+from src.etl import snowflake as snowflake_module
+from src.etl.runner import Engine, run_etl
+from src.etl.snowflake import (
+    bulk_load_parquet,
+    load_frame_to_snowflake,
+    merge_frame_to_snowflake,
+    split_parquet,
+)
+from src.etl.watermark import WatermarkStore
+from tests.fakes import FakeConnection
+
+
+@pytest.fixture
+def connections(tmp_path, monkeypatch):
+    """Replace the Snowflake connector with fakes and return the connections it made."""
+    for name in ("account", "user", "password", "warehouse", "database", "schema"):
+        monkeypatch.setattr(settings, f"snowflake_{name}", "test")
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path / "cache"))
+    made = []
+
+    def connect(**kwargs):
+        made.append(FakeConnection())
+        return made[-1]
+
+    monkeypatch.setattr(snowflake.connector, "connect", connect)
+    snowflake_module.close_session()
+    yield made
+    snowflake_module.close_session()
+
+
+@pytest.fixture
+def parquet_file(tmp_path):
+    """Write an uncompressed Parquet file of about 3 MB."""
+    path = tmp_path / "people.parquet"
+    pl.DataFrame(
+        {"id": range(200_000), "value": pl.int_range(200_000, eager=True).hash()}
+    ).write_parquet(path, compression="uncompressed")
+    return path
+
+
+def test_split_parquet(parquet_file, tmp_path):
+    """Test files are split into chunks near the target size that hold every row in order."""
+    chunks = split_parquet(parquet_file, tmp_path / "chunks", 2**19)
+
+    sizes = [c.stat().st_size for c in chunks]
+    assert len(chunks) == 7
+    assert all(size < 2**19 * 1.1 for size in sizes)
+    assert pl.read_parquet(chunks).equals(pl.read_parquet(parquet_file))
+
+
+def test_bulk_load_issues_one_put_and_one_copy(connections, parquet_file):
+    """Test a load stages every chunk with one parallel PUT and loads them with one COPY."""
+    report = bulk_load_parquet(parquet_file, "RAW.PEOPLE", chunk_mb=1, parallel=16)
+
+    (connection,) = connections
+    put, copy = connection.statements
+    assert put.startswith("PUT 'file://") and "PARALLEL=16" in put
+    assert copy.startswith("COPY INTO RAW.PEOPLE FROM '@%RAW.PEOPLE/load_")
+    assert len(report.files) == 4
+    assert report.rows == connection.loaded == 200_000
+    assert report.bytes > 2**20 and report.rows_per_second > 0
+    assert not connection.stage
+
+
+def test_bulk_load_reuses_the_connection(connections, parquet_file, tmp_path):
+    """Test consecutive loads share one connection and dataset directories load together."""
+    dataset = tmp_path / "dataset"
+    for day in (1, 2):
+        (dataset / f"day={day}").mkdir(parents=True)
+        pl.DataFrame({"id": [day] * 10}).write_parquet(dataset / f"day={day}" / "part-0.parquet")
+
+    bulk_load_parquet(parquet_file, "RAW.PEOPLE")
+    report = bulk_load_parquet(dataset, "RAW.DAILY")
+
+    assert len(connections) == 1
+    assert len(report.files) == 1 and report.rows == 20
+    assert len(connections[0].statements) == 4
+
+
+def test_bulk_load_keeps_partition_columns(connections, tmp_path):
+    """Test a hive-partitioned dataset is loaded with the columns its partition directories hold."""
+    dataset = tmp_path / "dataset"
+    for day in ("2024-01-01", "2024-01-02"):
+        (dataset / f"ingest_date={day}").mkdir(parents=True)
+        pl.DataFrame({"id": [1, 2]}).write_parquet(dataset / f"ingest_date={day}" / "a.parquet")
+
+    report = bulk_load_parquet(dataset, "RAW.DAILY", chunk_mb=1)
+
+    loaded = connections[0].tables["RAW.DAILY"]
+    assert report.rows == 4
+    assert loaded.sort("ingest_date", "id").equals(
+        pl.scan_parquet(dataset, hive_partitioning=True).collect().sort("ingest_date", "id")
+    )
+    assert loaded["ingest_date"].dtype == pl.Date
+
+
+def test_bulk_load_fails_on_put_errors(connections, parquet_file):
+    """Test a failed upload raises before anything is copied."""
+    snowflake_module.get_session().put_status = "ERROR"
+
+    with pytest.raises(RuntimeError, match="PUT failed"):
+        bulk_load_parquet(parquet_file, "RAW.PEOPLE")
+
+    assert not any(s.startswith("COPY") for s in connections[0].statements)
+
+
+def test_load_frame_uploads_from_memory(connections, tmp_path):
+    """Test a LazyFrame is uploaded in chunks straight from memory and copied once."""
+    lf = pl.LazyFrame({"id": range(300_000)}).with_columns(
+        value=pl.col("id").hash().cast(pl.String)
+    )
+
+    report = load_frame_to_snowflake(lf, "RAW.EVENTS", chunk_mb=1, parallel=2)
+
+    statements = connections[0].statements
+    assert len(report.files) > 1
+    assert [s.split()[0] for s in statements] == ["PUT"] * len(report.files) + ["COPY"]
+    assert report.rows == connections[0].loaded == 300_000
+    assert not (tmp_path / "cache").exists()
+
+
+def test_load_frame_fails_on_upload_errors(connections):
+    """Test a failed upload stops the load before the COPY."""
+    snowflake_module.get_session().put_status = "ERROR"
+
+    with pytest.raises(RuntimeError, match="PUT failed"):
+        load_frame_to_snowflake(pl.DataFrame({"id": range(10)}), "RAW.EVENTS")
+
+    assert not any(s.startswith("COPY") for s in connections[0].statements)
+
+
+@pytest.mark.parametrize("engine", list(Engine))
+def test_run_etl_loads_snowflake(connections, tmp_path, monkeypatch, engine):
+    """Test the ETL writes the Parquet output and loads the same rows into Snowflake."""
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "input.csv").write_text("id,age\n1,25\n2,17\n3,40\n")
+    monkeypatch.setattr(settings, "raw_dir", str(raw))
+    monkeypatch.setattr(settings, "processed_dir", str(tmp_path / "processed"))
+
+    path = run_etl(engine=engine, snowflake_table="RAW.ADULTS")
+
+    assert pl.read_parquet(path)["id"].to_list() == [1, 3]
+    assert connections[0].loaded == 2
+
+
+def test_incremental_merge_ships_only_the_delta(connections, tmp_path):
+    """Test incremental loads upload rows past the high-water mark and merge them on the key."""
+    store = WatermarkStore(tmp_path / "watermarks.json")
+    day = [datetime(2024, 1, d) for d in (1, 1, 2, 3)]
+    source = pl.DataFrame({"id": [1, 2, 3, 4], "name": list("abcd"), "updated_at": day})
+    snowflake_module.get_session().tables["RAW.USERS"] = source.clear()
+
+    first = merge_frame_to_snowflake(source, "RAW.USERS", ["id"], "updated_at", store)
+    changed = source.with_columns(
+        name=pl.when(pl.col("id") == 2).then(pl.lit("B")).otherwise("name"),
+        updated_at=pl.when(pl.col("id") == 2).then(datetime(2024, 1, 4)).otherwise("updated_at"),
+    ).vstack(pl.DataFrame({"id": [5], "name": ["e"], "updated_at": [datetime(2024, 1, 5)]}))
+    second = merge_frame_to_snowflake(changed.lazy(), "RAW.USERS", ["id"], "updated_at", store)
+
+    tables = connections[0].tables
+    # The second load ships rows 2 and 5, plus row 4 which sits on the previous mark.
+    assert (first.rows, second.rows) == (4, 3)
+    assert list(tables) == ["RAW.USERS"]
+    assert tables["RAW.USERS"].equals(changed)
+    assert WatermarkStore(tmp_path / "watermarks.json").get("raw.users", "updated_at").value == (
+        "2024-01-05T00:00:00"
+    )
+
+
+def test_merge_stages_the_latest_row_of_each_key(connections, tmp_path):
+    """Test several versions of a key in the change set are merged as the latest one."""
+    store = WatermarkStore(tmp_path / "watermarks.json")
+    day = [datetime(2024, 1, d) for d in (3, 1, 2, 1)]
+    source = pl.DataFrame({"id": [1, 1, 1, 2], "name": list("cabd"), "updated_at": day})
+    snowflake_module.get_session().tables["RAW.USERS"] = source.clear()
+
+    report = merge_frame_to_snowflake(source, "RAW.USERS", ["id"], "updated_at", store)
+
+    assert report.rows == 2
+    assert connections[0].tables["RAW.USERS"].equals(source[[0, 3]])
+
+
+def test_failed_merge_keeps_the_watermark(connections, tmp_path):
+    """Test the high-water mark only advances once the MERGE has succeeded."""
+    store = WatermarkStore(tmp_path / "watermarks.json")
+    connection = snowflake_module.get_session()
+    connection.tables["RAW.EVENTS"] = pl.DataFrame(schema={"id": pl.Int64})
+    merge_frame_to_snowflake(pl.DataFrame({"id": [1, 2]}), "RAW.EVENTS", ["id"], "id", store)
+    connection.put_status = "ERROR"
+
+    with pytest.raises(RuntimeError):
+        merge_frame_to_snowflake(pl.DataFrame({"id": [3]}), "RAW.EVENTS", ["id"], "id", store)
+
+    assert store.get("RAW.EVENTS", "id").value == 2
+    assert list(connection.tables) == ["RAW.EVENTS"]